@@ -0,0 +1,45 @@
+"""Helpers shared by revisions in alembic/versions.
+
+Revisions import this module after adding alembic/ to sys.path:
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from migration_helpers import execute_if_table_exists, logger
+"""
+import logging
+
+from alembic import context, op
+
+from app.services.data_version import bump_data_versions_sync
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def execute_if_table_exists(table: str, *statements: str) -> None:
+    """
+    Run statements only if the table exists (knowledge_base may be missing).
+
+    Done server-side in a DO block so offline (--sql) mode works too.
+    """
+    quoted = (statement.replace("'", "''") for statement in statements)
+    body = " ".join(f"EXECUTE '{statement}';" for statement in quoted)
+    op.execute(
+        f"DO $$ BEGIN IF to_regclass('{table}') IS NOT NULL THEN {body} END IF; END $$"
+    )
+
+
+def publish_data_versions(*scopes: str) -> None:
+    """
+    Bump the Redis data versions of tables a revision rewrote, so workers
+    stop serving search results cached before the migration.
+
+    Best effort: skipped in offline (--sql) mode and when Redis is
+    unreachable. Results cached from the old data then expire after
+    SEARCH_RESULT_CACHE_TTL_SECONDS.
+    """
+    if context.is_offline_mode():
+        logger.info(f"Offline mode: bump the data versions of {', '.join(scopes)} after applying")
+        return
+    try:
+        bump_data_versions_sync(list(scopes))
+    except Exception as e:
+        logger.warning(f"Could not bump data versions of {', '.join(scopes)}: {e}")
@@ -0,0 +1,106 @@
+"""Configurable vector indexes (HNSW or ivfflat)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-01-20
+
+Rebuilds the cosine vector indexes of the RAG tables with the index kind
+and build parameters from settings (VECTOR_INDEX_KIND, VECTOR_INDEX_HNSW_M,
+VECTOR_INDEX_HNSW_EF_CONSTRUCTION, VECTOR_INDEX_IVFFLAT_LISTS).
+
+ivfflat with a fixed lists=100 has poor recall on small or growing tables
+(clusters are trained on whatever rows exist at build time). HNSW needs no
+training and keeps recall high as rows are added.
+
+Also creates the exercise_embeddings vector index that 002 did not
+recreate, and renames the workout index to the name used by the models.
+
+To switch kinds later, change the settings and run:
+    alembic downgrade 002_migrate_to_openai && alembic upgrade head
+"""
+import os
+import sys
+
+from alembic import op
+
+from app.core.config import get_settings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migration_helpers import execute_if_table_exists, logger
+
+
+# revision identifiers, used by Alembic.
+revision = '003_vector_index_kind'
+down_revision = '002_migrate_to_openai'
+branch_labels = None
+depends_on = None
+
+settings = get_settings()
+
+# table -> vector index name (as declared in app/db/models.py)
+VECTOR_INDEXES = {
+    'exercise_embeddings': 'idx_exercise_embeddings_vector',
+    'workout_log_embeddings': 'idx_workout_embeddings_vector',
+    'knowledge_base': 'idx_knowledge_embedding',
+}
+
+# Index names used by earlier migrations
+LEGACY_INDEXES = ['idx_workout_log_embeddings_vector']
+
+
+def _vector_index_ddl(index_name: str, table: str, column: str) -> str:
+    """
+    Full-precision cosine index of VECTOR_INDEX_KIND.
+
+    Frozen here rather than imported from app.db.models, so this revision
+    keeps building the same index when the models change.
+    """
+    if settings.VECTOR_INDEX_KIND == 'hnsw':
+        method = 'hnsw'
+        options = (
+            f'm = {settings.VECTOR_INDEX_HNSW_M}, '
+            f'ef_construction = {settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION}'
+        )
+    else:
+        method = 'ivfflat'
+        options = f'lists = {settings.VECTOR_INDEX_IVFFLAT_LISTS}'
+    return (
+        f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} '
+        f'USING {method} ({column} vector_cosine_ops) WITH ({options})'
+    )
+
+
+def upgrade() -> None:
+    """
+    Drop existing vector indexes and rebuild them with the configured kind.
+
+    Builds run inside the migration transaction (tables are locked for
+    writes meanwhile). For large tables build CONCURRENTLY instead, see
+    migrate_embedding_dimension.py's index phase.
+    """
+    for index_name in LEGACY_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+    column = settings.EMBEDDING_COLUMN
+    for table, index_name in VECTOR_INDEXES.items():
+        execute_if_table_exists(
+            table,
+            f'DROP INDEX IF EXISTS {index_name}',
+            _vector_index_ddl(index_name, table, column)
+        )
+
+    logger.info(f"Vector indexes rebuilt ({settings.VECTOR_INDEX_KIND})")
+
+
+def downgrade() -> None:
+    """
+    Restore ivfflat indexes with lists = 100.
+    """
+    column = settings.EMBEDDING_COLUMN
+    for table, index_name in VECTOR_INDEXES.items():
+        execute_if_table_exists(
+            table,
+            f'DROP INDEX IF EXISTS {index_name}',
+            f'CREATE INDEX {index_name} ON {table} '
+            f'USING ivfflat ({column} vector_cosine_ops) WITH (lists = 100)'
+        )
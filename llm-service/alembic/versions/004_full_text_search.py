@@ -0,0 +1,60 @@
+"""Full-text search columns for hybrid retrieval
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-01-27
+
+Adds a generated tsvector column (search_vector) with a GIN index to
+exercise_embeddings (from embedding_text) and workout_log_embeddings
+(from summary_text). VectorSearchService uses it as the lexical leg of
+hybrid search, fused with the vector leg by reciprocal rank fusion, so
+queries naming an exact exercise still match when their embedding
+similarity falls below MIN_SIMILARITY.
+
+Adding a STORED generated column rewrites the table once.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision = '004_full_text_search'
+down_revision = '003_vector_index_kind'
+branch_labels = None
+depends_on = None
+
+# Must match FTS_CONFIG in app/db/models.py
+FTS_CONFIG = 'english'
+
+# table -> (source text column, GIN index name)
+FTS_COLUMNS = {
+    'exercise_embeddings': ('embedding_text', 'idx_exercise_embeddings_fts'),
+    'workout_log_embeddings': ('summary_text', 'idx_workout_embeddings_fts'),
+}
+
+
+def upgrade() -> None:
+    """
+    Add search_vector columns and GIN indexes.
+    """
+    for table, (source_column, index_name) in FTS_COLUMNS.items():
+        op.add_column(
+            table,
+            sa.Column(
+                'search_vector',
+                TSVECTOR(),
+                sa.Computed(f"to_tsvector('{FTS_CONFIG}', {source_column})", persisted=True),
+                nullable=True
+            )
+        )
+        op.create_index(index_name, table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """
+    Drop search_vector columns (and their indexes).
+    """
+    for table, (_, index_name) in FTS_COLUMNS.items():
+        op.drop_index(index_name, table_name=table)
+        op.drop_column(table, 'search_vector')
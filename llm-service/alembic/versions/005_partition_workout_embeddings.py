@@ -0,0 +1,314 @@
+"""Hash partition workout_log_embeddings by user_id
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-03
+
+search_user_workouts filters by user_id and orders by cosine distance.
+On one table the ANN index scan walks every user's vectors and drops the
+other users' rows afterwards, which costs latency and recall as users are
+added. Partitioned by HASH (user_id), the planner prunes to a single
+partition, so an index scan only walks the vectors of the users hashed to
+it (about 1 / WORKOUT_EMBEDDING_PARTITIONS of the rows).
+
+That only shrinks the candidate pool: the user_id filter still runs after
+the index scan, so with many users per partition a user's rows can still
+be crowded out of the top candidates. Workout search avoids that by
+ranking a user's rows exactly (WORKOUT_SEARCH_EXACT, see
+VectorSearchService._nearest); partitioning keeps that scan within one
+partition.
+
+Partitioned tables need the partition key in every unique constraint:
+the primary key becomes (id, user_id) and workout_log_id is unique per
+user (uq_workout_embeddings_user_log, the sync_data.py upsert target).
+
+Existing rows are moved online:
+    1. Create workout_log_embeddings_partitioned with its partitions and
+       unique constraints, and a trigger mirroring writes on the old table
+       into it. A (user_id, workout_log_id) unique index is also added to
+       the old table so the new sync_data.py upsert works before the swap.
+    2. Copy rows in id batches, each committed on its own (reads and
+       writes continue meanwhile).
+    3. Build the secondary and vector indexes on the filled table: one
+       bulk build per partition (CONCURRENTLY, attached to an index
+       created ON ONLY the parent) instead of growing the HNSW graph row
+       by row during the copy.
+    4. In one short transaction: lock the old table, delete copied rows
+       that no longer exist in it (deleted while their batch was being
+       copied), check row counts, swap names and drop the old table.
+    5. Bump the workout_log_embeddings data version so workers drop
+       search results cached before the swap.
+
+If a step fails, the mirror trigger is dropped; a re-run drops the
+half-built table and starts over. Needs a database connection (no --sql
+mode). Partition count comes from
+WORKOUT_EMBEDDING_PARTITIONS; changing it later means downgrading and
+upgrading this revision again.
+"""
+import os
+import sys
+from typing import List
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core.config import get_settings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migration_helpers import logger, publish_data_versions
+
+
+# revision identifiers, used by Alembic.
+revision = '005_partition_workout_embeddings'
+down_revision = '004_full_text_search'
+branch_labels = None
+depends_on = None
+
+settings = get_settings()
+
+TABLE = 'workout_log_embeddings'
+NEW_TABLE = f'{TABLE}_partitioned'
+OLD_TABLE = f'{TABLE}_unpartitioned'
+SEQUENCE = f'{TABLE}_id_seq'
+MIRROR = f'{TABLE}_mirror'
+COPY_BATCH_SIZE = 5000
+
+# Final index name -> (columns, USING method); the vector index is separate
+INDEXES = {
+    'idx_workout_embeddings_user': ('user_id', 'btree'),
+    'idx_workout_embeddings_date': ('workout_date', 'btree'),
+    'idx_workout_embeddings_fts': ('search_vector', 'gin'),
+}
+VECTOR_INDEX = 'idx_workout_embeddings_vector'
+
+
+def _writable_columns() -> str:
+    """Column list for copies (generated columns are recomputed, not copied)."""
+    columns = sa.inspect(op.get_bind()).get_columns(TABLE)
+    return ", ".join(column['name'] for column in columns if not column.get('computed'))
+
+
+def _vector_index_ddl(
+    index_name: str,
+    table: str,
+    concurrently: bool = False,
+    only: bool = False
+) -> str:
+    """
+    Full-precision cosine index of VECTOR_INDEX_KIND on EMBEDDING_COLUMN.
+
+    Frozen here rather than imported from app.db.models, so this revision
+    keeps building the same index when the models change.
+    """
+    if settings.VECTOR_INDEX_KIND == 'hnsw':
+        method = 'hnsw'
+        options = (
+            f'm = {settings.VECTOR_INDEX_HNSW_M}, '
+            f'ef_construction = {settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION}'
+        )
+    else:
+        method = 'ivfflat'
+        options = f'lists = {settings.VECTOR_INDEX_IVFFLAT_LISTS}'
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+        f"ON {'ONLY ' if only else ''}{table} "
+        f"USING {method} ({settings.EMBEDDING_COLUMN} vector_cosine_ops) WITH ({options})"
+    )
+
+
+def _partition_ddl() -> List[str]:
+    """CREATE statements of the NEW_TABLE hash partitions, named with their final names."""
+    modulus = settings.WORKOUT_EMBEDDING_PARTITIONS
+    return [
+        f'CREATE TABLE IF NOT EXISTS {TABLE}_p{remainder} PARTITION OF {NEW_TABLE} '
+        f'FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})'
+        for remainder in range(modulus)
+    ]
+
+
+def _create_indexes(table: str, suffix: str) -> None:
+    for index_name, (column, method) in INDEXES.items():
+        op.execute(f'CREATE INDEX {index_name}{suffix} ON {table} USING {method} ({column})')
+    op.execute(_vector_index_ddl(f'{VECTOR_INDEX}{suffix}', table))
+
+
+def _build_partitioned_indexes(suffix: str) -> None:
+    """
+    Build the indexes of NEW_TABLE without blocking writes.
+
+    CONCURRENTLY is not supported on a partitioned table: each index is
+    created ON ONLY the parent, built concurrently per partition and
+    attached. Must run in an autocommit block.
+    """
+    for remainder in range(settings.WORKOUT_EMBEDDING_PARTITIONS):
+        partition = f'{TABLE}_p{remainder}'
+        for index_name, (indexed, method) in INDEXES.items():
+            if remainder == 0:
+                op.execute(
+                    f'CREATE INDEX IF NOT EXISTS {index_name}{suffix} '
+                    f'ON ONLY {NEW_TABLE} USING {method} ({indexed})'
+                )
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}_p{remainder} '
+                f'ON {partition} USING {method} ({indexed})'
+            )
+            op.execute(f'ALTER INDEX {index_name}{suffix} ATTACH PARTITION {index_name}_p{remainder}')
+
+        if remainder == 0:
+            op.execute(_vector_index_ddl(f'{VECTOR_INDEX}{suffix}', NEW_TABLE, only=True))
+        op.execute(_vector_index_ddl(f'{VECTOR_INDEX}_p{remainder}', partition, concurrently=True))
+        op.execute(f'ALTER INDEX {VECTOR_INDEX}{suffix} ATTACH PARTITION {VECTOR_INDEX}_p{remainder}')
+
+
+def _rename_indexes(suffix: str) -> None:
+    for index_name in [*INDEXES, VECTOR_INDEX]:
+        op.execute(f'ALTER INDEX {index_name}{suffix} RENAME TO {index_name}')
+
+
+def _copy_and_swap(columns: str) -> int:
+    """
+    Steps 2-4 of upgrade: copy, build indexes, reconcile and swap.
+
+    Returns:
+        Rows in the new table
+    """
+    # 2. Batched copy; rows written from now on are mirrored by the trigger
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        min_id, max_id = bind.execute(sa.text(f'SELECT min(id), max(id) FROM {TABLE}')).one()
+        copied = 0
+        if min_id is not None:
+            for start in range(min_id, max_id + 1, COPY_BATCH_SIZE):
+                result = bind.execute(sa.text(
+                    f'INSERT INTO {NEW_TABLE} ({columns}) '
+                    f'SELECT {columns} FROM {TABLE} WHERE id >= :start AND id < :end '
+                    f'ON CONFLICT DO NOTHING'
+                ), {'start': start, 'end': start + COPY_BATCH_SIZE})
+                copied += result.rowcount
+        logger.info(f"Copied {copied} rows into {NEW_TABLE}")
+
+        # 3. Indexes, built once over the copied rows
+        _build_partitioned_indexes('_new')
+
+    # 4. Swap (blocks reads and writes only for the reconcile, count check
+    # and renames). In a savepoint, so a failure leaves the migration
+    # transaction usable for the cleanup in upgrade().
+    bind = op.get_bind()
+    with bind.begin_nested():
+        op.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        # A row deleted while its batch was copying can be re-inserted from
+        # the batch's older snapshot after the trigger deleted it
+        resurrected = bind.execute(sa.text(
+            f'DELETE FROM {NEW_TABLE} copied WHERE NOT EXISTS ('
+            f'SELECT 1 FROM {TABLE} live WHERE live.id = copied.id AND live.user_id = copied.user_id)'
+        )).rowcount
+        if resurrected:
+            logger.info(f"Removed {resurrected} rows deleted during the copy")
+
+        old_count = bind.execute(sa.text(f'SELECT count(*) FROM {TABLE}')).scalar()
+        new_count = bind.execute(sa.text(f'SELECT count(*) FROM {NEW_TABLE}')).scalar()
+        if old_count != new_count:
+            raise RuntimeError(
+                f"Row count mismatch after copy: {TABLE}={old_count}, {NEW_TABLE}={new_count}"
+            )
+
+        op.execute(f'DROP TRIGGER {MIRROR} ON {TABLE}')
+        op.execute(f'DROP FUNCTION {MIRROR}()')
+        op.execute(f'ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}')
+        op.execute(f'ALTER TABLE {NEW_TABLE} RENAME TO {TABLE}')
+        # The id default of both tables uses this sequence; keep it when dropping the old one
+        op.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+        op.execute(f'DROP TABLE {OLD_TABLE}')
+
+        op.execute(f'ALTER TABLE {TABLE} RENAME CONSTRAINT {NEW_TABLE}_pkey TO {TABLE}_pkey')
+        _rename_indexes('_new')
+
+    return new_count
+
+
+def upgrade() -> None:
+    """
+    Move workout_log_embeddings to a hash partitioned table online.
+    """
+    if context.is_offline_mode():
+        raise RuntimeError(f"{revision} copies rows in batches and must run online")
+
+    columns = _writable_columns()
+    new_values = ", ".join(f"NEW.{column.strip()}" for column in columns.split(","))
+
+    # 1. New table, mirror trigger. Leftovers of a failed run are dropped
+    # first: their rows may be stale once the mirror trigger is gone.
+    op.execute(f'DROP TRIGGER IF EXISTS {MIRROR} ON {TABLE}')
+    op.execute(f'DROP TABLE IF EXISTS {NEW_TABLE}')
+    op.execute(
+        f'CREATE TABLE {NEW_TABLE} ('
+        f'LIKE {TABLE} INCLUDING DEFAULTS INCLUDING GENERATED, '
+        f'CONSTRAINT {NEW_TABLE}_pkey PRIMARY KEY (id, user_id), '
+        f'CONSTRAINT uq_workout_embeddings_user_log UNIQUE (user_id, workout_log_id)'
+        f') PARTITION BY HASH (user_id)'
+    )
+    # Partitions get their final names right away
+    for statement in _partition_ddl():
+        op.execute(statement)
+
+    op.execute(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS uq_{TABLE}_user_log_legacy '
+        f'ON {TABLE} (user_id, workout_log_id)'
+    )
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {MIRROR}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND user_id = OLD.user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {NEW_TABLE} ({columns}) VALUES ({new_values})
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        f'CREATE TRIGGER {MIRROR} AFTER INSERT OR UPDATE OR DELETE ON {TABLE} '
+        f'FOR EACH ROW EXECUTE FUNCTION {MIRROR}()'
+    )
+
+    try:
+        new_count = _copy_and_swap(columns)
+    except Exception:
+        # Step 1 is committed: stop mirroring writes into a table nothing will read
+        with op.get_context().autocommit_block():
+            op.execute(f'DROP TRIGGER IF EXISTS {MIRROR} ON {TABLE}')
+        raise
+
+    logger.info(f"{TABLE} partitioned ({settings.WORKOUT_EMBEDDING_PARTITIONS} partitions, {new_count} rows)")
+    publish_data_versions(TABLE)
+
+
+def downgrade() -> None:
+    """
+    Copy rows back into an unpartitioned table (blocks writes meanwhile).
+    """
+    if context.is_offline_mode():
+        raise RuntimeError(f"{revision} downgrade must run online")
+
+    columns = _writable_columns()
+
+    op.execute(
+        f'CREATE TABLE {OLD_TABLE} ('
+        f'LIKE {TABLE} INCLUDING DEFAULTS INCLUDING GENERATED, '
+        f'CONSTRAINT {OLD_TABLE}_pkey PRIMARY KEY (id), '
+        f'CONSTRAINT {TABLE}_workout_log_id_key UNIQUE (workout_log_id)'
+        f')'
+    )
+    op.execute(f'LOCK TABLE {TABLE} IN EXCLUSIVE MODE')
+    op.execute(f'INSERT INTO {OLD_TABLE} ({columns}) SELECT {columns} FROM {TABLE}')
+
+    op.execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {OLD_TABLE}.id')
+    op.execute(f'DROP TABLE {TABLE}')
+    op.execute(f'ALTER TABLE {OLD_TABLE} RENAME TO {TABLE}')
+    op.execute(f'ALTER TABLE {TABLE} RENAME CONSTRAINT {OLD_TABLE}_pkey TO {TABLE}_pkey')
+    _create_indexes(TABLE, '')
+    publish_data_versions(TABLE)
@@ -0,0 +1,38 @@
+"""Workout (user_id, workout_date) index for date-window searches
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-02-10
+
+search_user_workouts accepts since/until filters. This index lets
+PostgreSQL narrow a user's workouts to the date window before ordering
+the remaining candidates by cosine distance. Created on the partitioned
+parent, so every partition gets its own index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006_workout_date_window_index'
+down_revision = '005_partition_workout_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create idx_workout_embeddings_user_date.
+    """
+    op.create_index(
+        'idx_workout_embeddings_user_date',
+        'workout_log_embeddings',
+        ['user_id', 'workout_date'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop idx_workout_embeddings_user_date.
+    """
+    op.drop_index('idx_workout_embeddings_user_date', table_name='workout_log_embeddings')
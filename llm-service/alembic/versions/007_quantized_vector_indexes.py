@@ -0,0 +1,100 @@
+"""Quantized vector indexes (halfvec / binary) with exact re-ranking
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-02-17
+
+Rebuilds the vector indexes of the RAG tables on the compact form chosen by
+VECTOR_QUANTIZATION (see app/db/models.py vector_index):
+    halfvec: CAST(embedding AS halfvec(n))              2 bytes per dimension
+    binary:  CAST(binary_quantize(embedding) AS bit(n)) 1 bit per dimension
+
+These are expression indexes: tables keep the full-precision vectors, which
+VectorSearchService uses to re-rank VECTOR_RERANK_OVERSAMPLE x limit
+candidates read from the compact index. Index pages shrink 2x (halfvec) or
+32x (binary), so the index working set stays in shared_buffers.
+
+Requires pgvector >= 0.7 on the server. With VECTOR_QUANTIZATION=none this
+revision just rebuilds full-precision indexes. To switch later, change the
+setting and run:
+    alembic downgrade 006_workout_date_window_index && alembic upgrade head
+"""
+import os
+import sys
+
+from app.core.config import get_settings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migration_helpers import execute_if_table_exists, logger
+
+
+# revision identifiers, used by Alembic.
+revision = '007_quantized_vector_indexes'
+down_revision = '006_workout_date_window_index'
+branch_labels = None
+depends_on = None
+
+settings = get_settings()
+
+# table -> vector index name (as declared in app/db/models.py)
+VECTOR_INDEXES = {
+    'exercise_embeddings': 'idx_exercise_embeddings_vector',
+    'workout_log_embeddings': 'idx_workout_embeddings_vector',
+    'knowledge_base': 'idx_knowledge_embedding',
+}
+
+# VECTOR_QUANTIZATION -> (indexed expression, operator class)
+QUANTIZED_FORMS = {
+    'none': ('{column}', 'vector_cosine_ops'),
+    'halfvec': ('CAST({column} AS halfvec({dimension}))', 'halfvec_cosine_ops'),
+    'binary': ('CAST(binary_quantize({column}) AS bit({dimension}))', 'bit_hamming_ops'),
+}
+
+
+def _vector_index_ddl(index_name: str, table: str, quantization: str) -> str:
+    """
+    Vector index of VECTOR_INDEX_KIND on the compact form of EMBEDDING_COLUMN.
+
+    Frozen here rather than imported from app.db.models, so this revision
+    keeps building the same index when the models change.
+    """
+    expression, operator_class = QUANTIZED_FORMS[quantization]
+    expression = expression.format(column=settings.EMBEDDING_COLUMN, dimension=settings.EMBEDDING_DIMENSION)
+    if settings.VECTOR_INDEX_KIND == 'hnsw':
+        method = 'hnsw'
+        options = (
+            f'm = {settings.VECTOR_INDEX_HNSW_M}, '
+            f'ef_construction = {settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION}'
+        )
+    else:
+        method = 'ivfflat'
+        options = f'lists = {settings.VECTOR_INDEX_IVFFLAT_LISTS}'
+    return (
+        f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} '
+        f'USING {method} ({expression} {operator_class}) WITH ({options})'
+    )
+
+
+def _rebuild_indexes(quantization: str) -> None:
+    """Drop and recreate the vector indexes (knowledge_base may be missing)."""
+    for table, index_name in VECTOR_INDEXES.items():
+        execute_if_table_exists(
+            table,
+            f'DROP INDEX IF EXISTS {index_name}',
+            _vector_index_ddl(index_name, table, quantization)
+        )
+
+
+def upgrade() -> None:
+    """
+    Rebuild vector indexes on the VECTOR_QUANTIZATION form.
+    """
+    _rebuild_indexes(settings.VECTOR_QUANTIZATION)
+    logger.info(f"Vector indexes rebuilt ({settings.VECTOR_INDEX_KIND}, {settings.VECTOR_QUANTIZATION})")
+
+
+def downgrade() -> None:
+    """
+    Restore full-precision vector indexes.
+    """
+    _rebuild_indexes('none')
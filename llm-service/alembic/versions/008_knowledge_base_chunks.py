@@ -0,0 +1,140 @@
+"""Chunked knowledge base for search_knowledge
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-02-24
+
+002 dropped knowledge_base without recreating it. This revision creates it
+(or upgrades a table created by init_db) in the shape used by
+ingest_knowledge.py, which stores documents as overlapping chunks:
+    chunk_index:   position of the chunk in its source document
+    source:        widened to 255 characters (document paths)
+    search_vector: generated tsvector of content with a GIN index, the
+                   lexical leg of hybrid search
+    uq_knowledge_source_chunk: unique (source, chunk_index), the ingestion
+                   upsert target
+
+All statements are idempotent, so offline (--sql) mode works too. Online,
+the knowledge_base data version is bumped so cached search_knowledge
+results are not served from the old table shape.
+"""
+import os
+import sys
+
+from alembic import op
+
+from app.core.config import get_settings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migration_helpers import logger, publish_data_versions
+
+
+# revision identifiers, used by Alembic.
+revision = '008_knowledge_base_chunks'
+down_revision = '007_quantized_vector_indexes'
+branch_labels = None
+depends_on = None
+
+settings = get_settings()
+
+TABLE = 'knowledge_base'
+VECTOR_INDEX = 'idx_knowledge_embedding'
+FTS_CONFIG = 'english'
+
+# VECTOR_QUANTIZATION -> (indexed expression, operator class), as in 007
+QUANTIZED_FORMS = {
+    'none': ('{column}', 'vector_cosine_ops'),
+    'halfvec': ('CAST({column} AS halfvec({dimension}))', 'halfvec_cosine_ops'),
+    'binary': ('CAST(binary_quantize({column}) AS bit({dimension}))', 'bit_hamming_ops'),
+}
+
+
+def _vector_index_ddl() -> str:
+    """
+    Vector index of VECTOR_INDEX_KIND on the VECTOR_QUANTIZATION form of
+    EMBEDDING_COLUMN.
+
+    Frozen here rather than imported from app.db.models, so this revision
+    keeps building the same index when the models change.
+    """
+    expression, operator_class = QUANTIZED_FORMS[settings.VECTOR_QUANTIZATION]
+    expression = expression.format(column=settings.EMBEDDING_COLUMN, dimension=settings.EMBEDDING_DIMENSION)
+    if settings.VECTOR_INDEX_KIND == 'hnsw':
+        method = 'hnsw'
+        options = (
+            f'm = {settings.VECTOR_INDEX_HNSW_M}, '
+            f'ef_construction = {settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION}'
+        )
+    else:
+        method = 'ivfflat'
+        options = f'lists = {settings.VECTOR_INDEX_IVFFLAT_LISTS}'
+    return (
+        f'CREATE INDEX IF NOT EXISTS {VECTOR_INDEX} ON {TABLE} '
+        f'USING {method} ({expression} {operator_class}) WITH ({options})'
+    )
+
+
+def upgrade() -> None:
+    """
+    Create knowledge_base if missing and add the chunk columns.
+
+    A table created here is marked with a table comment naming this
+    revision, so downgrade knows to drop it rather than revert it.
+    """
+    column = settings.EMBEDDING_COLUMN
+    op.execute(
+        f"DO $$ BEGIN IF to_regclass('{TABLE}') IS NULL THEN "
+        f'CREATE TABLE {TABLE} ('
+        f'id BIGSERIAL PRIMARY KEY, '
+        f'title VARCHAR(200) NOT NULL, '
+        f'content TEXT NOT NULL, '
+        f'category VARCHAR(50), '
+        f'{column} vector({settings.EMBEDDING_DIMENSION}) NOT NULL, '
+        f'source VARCHAR(100), '
+        f'created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP'
+        f'); '
+        f"COMMENT ON TABLE {TABLE} IS '{revision}'; "
+        f'END IF; END $$'
+    )
+    op.execute(f'ALTER TABLE {TABLE} ALTER COLUMN source TYPE VARCHAR(255)')
+    op.execute(f'ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS chunk_index INTEGER NOT NULL DEFAULT 0')
+    op.execute(
+        f'ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f"GENERATED ALWAYS AS (to_tsvector('{FTS_CONFIG}', content)) STORED"
+    )
+
+    op.execute(f'CREATE INDEX IF NOT EXISTS idx_knowledge_category ON {TABLE} (category)')
+    op.execute(f'CREATE INDEX IF NOT EXISTS idx_knowledge_fts ON {TABLE} USING gin (search_vector)')
+    op.execute(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS uq_knowledge_source_chunk ON {TABLE} (source, chunk_index)'
+    )
+    # Already built by 007 if the table existed
+    op.execute(_vector_index_ddl())
+
+    logger.info(f"{TABLE} ready for ingest_knowledge.py")
+    publish_data_versions(TABLE)
+
+
+def downgrade() -> None:
+    """
+    Undo upgrade.
+
+    A table upgrade created (see its comment) is dropped with its rows.
+    A table that existed before gets back its pre-008 shape: the chunk
+    columns and indexes are dropped and source is narrowed to 100
+    characters again (longer document paths are truncated). Its category
+    and vector indexes predate 008 and are kept.
+    """
+    op.execute(
+        f"DO $$ BEGIN IF obj_description(to_regclass('{TABLE}'), 'pg_class') = '{revision}' THEN "
+        f'DROP TABLE {TABLE}; '
+        f'END IF; END $$'
+    )
+    op.execute('DROP INDEX IF EXISTS uq_knowledge_source_chunk')
+    op.execute('DROP INDEX IF EXISTS idx_knowledge_fts')
+    op.execute(f'ALTER TABLE IF EXISTS {TABLE} DROP COLUMN IF EXISTS search_vector')
+    op.execute(f'ALTER TABLE IF EXISTS {TABLE} DROP COLUMN IF EXISTS chunk_index')
+    op.execute(
+        f'ALTER TABLE IF EXISTS {TABLE} ALTER COLUMN source TYPE VARCHAR(100) USING left(source, 100)'
+    )
+    publish_data_versions(TABLE)
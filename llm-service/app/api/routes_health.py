@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from redis.asyncio import Redis
 from datetime import datetime
 
@@ -67,6 +67,36 @@ async def health_check(redis: Redis = Depends(get_redis)):
     }
 
 
+@router.get("/health/ready")
+def readiness_check(request: Request):
+    """
+    Readiness probe endpoint
+    
+    Reports ready only after startup (including embedding cache warm-up)
+    has finished or timed out, so load balancers hold traffic until then.
+    
+    Returns:
+        Readiness status
+        
+    Raises:
+        HTTPException 503: If startup has not finished
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "starting",
+                "message": "Startup warm-up in progress"
+            }
+        )
+    
+    return {
+        "status": "ready",
+        "service": settings.APP_NAME,
+        "version": settings.VERSION
+    }
+
+
 @router.get("/health/redis")
 async def redis_health_check(redis: Redis = Depends(get_redis)):
     """
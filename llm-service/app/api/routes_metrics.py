@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException
+
+from app.services.embedding_service import get_embedding_service
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics/embeddings")
+async def embedding_metrics():
+    """
+    Embedding cache and API metrics
+    
+    Reports:
+    - In-memory cache size, evictions and hit rate
+    - Per-caller lookup outcomes (memory/redis/disk hit, coalesced, miss)
+    - API calls, errors, tokens, latency and texts-per-call percentiles
+    
+    Returns:
+        Metrics for the process-wide EmbeddingService
+        
+    Raises:
+        HTTPException 503: If the embedding service cannot be initialized
+    """
+    try:
+        embedding_service = get_embedding_service()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "unavailable",
+                "message": f"Embedding service not initialized: {str(e)}"
+            }
+        )
+    
+    return embedding_service.get_metrics()
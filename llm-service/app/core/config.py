@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import Field, field_validator, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -81,6 +81,252 @@ class Settings(BaseSettings):
         description="Maximum messages to keep per session"
     )
     
+    # Embedding model output
+    EMBEDDING_BACKEND: Literal["openai", "local"] = Field(
+        default="openai",
+        description="Embedding provider: OpenAI API, or deterministic local hashing (offline/benchmarks)"
+    )
+    EMBEDDING_DIMENSION: int = Field(
+        default=1536,
+        ge=1,
+        le=1536,
+        description="Embedding dimension (text-embedding-3-small supports reducing 1536 to e.g. 512 or 256)"
+    )
+    EMBEDDING_COLUMN: str = Field(
+        default="embedding",
+        pattern=r"^[a-z_][a-z0-9_]*$",
+        description="Vector column holding EMBEDDING_DIMENSION vectors (see migrate_embedding_dimension.py)"
+    )
+
+    # Embedding cache settings (per worker, in-process)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(
+        default=2000,
+        ge=0,
+        description="Maximum cached embeddings per worker (0 = unbounded)"
+    )
+    EMBEDDING_CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Maximum estimated cache memory per worker in bytes (0 = unbounded)"
+    )
+    EMBEDDING_CACHE_TTL_SECONDS: int = Field(
+        default=3600,
+        ge=0,
+        description="Embedding cache entry lifetime in seconds (0 = no expiry)"
+    )
+
+    # Shared embedding cache (Redis, across workers)
+    EMBEDDING_REDIS_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Share embeddings across workers through Redis"
+    )
+    EMBEDDING_REDIS_TTL_SECONDS: int = Field(
+        default=7 * 24 * 3600,
+        gt=0,
+        description="Redis embedding cache entry lifetime in seconds"
+    )
+
+    # Persistent embedding store for batch jobs (sync_data.py)
+    EMBEDDING_DISK_CACHE_PATH: Optional[str] = Field(
+        default=None,
+        description="SQLite file for persistent batch embedding cache (None = disabled)"
+    )
+
+    # Micro-batching of single-text embedding requests
+    EMBEDDING_BATCH_WINDOW_MS: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="How long single-text requests wait to be batched together (0 = disabled)"
+    )
+
+    # Batch embedding dispatch
+    EMBEDDING_MAX_BATCH_SIZE: int = Field(
+        default=100,
+        gt=0,
+        le=2048,
+        description="Maximum texts per embeddings request (100 = the batch size before token packing; OpenAI limit: 2048)"
+    )
+    EMBEDDING_MAX_BATCH_TOKENS: int = Field(
+        default=250_000,
+        gt=0,
+        description="Token budget per embeddings request (OpenAI limit: 300k)"
+    )
+    EMBEDDING_BATCH_CONCURRENCY: int = Field(
+        default=4,
+        gt=0,
+        description="Maximum embedding API batches in flight at once"
+    )
+    EMBEDDING_RATE_LIMIT_RETRIES: int = Field(
+        default=5,
+        ge=0,
+        description="Retries per batch after OpenAI rate limit errors"
+    )
+
+    # Startup warm-up of hot search queries
+    HOT_QUERY_WINDOW_DAYS: int = Field(
+        default=7,
+        gt=0,
+        description="Days of search query counts kept in Redis for warm-up"
+    )
+    EMBEDDING_WARMUP_QUERIES: int = Field(
+        default=200,
+        ge=0,
+        description="Most frequent recent queries to embed at startup (0 = disabled)"
+    )
+    EMBEDDING_WARMUP_TIMEOUT_SECONDS: float = Field(
+        default=15.0,
+        gt=0.0,
+        description="Startup waits at most this long for warm-up before reporting ready"
+    )
+
+    # In-process exact index of exercise_embeddings
+    EXERCISE_INDEX_ENABLED: bool = Field(
+        default=False,
+        description="Serve search_exercises from an in-memory NumPy index instead of pgvector"
+    )
+    EXERCISE_INDEX_REFRESH_SECONDS: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="Minimum interval between data version checks of the exercise index"
+    )
+
+    # Redis cache of search results (invalidated by sync_data.py data versions)
+    SEARCH_RESULT_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Cache search_exercises / search_user_workouts results in Redis"
+    )
+    SEARCH_RESULT_CACHE_TTL_SECONDS: int = Field(
+        default=600,
+        gt=0,
+        description="Search result cache entry lifetime in seconds"
+    )
+
+    # In-process cache of search results for near-duplicate queries
+    SEMANTIC_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Reuse search results of a cached query with a near-identical embedding"
+    )
+    SEMANTIC_CACHE_THRESHOLD: float = Field(
+        default=0.95,
+        ge=0.0,
+        le=1.0,
+        description="Minimum cosine similarity between queries to reuse results"
+    )
+    SEMANTIC_CACHE_MAX_ENTRIES: int = Field(
+        default=512,
+        gt=0,
+        description="Recent queries kept per worker"
+    )
+    SEMANTIC_CACHE_TTL_SECONDS: float = Field(
+        default=600.0,
+        ge=0.0,
+        description="Semantic cache entry lifetime in seconds (0 = no expiry)"
+    )
+
+    # pgvector index build and query tuning
+    VECTOR_INDEX_KIND: Literal["hnsw", "ivfflat"] = Field(
+        default="ivfflat",
+        description="Vector index type for RAG tables (applied by migrations)"
+    )
+    VECTOR_INDEX_IVFFLAT_LISTS: int = Field(
+        default=100,
+        gt=0,
+        description="ivfflat lists (rule of thumb: rows / 1000)"
+    )
+    VECTOR_INDEX_HNSW_M: int = Field(
+        default=16,
+        ge=2,
+        le=100,
+        description="HNSW max connections per layer"
+    )
+    VECTOR_INDEX_HNSW_EF_CONSTRUCTION: int = Field(
+        default=64,
+        ge=4,
+        le=1000,
+        description="HNSW candidate list size while building"
+    )
+    VECTOR_SEARCH_EF_SEARCH: int = Field(
+        default=40,
+        ge=1,
+        le=1000,
+        description="Default hnsw.ef_search per query (higher = better recall, slower)"
+    )
+    VECTOR_SEARCH_PROBES: int = Field(
+        default=10,
+        ge=1,
+        description="Default ivfflat.probes per query (higher = better recall, slower)"
+    )
+    VECTOR_ITERATIVE_SCAN: bool = Field(
+        default=False,
+        description="pgvector >= 0.8: keep scanning the index until filtered searches have enough rows"
+    )
+
+    # Compact vector indexes (pgvector >= 0.7) with exact re-ranking
+    VECTOR_QUANTIZATION: Literal["none", "halfvec", "binary"] = Field(
+        default="none",
+        description="Index vectors as halfvec (half size) or binary codes (1/32 size); applied by migration 007"
+    )
+    VECTOR_RERANK_OVERSAMPLE: int = Field(
+        default=4,
+        ge=1,
+        description="Candidates read from a quantized index per result, re-ranked by exact distance (binary needs ~10)"
+    )
+
+    # Hash partitioning of workout_log_embeddings by user_id
+    WORKOUT_EMBEDDING_PARTITIONS: int = Field(
+        default=16,
+        ge=1,
+        description="Hash partitions of workout_log_embeddings (applied by migration 005)"
+    )
+
+    # Workout search: exact scan of the user's rows instead of the vector index
+    # (on by default: the ranking workout search has always had)
+    WORKOUT_SEARCH_EXACT: bool = Field(
+        default=True,
+        description="Rank a user's workouts exactly; the vector index filters user_id after the scan and can miss rows"
+    )
+
+    # Recency blend of workout search ranking
+    WORKOUT_RECENCY_WEIGHT: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="Share of the workout ranking score that decays with workout age (0 = relevance only; search_user_workouts(recency_weight=...) opts in per call)"
+    )
+    WORKOUT_RECENCY_HALF_LIFE_DAYS: float = Field(
+        default=30.0,
+        gt=0.0,
+        description="Workout age in days at which the decaying share is halved"
+    )
+
+    # Knowledge base ingestion (ingest_knowledge.py)
+    KNOWLEDGE_CHUNK_TOKENS: int = Field(
+        default=400,
+        gt=0,
+        description="Token budget per knowledge base chunk"
+    )
+    KNOWLEDGE_CHUNK_OVERLAP_TOKENS: int = Field(
+        default=60,
+        ge=0,
+        description="Tokens repeated from the end of a chunk at the start of the next one"
+    )
+
+    # Lexical (full-text) leg of hybrid search, fused by reciprocal rank fusion
+    LEXICAL_SEARCH_ENABLED: bool = Field(
+        default=True,
+        description="Fuse full-text matches with vector results (needs migration 004)"
+    )
+    RRF_K: int = Field(
+        default=60,
+        gt=0,
+        description="Reciprocal rank fusion constant: score = sum(1 / (RRF_K + rank))"
+    )
+    RRF_CANDIDATES: int = Field(
+        default=20,
+        gt=0,
+        description="Candidates taken from each leg before fusion (at least the result limit)"
+    )
+
     # PostgreSQL + pgvector for RAG
     POSTGRES_HOST: str = Field(
         default="localhost",
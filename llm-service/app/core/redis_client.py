@@ -1,3 +1,4 @@
+from redis import Redis as SyncRedis
 from redis.asyncio import Redis, ConnectionPool
 from functools import lru_cache
 import logging
@@ -23,6 +24,25 @@ def get_redis_pool() -> ConnectionPool:
     )
 
 
+@lru_cache
+def get_redis_binary_pool() -> ConnectionPool:
+    """
+    Create Redis connection pool for raw bytes values (cached, thread-safe)
+    
+    Same server and limits as get_redis_pool(), but without response
+    decoding so packed binary payloads (e.g. embeddings) round-trip intact.
+    """
+    logger.info(f"Creating Redis binary connection pool: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    return ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        decode_responses=False,
+    )
+
+
 def get_redis() -> Redis:
     """
     FastAPI dependency to get Redis client
@@ -30,6 +50,27 @@ def get_redis() -> Redis:
     return Redis(connection_pool=get_redis_pool())
 
 
+def get_redis_sync() -> SyncRedis:
+    """
+    Get a blocking Redis client for code that cannot await (e.g. Alembic
+    migrations). Not pooled; use one client per task and close it.
+    """
+    return SyncRedis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        decode_responses=True,
+    )
+
+
+def get_redis_binary() -> Redis:
+    """
+    Get Redis client that returns raw bytes
+    """
+    return Redis(connection_pool=get_redis_binary_pool())
+
+
 async def verify_redis_connection() -> bool:
     """
     Verify Redis connection is working
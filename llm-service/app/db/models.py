@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional
 
 from sqlalchemy import (
     BigInteger,
     Column,
+    Computed,
     String,
     Text,
     Integer,
@@ -11,11 +12,189 @@ from sqlalchemy import (
     Date,
     DateTime,
     Index,
+    UniqueConstraint,
+    DDL,
+    cast,
+    event,
+    func,
 )
+from sqlalchemy.dialects.postgresql import BIT, TSVECTOR
+from sqlalchemy.types import UserDefinedType
 from pgvector.sqlalchemy import Vector
 
+from app.core.config import settings
 from app.db.database import Base
 
+# Text search configuration of the generated search_vector columns
+FTS_CONFIG = 'english'
+
+# Values of knowledge_base.category (search_knowledge tool filter)
+KNOWLEDGE_CATEGORIES = ('form', 'nutrition', 'recovery', 'programming')
+
+
+def search_vector_column(source_column: str) -> Column:
+    """Generated tsvector column for full-text search over a text column."""
+    return Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{FTS_CONFIG}', {source_column})", persisted=True)
+    )
+
+
+class HALFVEC(UserDefinedType):
+    """pgvector halfvec(n) (half precision), for casts in index and query expressions."""
+    cache_ok = True
+    
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+    
+    def get_col_spec(self, **kw) -> str:
+        return f"HALFVEC({self.dimension})"
+
+
+# VECTOR_QUANTIZATION -> (operator class, distance operator) of the index
+VECTOR_INDEX_OPS = {
+    'none': ('vector_cosine_ops', '<=>'),
+    'halfvec': ('halfvec_cosine_ops', '<=>'),
+    'binary': ('bit_hamming_ops', '<~>'),
+}
+
+
+def quantized(expression: Any, dimension: Optional[int] = None) -> Any:
+    """
+    Compact form of a vector expression for VECTOR_QUANTIZATION.
+    
+    halfvec: CAST(x AS HALFVEC(n)), 2 bytes per dimension
+    binary:  CAST(binary_quantize(x) AS BIT(n)), 1 bit per dimension
+    none:    x unchanged
+    """
+    dimension = dimension or settings.EMBEDDING_DIMENSION
+    if settings.VECTOR_QUANTIZATION == 'halfvec':
+        return cast(expression, HALFVEC(dimension))
+    if settings.VECTOR_QUANTIZATION == 'binary':
+        return cast(func.binary_quantize(expression), BIT(dimension))
+    return expression
+
+
+def index_distance(column: Any, query_vector: Any) -> Any:
+    """
+    Distance the vector index is ordered by: cosine on the (quantized)
+    vectors, or Hamming distance of binary codes. ORDER BY this to use the
+    index; re-rank by exact cosine distance when quantized.
+    """
+    _, operator = VECTOR_INDEX_OPS[settings.VECTOR_QUANTIZATION]
+    return quantized(column).op(operator, return_type=Float)(quantized(query_vector))
+
+
+def vector_index_options() -> dict:
+    """
+    Index build options for the configured VECTOR_INDEX_KIND.
+    
+    Returns:
+        Dict with 'postgresql_using' and 'postgresql_with'
+    """
+    if settings.VECTOR_INDEX_KIND == 'hnsw':
+        return {
+            'postgresql_using': 'hnsw',
+            'postgresql_with': {
+                'm': settings.VECTOR_INDEX_HNSW_M,
+                'ef_construction': settings.VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+            },
+        }
+    return {
+        'postgresql_using': 'ivfflat',
+        'postgresql_with': {'lists': settings.VECTOR_INDEX_IVFFLAT_LISTS},
+    }
+
+
+def vector_index(name: str, column: Column) -> Index:
+    """
+    Vector index on an embedding column, on its compact form when
+    VECTOR_QUANTIZATION is set (an expression index; the table keeps the
+    full vectors for exact re-ranking).
+    """
+    operator_class, _ = VECTOR_INDEX_OPS[settings.VECTOR_QUANTIZATION]
+    if settings.VECTOR_QUANTIZATION == 'none':
+        expression, key = column, column.name
+    else:
+        key = f"{column.name}_{settings.VECTOR_QUANTIZATION}"
+        expression = quantized(column).label(key)
+    return Index(
+        name,
+        expression,
+        postgresql_ops={key: operator_class},
+        **vector_index_options()
+    )
+
+
+def vector_index_ddl(
+    name: str,
+    table: str,
+    column: str,
+    concurrently: bool = False,
+    only: bool = False,
+    dimension: Optional[int] = None,
+    quantization: Optional[str] = None
+) -> str:
+    """
+    CREATE INDEX statement matching vector_index(), for migrations and scripts.
+    
+    Args:
+        name: Index name
+        table: Table name
+        column: Vector column name
+        concurrently: Build without blocking writes (cannot run in a transaction)
+        only: Create on a partitioned table only (ON ONLY), without building
+            partition indexes; invalid until one is attached per partition
+        dimension: Dimension of the column (default: EMBEDDING_DIMENSION)
+        quantization: Index form (default: VECTOR_QUANTIZATION)
+        
+    Returns:
+        SQL string
+    """
+    dimension = dimension or settings.EMBEDDING_DIMENSION
+    quantization = quantization or settings.VECTOR_QUANTIZATION
+    operator_class, _ = VECTOR_INDEX_OPS[quantization]
+    expression = {
+        'none': column,
+        'halfvec': f"CAST({column} AS halfvec({dimension}))",
+        'binary': f"CAST(binary_quantize({column}) AS bit({dimension}))",
+    }[quantization]
+    
+    options = vector_index_options()
+    with_clause = ", ".join(f"{key} = {value}" for key, value in options['postgresql_with'].items())
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+        f"ON {'ONLY ' if only else ''}{table} USING {options['postgresql_using']} ({expression} {operator_class}) "
+        f"WITH ({with_clause})"
+    )
+
+
+def workout_partition_ddl(
+    parent: str = "%(fullname)s",
+    partitions: Optional[int] = None,
+    name_prefix: Optional[str] = None
+) -> List[str]:
+    """
+    CREATE statements for the hash partitions of workout_log_embeddings.
+    
+    Partitions are named <name_prefix>_p<remainder>. The default parent is
+    the DDL() placeholder for the table's (schema-qualified) name.
+    
+    Args:
+        parent: Partitioned table name
+        partitions: Partition count (default: WORKOUT_EMBEDDING_PARTITIONS)
+        name_prefix: Partition name prefix (default: parent)
+        
+    Returns:
+        SQL strings
+    """
+    modulus = partitions or settings.WORKOUT_EMBEDDING_PARTITIONS
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name_prefix or parent}_p{remainder} PARTITION OF {parent} "
+        f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        for remainder in range(modulus)
+    ]
+
 
 class ExerciseEmbedding(Base):
     """
@@ -32,7 +211,13 @@ class ExerciseEmbedding(Base):
     
     # Content
     embedding_text = Column(Text, nullable=False)  # Combined text from name + description
-    embedding = Column(Vector(1536), nullable=False)  # OpenAI text-embedding-3-small dimension
+    embedding = Column(
+        settings.EMBEDDING_COLUMN,
+        Vector(settings.EMBEDDING_DIMENSION),
+        nullable=False
+    )  # Column name/dimension are configurable, see migrate_embedding_dimension.py
+    
+    search_vector = search_vector_column('embedding_text')  # Lexical leg of hybrid search
     
     # Metadata for filtering (from backend Exercise entity)
     muscle_group = Column(String(50))  # Matches backend muscleGroup
@@ -42,13 +227,8 @@ class ExerciseEmbedding(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     __table_args__ = (
-        Index(
-            'idx_exercise_embeddings_vector',
-            'embedding',
-            postgresql_using='ivfflat',
-            postgresql_with={'lists': 100},
-            postgresql_ops={'embedding': 'vector_cosine_ops'}
-        ),
+        vector_index('idx_exercise_embeddings_vector', embedding),
+        Index('idx_exercise_embeddings_fts', search_vector, postgresql_using='gin'),
     )
 
     def __repr__(self):
@@ -60,16 +240,28 @@ class WorkoutLogEmbedding(Base):
     Workout log embeddings for personalized user history RAG.
     
     Stores vector embeddings of user workout logs (last 3-6 months only).
+    
+    Hash partitioned by user_id (WORKOUT_EMBEDDING_PARTITIONS partitions,
+    see migration 005): searches filter by user, so PostgreSQL prunes to one
+    partition. That shrinks the pool an index scan walks, but the user
+    filter still runs after it; see WORKOUT_SEARCH_EXACT. Unique keys must
+    include the partition key, hence (user_id, id) and
+    (user_id, workout_log_id).
     """
     __tablename__ = "workout_log_embeddings"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, nullable=False, index=True)
-    workout_log_id = Column(BigInteger, nullable=False, unique=True)
+    user_id = Column(BigInteger, primary_key=True, index=True)
+    workout_log_id = Column(BigInteger, nullable=False)
     
     # Content
     summary_text = Column(Text, nullable=False)
-    embedding = Column(Vector(1536), nullable=False)  # OpenAI text-embedding-3-small dimension
+    embedding = Column(
+        settings.EMBEDDING_COLUMN,
+        Vector(settings.EMBEDDING_DIMENSION),
+        nullable=False
+    )  # Column name/dimension are configurable, see migrate_embedding_dimension.py
+    search_vector = search_vector_column('summary_text')  # Lexical leg of hybrid search
     
     # Metadata
     workout_date = Column(Date, nullable=False, index=True)
@@ -82,46 +274,53 @@ class WorkoutLogEmbedding(Base):
     __table_args__ = (
         Index('idx_workout_embeddings_user', 'user_id'),
         Index('idx_workout_embeddings_date', 'workout_date'),
-        Index(
-            'idx_workout_embeddings_vector',
-            'embedding',
-            postgresql_using='ivfflat',
-            postgresql_with={'lists': 100},
-            postgresql_ops={'embedding': 'vector_cosine_ops'}
-        ),
+        Index('idx_workout_embeddings_user_date', 'user_id', 'workout_date'),  # Date-window searches
+        vector_index('idx_workout_embeddings_vector', embedding),
+        Index('idx_workout_embeddings_fts', search_vector, postgresql_using='gin'),
+        UniqueConstraint('user_id', 'workout_log_id', name='uq_workout_embeddings_user_log'),
+        {'postgresql_partition_by': 'HASH (user_id)'},
     )
 
     def __repr__(self):
         return f"<WorkoutLogEmbedding(id={self.id}, user_id={self.user_id}, workout_log_id={self.workout_log_id})>"
 
 
+# create_all() only creates the partitioned parent; add its partitions
+for _statement in workout_partition_ddl():
+    event.listen(WorkoutLogEmbedding.__table__, 'after_create', DDL(_statement))
+
+
 class KnowledgeBase(Base):
     """
     Curated gym knowledge base for RAG.
     
     Stores manually curated or scraped gym knowledge (form tips, nutrition, etc.)
+    as chunks of source documents (see ingest_knowledge.py): each row is one
+    chunk, identified by (source, chunk_index).
     """
     __tablename__ = "knowledge_base"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     
-    title = Column(String(200), nullable=False)
+    title = Column(String(200), nullable=False)  # Document title and section heading
     content = Column(Text, nullable=False)
-    category = Column(String(50), index=True)  # 'form', 'nutrition', 'recovery', 'programming'
-    embedding = Column(Vector(1536), nullable=False)  # OpenAI text-embedding-3-small dimension
-    source = Column(String(100))
+    category = Column(String(50), index=True)  # One of KNOWLEDGE_CATEGORIES
+    embedding = Column(
+        settings.EMBEDDING_COLUMN,
+        Vector(settings.EMBEDDING_DIMENSION),
+        nullable=False
+    )  # Column name/dimension are configurable, see migrate_embedding_dimension.py
+    search_vector = search_vector_column('content')  # Lexical leg of hybrid search
+    source = Column(String(255))  # Source document path
+    chunk_index = Column(Integer, nullable=False, default=0)  # Position in the source document
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     __table_args__ = (
         Index('idx_knowledge_category', 'category'),
-        Index(
-            'idx_knowledge_embedding',
-            'embedding',
-            postgresql_using='ivfflat',
-            postgresql_with={'lists': 100},
-            postgresql_ops={'embedding': 'vector_cosine_ops'}
-        ),
+        vector_index('idx_knowledge_embedding', embedding),
+        Index('idx_knowledge_fts', search_vector, postgresql_using='gin'),
+        Index('uq_knowledge_source_chunk', 'source', 'chunk_index', unique=True),  # Ingestion upsert target
     )
 
     def __repr__(self):
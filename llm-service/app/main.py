@@ -1,11 +1,14 @@
 from fastapi import FastAPI
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.core.security import setup_cors
-from app.core.redis_client import get_redis_pool, verify_redis_connection
+from app.core.redis_client import get_redis_pool, get_redis_binary_pool, verify_redis_connection
 from app.api.routes_health import router as health_router
 from app.api.routes_chat import router as chat_router
+from app.api.routes_metrics import router as metrics_router
+from app.services.vector_search_service import get_vector_search_service
 
 # ====================================
 # Logging Configuration
@@ -29,18 +32,47 @@ app = FastAPI(
     redoc_url=settings.REDOC_URL,
 )
 
+# Readiness is reported by /health/ready once startup warm-up finishes
+app.state.ready = False
+
 # Setup middleware
 setup_cors(app)
 
 # Include routers
 app.include_router(health_router)
 app.include_router(chat_router)
+app.include_router(metrics_router)
 
 
 # ====================================
 # Lifecycle Events
 # ====================================
 
+async def warm_up_embedding_cache():
+    """
+    Preload embeddings for the most frequent recent search queries
+    
+    Bounded by EMBEDDING_WARMUP_TIMEOUT_SECONDS. The service is marked
+    ready when warm-up completes, fails or times out.
+    """
+    try:
+        if settings.EMBEDDING_WARMUP_QUERIES > 0:
+            warmed = await asyncio.wait_for(
+                get_vector_search_service().warm_up(settings.EMBEDDING_WARMUP_QUERIES),
+                timeout=settings.EMBEDDING_WARMUP_TIMEOUT_SECONDS
+            )
+            logger.info(f"✅ Embedding cache warmed ({warmed} queries)")
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"⚠️ Embedding warm-up timed out after {settings.EMBEDDING_WARMUP_TIMEOUT_SECONDS}s"
+        )
+    except Exception as e:
+        logger.error(f"❌ Embedding warm-up failed: {e}")
+    finally:
+        app.state.ready = True
+        logger.info("✅ Service ready")
+
+
 @app.on_event("startup")
 async def startup_event():
     """
@@ -49,6 +81,7 @@ async def startup_event():
     Initializes and verifies all required connections:
     - Redis connection pool
     - OpenAI API configuration
+    - Embedding cache warm-up for hot search queries (background task)
     """
     logger.info(f"🚀 Starting {settings.APP_NAME} v{settings.VERSION}")
     
@@ -62,6 +95,9 @@ async def startup_event():
     except Exception as e:
         logger.error(f"❌ Failed to verify Redis connection: {e}")
     
+    # Warm embedding cache in the background; /health/ready flips when done
+    app.state.warmup_task = asyncio.create_task(warm_up_embedding_cache())
+    
     logger.info("✅ Application startup complete")
 
 
@@ -75,10 +111,14 @@ async def shutdown_event():
     """
     logger.info("🛑 Shutting down application...")
     
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    
     try:
-        pool = get_redis_pool()
-        await pool.disconnect()
-        logger.info("✅ Redis connection pool closed")
+        await get_redis_pool().disconnect()
+        await get_redis_binary_pool().disconnect()
+        logger.info("✅ Redis connection pools closed")
     except Exception as e:
         logger.error(f"❌ Error closing Redis pool: {e}")
     
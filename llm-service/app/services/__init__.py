@@ -3,7 +3,7 @@
 from app.services.openai_service import OpenAIService, get_openai_service
 from app.services.memory_service import MemoryService, get_memory_service
 from app.services.embedding_service import EmbeddingService, get_embedding_service
-from app.services.vector_search_service import VectorSearchService, get_vector_search_service, SearchResult
+from app.services.vector_search_service import VectorSearchService, get_vector_search_service, SearchResult, SearchTuning, SearchQuery
 
 __all__ = [
     "OpenAIService",
@@ -15,4 +15,6 @@ __all__ = [
     "VectorSearchService",
     "get_vector_search_service",
     "SearchResult",
+    "SearchTuning",
+    "SearchQuery",
 ]
@@ -0,0 +1,91 @@
+import logging
+from typing import List, Optional
+
+from redis.asyncio import Redis
+
+from app.core.redis_client import get_redis, get_redis_sync
+
+logger = logging.getLogger(__name__)
+
+# Redis keys: rag:version:{scope}, e.g. rag:version:exercise_embeddings
+VERSION_KEY_PREFIX = "rag:version"
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def user_scope(table: str, user_id: int) -> str:
+    """Version scope of one user's rows in a table, e.g. workout_log_embeddings:user:1"""
+    return f"{table}:user:{user_id}"
+
+
+async def get_data_version(scope: str, redis: Optional[Redis] = None) -> int:
+    """
+    Get the current data version of a RAG table (or other scope).
+
+    Versions are monotonically increasing counters bumped by sync_data.py
+    after it writes rows. Readers compare versions to detect stale
+    in-process state without querying PostgreSQL.
+
+    Args:
+        scope: Version scope (usually a table name)
+        redis: Redis client (default: shared pool)
+
+    Returns:
+        Current version (0 if never bumped)
+    """
+    redis = redis or get_redis()
+    value = await redis.get(_version_key(scope))
+    return int(value) if value else 0
+
+
+async def get_data_versions(scopes: List[str], redis: Optional[Redis] = None) -> List[int]:
+    """
+    Get the current data versions of several scopes with one round trip.
+
+    Args:
+        scopes: Version scopes
+        redis: Redis client (default: shared pool)
+
+    Returns:
+        Versions in the order of scopes (0 if never bumped)
+    """
+    redis = redis or get_redis()
+    values = await redis.mget([_version_key(scope) for scope in scopes])
+    return [int(value) if value else 0 for value in values]
+
+
+async def bump_data_version(scope: str, redis: Optional[Redis] = None) -> int:
+    """
+    Increment the data version of a scope after writing its data.
+
+    Args:
+        scope: Version scope (usually a table name)
+        redis: Redis client (default: shared pool)
+
+    Returns:
+        New version
+    """
+    redis = redis or get_redis()
+    version = await redis.incr(_version_key(scope))
+    logger.info(f"Data version bumped: {scope} -> {version}")
+    return version
+
+
+def bump_data_versions_sync(scopes: List[str]) -> List[int]:
+    """
+    Blocking variant of bump_data_version for code outside the event loop
+    (Alembic migrations that rewrite RAG tables).
+
+    Args:
+        scopes: Version scopes
+
+    Returns:
+        New versions in the order of scopes
+    """
+    with get_redis_sync() as redis:
+        versions = [redis.incr(_version_key(scope)) for scope in scopes]
+    for scope, version in zip(scopes, versions):
+        logger.info(f"Data version bumped: {scope} -> {version}")
+    return versions
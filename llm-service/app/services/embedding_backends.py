@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import math
+import re
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Optional
+
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.utils.vectors import Embedding, from_base64, to_float32, np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface for embedding providers used by EmbeddingService.
+
+    Backends only turn a list of texts into vectors; caching, batching,
+    token packing and retries stay in EmbeddingService.
+    """
+
+    # Identifier used in cache keys so vectors from different backends never mix
+    model: str
+    native_dimension: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str], dimension: int) -> List[Embedding]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed (one packed request)
+            dimension: Output dimension
+
+        Returns:
+            float32 vectors in input order
+        """
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embeddings API (text-embedding-3-small)."""
+
+    model = "text-embedding-3-small"
+    native_dimension = 1536
+
+    def __init__(self):
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is not set in environment variables")
+
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+    async def embed(self, texts: List[str], dimension: int) -> List[Embedding]:
+        kwargs = {}
+        if dimension != self.native_dimension:
+            kwargs["dimensions"] = dimension
+
+        # base64 decodes straight into a float32 buffer instead of boxed floats
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            encoding_format="base64",
+            **kwargs
+        )
+
+        return [
+            from_base64(item.embedding) if isinstance(item.embedding, str)
+            else to_float32(item.embedding)
+            for item in response.data
+        ]
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic local embeddings from hashed n-gram features.
+
+    Word unigrams, word bigrams and character trigrams are hashed (CRC32)
+    into a signed feature vector of the requested dimension, then
+    L2-normalized. Texts sharing words or word fragments get a positive
+    cosine similarity, which is enough to exercise the RAG pipeline
+    (sync, vector search, tools) offline and to benchmark it without
+    network calls. Not a substitute for semantic embeddings.
+    """
+
+    model = "local-hashing-ngram-v1"
+    native_dimension = 1536
+
+    _WORD_PATTERN = re.compile(r"\w+")
+
+    async def embed(self, texts: List[str], dimension: int) -> List[Embedding]:
+        # CPU-bound; keep the event loop free for large sync batches
+        return await asyncio.to_thread(
+            lambda: [self.embed_text(text, dimension) for text in texts]
+        )
+
+    def _features(self, text: str) -> List[str]:
+        words = self._WORD_PATTERN.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed_text(self, text: str, dimension: int) -> Embedding:
+        """
+        Embed one text.
+
+        Args:
+            text: Input text
+            dimension: Output dimension
+
+        Returns:
+            L2-normalized float32 vector (all zeros if text has no words)
+        """
+        hashes = [zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)]
+
+        if np is not None:
+            vector = np.zeros(dimension, dtype=np.float32)
+            if hashes:
+                hashes_arr = np.asarray(hashes, dtype=np.uint64)
+                signs = np.where(hashes_arr & (1 << 31), -1.0, 1.0).astype(np.float32)
+                np.add.at(vector, (hashes_arr % dimension).astype(np.intp), signs)
+                norm = np.linalg.norm(vector)
+                if norm > 0:
+                    vector /= norm
+            return vector
+
+        vector = array('f', bytes(4 * dimension))
+        for value in hashes:
+            vector[value % dimension] += -1.0 if value & (1 << 31) else 1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm > 0:
+            for i in range(dimension):
+                vector[i] /= norm
+        return vector
+
+
+EMBEDDING_BACKENDS = {
+    "openai": OpenAIEmbeddingBackend,
+    "local": HashingEmbeddingBackend,
+}
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Create the embedding backend selected by EMBEDDING_BACKEND.
+
+    Args:
+        name: Override backend name ("openai" or "local")
+
+    Returns:
+        EmbeddingBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = name or settings.EMBEDDING_BACKEND
+    try:
+        backend_cls = EMBEDDING_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding backend: {name} (expected one of {sorted(EMBEDDING_BACKENDS)})"
+        )
+
+    logger.info(f"Using embedding backend: {name} ({backend_cls.model})")
+    return backend_cls()
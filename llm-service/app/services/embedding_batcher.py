@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Async micro-batcher for single-text embedding requests.
+
+    Requests submitted within a short window are collected and sent as one
+    batched API call, either when the window closes or as soon as
+    max_batch_size texts are queued. Each caller gets back its own vector.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Awaitable[List[Any]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        """
+        Args:
+            embed_batch: Coroutine function embedding a list of texts in order
+            max_batch_size: Flush as soon as this many texts are queued
+            max_wait_ms: Maximum time a request waits for others to join
+        """
+        self._embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Keep references so dispatch tasks aren't garbage collected mid-flight
+        self._dispatching: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> Any:
+        """
+        Queue a text and wait for its embedding.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector for this text
+
+        Raises:
+            Exception: Whatever the batched API call raised
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._dispatch(batch))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        logger.debug(f"Dispatching micro-batch of {len(batch)} texts")
+
+        try:
+            embeddings = await self._embed_batch([text for text, _ in batch])
+            for (_, future), embedding in zip(batch, embeddings):
+                # Skip callers that were cancelled while waiting
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancellation (e.g. shutdown) or a short result list must not
+            # leave callers waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Embedding micro-batch was not completed"))
@@ -0,0 +1,150 @@
+import sys
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.vectors import vector_nbytes
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """Counters exposed by EmbeddingCache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        lookups = self.hits + self.misses
+        data["hit_rate"] = round(self.hits / lookups, 4) if lookups else 0.0
+        return data
+
+
+def estimate_embedding_size(embedding: Any) -> int:
+    """
+    Estimate the memory footprint of a cached embedding in bytes.
+
+    A Python list of floats costs the list itself plus one boxed float
+    object per element; float32 vectors cost their raw buffer.
+    """
+    if isinstance(embedding, list):
+        item_size = sys.getsizeof(embedding[0]) if embedding else 0
+        return sys.getsizeof(embedding) + item_size * len(embedding)
+    return vector_nbytes(embedding)
+
+
+class EmbeddingCache:
+    """
+    Bounded in-process embedding cache with LRU and TTL eviction.
+
+    Entries are evicted least-recently-used first once either the entry
+    limit or the byte limit is exceeded, and are dropped lazily on lookup
+    once they are older than the TTL.
+
+    A limit of 0 disables that bound.
+    """
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, ttl_seconds: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # {key: (embedding, size_bytes, stored_at)}
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return cached embedding and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached embedding or None on miss/expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        embedding, size, stored_at = entry
+        if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+            self._remove(key)
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return embedding
+
+    def set(self, key: str, embedding: Any) -> None:
+        """
+        Store embedding and evict old entries if limits are exceeded.
+
+        Args:
+            key: Cache key
+            embedding: Embedding vector
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        size = estimate_embedding_size(embedding)
+        if self.max_bytes and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+
+        self._entries[key] = (embedding, size, time.monotonic())
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats.evictions += 1
+
+    def clear(self) -> int:
+        """
+        Remove all entries.
+
+        Returns:
+            Number of entries removed
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+        return count
+
+    def stats(self) -> CacheStats:
+        """Snapshot of counters and current size."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            expirations=self._stats.expirations,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import Counter, defaultdict, deque
+from typing import Any, Deque, Dict
+
+
+class RollingHistogram:
+    """
+    Summary statistics over the most recent samples.
+
+    Keeps a bounded window of raw samples so percentiles reflect current
+    traffic; count and sum cover the whole process lifetime.
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+
+    @staticmethod
+    def _percentile(ordered: list, q: float) -> float:
+        index = max(0, math.ceil(q * len(ordered)) - 1)
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"count": self.count, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "p50": round(self._percentile(ordered, 0.50), 4),
+            "p95": round(self._percentile(ordered, 0.95), 4),
+            "p99": round(self._percentile(ordered, 0.99), 4),
+            "max": round(ordered[-1], 4),
+        }
+
+
+class EmbeddingMetrics:
+    """
+    Counters and histograms for EmbeddingService.
+
+    Lookup outcomes are tracked per caller (e.g. "search", "sync") so cache
+    effectiveness can be compared between the chat path and batch jobs.
+    API call metrics are global because micro-batches mix callers.
+
+    Lookup events:
+        memory_hit, redis_hit, disk_hit: served by that cache tier
+        coalesced: joined an in-flight lookup for the same text
+        miss: needed an API call
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lookups: Dict[str, Counter] = defaultdict(Counter)
+
+        self.api_calls = 0
+        self.api_errors = 0
+        self.texts_embedded = 0
+        self.tokens = 0
+        self.api_latency_ms = RollingHistogram()
+        self.texts_per_call = RollingHistogram()
+
+    def record_lookup(self, caller: str, event: str, count: int = 1) -> None:
+        """
+        Count lookup outcomes for a caller.
+
+        Args:
+            caller: Caller label
+            event: Lookup event (see class docstring)
+            count: Number of texts
+        """
+        if count:
+            with self._lock:
+                self._lookups[caller][event] += count
+
+    def record_api_call(self, texts: int, tokens: int, latency_ms: float, error: bool = False) -> None:
+        """
+        Record one embeddings API call.
+
+        Args:
+            texts: Texts in the request
+            tokens: Tokens in the request (estimated if no tokenizer)
+            latency_ms: Wall time of the call
+            error: Whether the call failed
+        """
+        with self._lock:
+            self.api_calls += 1
+            self.api_latency_ms.observe(latency_ms)
+            if error:
+                self.api_errors += 1
+                return
+            self.texts_embedded += texts
+            self.tokens += tokens
+            self.texts_per_call.observe(texts)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current metrics as a JSON-serializable dict.
+        """
+        with self._lock:
+            callers = {}
+            for caller, counts in self._lookups.items():
+                lookups = sum(counts.values())
+                hits = lookups - counts["miss"]
+                callers[caller] = {
+                    **dict(counts),
+                    "lookups": lookups,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                }
+
+            return {
+                "callers": callers,
+                "api": {
+                    "calls": self.api_calls,
+                    "errors": self.api_errors,
+                    "texts": self.texts_embedded,
+                    "tokens": self.tokens,
+                    "latency_ms": self.api_latency_ms.summary(),
+                    "texts_per_call": self.texts_per_call.summary(),
+                },
+            }
@@ -1,10 +1,11 @@
 import logging
 import hashlib
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 
-from openai import AsyncOpenAI
+from openai import RateLimitError
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -15,37 +16,106 @@ from tenacity import (
 )
 
 from app.core.config import settings
+from app.core.redis_client import get_redis_binary
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_metrics import EmbeddingMetrics
+from app.services.embedding_store import EmbeddingDiskStore
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_backends import EmbeddingBackend, get_embedding_backend
+from app.utils.tokens import estimate_tokens, pack_batches, token_budget, truncate_to_tokens
+from app.utils.vectors import Embedding, from_bytes, to_bytes
 
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
     """
-    Service for generating vector embeddings using OpenAI API.
+    Service for generating vector embeddings.
+    
+    Vectors come from a pluggable EmbeddingBackend selected by
+    EMBEDDING_BACKEND: the OpenAI API by default, or a deterministic local
+    backend for offline runs and benchmarks.
     
     Features:
     - Single and batch embedding generation
-    - In-memory caching to reduce API calls
+    - Compact float32 vectors (NumPy, or array('f') without NumPy)
+    - Bounded in-memory LRU/TTL cache to reduce API calls
+    - Shared Redis cache tier so workers reuse each other's embeddings
+    - Optional persistent disk tier so sync reruns skip unchanged texts
+    - Single-flight coalescing of concurrent identical requests
+    - Micro-batching of concurrent single-text requests into one API call
+    - Token-aware packing of batch requests
+    - Concurrent batch dispatch with adaptive rate limit backoff
     - Automatic retry with exponential backoff
     - Text preparation helpers for exercises and workouts
     """
     
-    # OpenAI embedding model and configuration
+    # Embedding model and configuration (model is replaced by the backend's)
     EMBEDDING_MODEL = "text-embedding-3-small"
-    EMBEDDING_DIMENSION = 1536  # OpenAI text-embedding-3-small dimension
-    MAX_BATCH_SIZE = 100  # OpenAI API limit
+    NATIVE_DIMENSION = 1536  # Full text-embedding-3-small output
+    EMBEDDING_DIMENSION = settings.EMBEDDING_DIMENSION  # Requested via `dimensions` when reduced
+    MAX_BATCH_SIZE = settings.EMBEDDING_MAX_BATCH_SIZE  # Item cap per request (OpenAI limit: 2048)
+    MAX_BATCH_TOKENS = settings.EMBEDDING_MAX_BATCH_TOKENS  # Token budget per request
+    MAX_TEXT_TOKENS = 8191  # text-embedding-3-small input limit
     
-    def __init__(self):
-        """Initialize OpenAI API configuration and cache."""
-        if not settings.OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY is not set in environment variables")
-        
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        backend: Optional[EmbeddingBackend] = None
+    ):
+        """
+        Initialize embedding backend and cache.
         
-        # Simple in-memory cache: {text_hash: embedding}
-        self._cache: Dict[str, List[float]] = {}
+        Args:
+            dimension: Override EMBEDDING_DIMENSION (e.g. when backfilling a
+                shadow column with a different dimension)
+            backend: Override the backend selected by EMBEDDING_BACKEND
+        """
+        if dimension is not None:
+            self.EMBEDDING_DIMENSION = dimension
+        
+        self.backend = backend or get_embedding_backend()
+        self.EMBEDDING_MODEL = self.backend.model
+        self.NATIVE_DIMENSION = self.backend.native_dimension
+        
+        # Bounded in-memory cache: {text_hash: embedding}
+        self._cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        
+        # Shared cache tier: float32 bytes in Redis, keyed by model/dimension
+        self._redis = get_redis_binary() if settings.EMBEDDING_REDIS_CACHE_ENABLED else None
+        
+        # Optional persistent tier for batch jobs (see enable_disk_cache)
+        self._disk_store: Optional[EmbeddingDiskStore] = None
+        if settings.EMBEDDING_DISK_CACHE_PATH:
+            self.enable_disk_cache(settings.EMBEDDING_DISK_CACHE_PATH)
+        
+        # Counters/histograms exposed at /metrics/embeddings
+        self.metrics = EmbeddingMetrics()
+        
+        # In-flight single-text lookups: {text_hash: task}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        # Adaptive rate limit backoff shared by concurrent batches
+        self._backoff_delay = 0.0
+        self._backoff_until = 0.0
+        
+        # Collects single-text API calls from concurrent requests into batches
+        self._batcher: Optional[EmbeddingBatcher] = None
+        if settings.EMBEDDING_BATCH_WINDOW_MS > 0:
+            self._batcher = EmbeddingBatcher(
+                self._call_embeddings_api_packed,
+                max_batch_size=self.MAX_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+            )
         
-        logger.info(f"EmbeddingService initialized with model: {self.EMBEDDING_MODEL}")
+        logger.info(
+            f"EmbeddingService initialized with model: {self.EMBEDDING_MODEL} "
+            f"(dim: {self.EMBEDDING_DIMENSION})"
+        )
     
     def _get_cache_key(self, text: str) -> str:
         """
@@ -59,9 +129,9 @@ class EmbeddingService:
         """
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
-    def _get_from_cache(self, text: str) -> Optional[List[float]]:
+    def _get_from_cache(self, text: str) -> Optional[Embedding]:
         """
-        Retrieve embedding from cache if exists.
+        Retrieve embedding from cache if exists and not expired.
         
         Args:
             text: Input text
@@ -72,16 +142,107 @@ class EmbeddingService:
         cache_key = self._get_cache_key(text)
         return self._cache.get(cache_key)
     
-    def _save_to_cache(self, text: str, embedding: List[float]) -> None:
+    def _save_to_cache(self, text: str, embedding: Embedding) -> None:
         """
-        Save embedding to cache.
+        Save embedding to cache, evicting least recently used entries.
         
         Args:
             text: Input text
             embedding: Generated embedding vector
         """
         cache_key = self._get_cache_key(text)
-        self._cache[cache_key] = embedding
+        self._cache.set(cache_key, embedding)
+    
+    def _get_shared_key(self, cache_key: str) -> str:
+        """
+        Build the key used by the Redis and disk tiers for a cache key.
+        
+        Model and dimension are part of the key so vectors from different
+        embedding configurations never mix.
+        """
+        return f"embedding:{self.EMBEDDING_MODEL}:{self.EMBEDDING_DIMENSION}:{cache_key}"
+    
+    async def _get_from_shared_cache(self, cache_keys: List[str]) -> Dict[str, Embedding]:
+        """
+        Fetch embeddings from the Redis tier in a single MGET round trip.
+        
+        Redis failures are logged and treated as misses.
+        
+        Args:
+            cache_keys: Cache keys to look up
+            
+        Returns:
+            Dict of cache_key -> embedding for keys found in Redis
+        """
+        if self._redis is None or not cache_keys:
+            return {}
+        
+        try:
+            values = await self._redis.mget([self._get_shared_key(key) for key in cache_keys])
+        except Exception as e:
+            logger.warning(f"Redis embedding cache read failed: {e}")
+            return {}
+        
+        found: Dict[str, Embedding] = {}
+        for cache_key, data in zip(cache_keys, values):
+            # Ignore payloads that don't match the configured dimension
+            if data is not None and len(data) == self.EMBEDDING_DIMENSION * 4:
+                found[cache_key] = from_bytes(data)
+        return found
+    
+    async def _save_to_shared_cache(self, embeddings: Dict[str, Embedding]) -> None:
+        """
+        Store embeddings in the Redis tier with TTL (single pipelined round trip).
+        
+        Args:
+            embeddings: Dict of cache_key -> embedding
+        """
+        if self._redis is None or not embeddings:
+            return
+        
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for cache_key, embedding in embeddings.items():
+                    pipe.set(
+                        self._get_shared_key(cache_key),
+                        to_bytes(embedding),
+                        ex=settings.EMBEDDING_REDIS_TTL_SECONDS
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis embedding cache write failed: {e}")
+    
+    async def _get_from_disk_store(self, cache_keys: List[str]) -> Dict[str, Embedding]:
+        """
+        Fetch embeddings from the persistent disk tier.
+        
+        Args:
+            cache_keys: Cache keys to look up
+            
+        Returns:
+            Dict of cache_key -> embedding for keys found on disk
+        """
+        shared_keys = {self._get_shared_key(key): key for key in cache_keys}
+        stored = await self._disk_store.get_many(list(shared_keys))
+        return {
+            shared_keys[shared_key]: embedding
+            for shared_key, embedding in stored.items()
+            if len(embedding) == self.EMBEDDING_DIMENSION
+        }
+    
+    def enable_disk_cache(self, path: str) -> None:
+        """
+        Persist batch embeddings to a SQLite file and reuse them across runs.
+        
+        Only generate_embeddings_batch uses this tier; the single-text chat
+        path stays on memory and Redis.
+        
+        Args:
+            path: SQLite file path (created if missing)
+        """
+        if self._disk_store is not None:
+            self._disk_store.close()
+        self._disk_store = EmbeddingDiskStore(path)
     
     @retry(
         stop=stop_after_attempt(3),
@@ -95,16 +256,167 @@ class EmbeddingService:
         after=after_log(logger, logging.INFO),
         reraise=True
     )
-    async def generate_embedding(self, text: str, use_cache: bool = True) -> List[float]:
+    async def _call_embeddings_api(self, texts: List[str], tokens: int = 0) -> List[Embedding]:
+        """
+        Call the embedding backend for a list of texts.
+        
+        Args:
+            texts: Texts to embed (one packed request)
+            tokens: Token count of the request (for metrics)
+            
+        Returns:
+            Embedding vectors in input order
+            
+        Raises:
+            ValueError: If the backend returns an unexpected dimension
+        """
+        start = time.perf_counter()
+        try:
+            embeddings = await self.backend.embed(texts, self.EMBEDDING_DIMENSION)
+        except Exception:
+            self.metrics.record_api_call(
+                len(texts), tokens, (time.perf_counter() - start) * 1000, error=True
+            )
+            raise
+        self.metrics.record_api_call(len(texts), tokens, (time.perf_counter() - start) * 1000)
+        
+        # Validate embedding dimension
+        for embedding in embeddings:
+            if len(embedding) != self.EMBEDDING_DIMENSION:
+                raise ValueError(
+                    f"Unexpected embedding dimension: {len(embedding)} "
+                    f"(expected {self.EMBEDDING_DIMENSION})"
+                )
+        
+        return embeddings
+    
+    async def _call_embeddings_api_with_backoff(
+        self,
+        texts: List[str],
+        tokens: int = 0
+    ) -> List[Embedding]:
+        """
+        Call embeddings API, backing off adaptively on rate limits.
+        
+        A RateLimitError doubles the shared backoff delay (or uses the
+        server's Retry-After) and pauses every concurrent batch until it
+        passes. Each success halves the delay again.
+        
+        Args:
+            texts: Texts to embed
+            tokens: Token count of the request (for metrics)
+            
+        Returns:
+            Embedding vectors in input order
+            
+        Raises:
+            RateLimitError: If still rate limited after all retries
+        """
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(1, settings.EMBEDDING_RATE_LIMIT_RETRIES + 2):
+            wait = self._backoff_until - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            try:
+                embeddings = await self._call_embeddings_api(texts, tokens)
+            except RateLimitError as e:
+                if attempt > settings.EMBEDDING_RATE_LIMIT_RETRIES:
+                    raise
+                
+                self._backoff_delay = min(max(self._backoff_delay * 2, 1.0), 60.0)
+                delay = self._get_retry_after(e) or self._backoff_delay
+                self._backoff_until = max(self._backoff_until, loop.time() + delay)
+                logger.warning(
+                    f"Embeddings rate limited (attempt {attempt}), backing off {delay:.1f}s"
+                )
+                continue
+            
+            self._backoff_delay /= 2
+            return embeddings
+    
+    @staticmethod
+    def _get_retry_after(error: RateLimitError) -> Optional[float]:
+        """Read Retry-After seconds from a rate limit response, if present."""
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return None
+    
+    def _prepare_input(self, text: str) -> tuple[str, int]:
+        """
+        Truncate text to the model's input limit and count its tokens.
+        
+        Without tiktoken, counts are estimates and texts are cut below the
+        limit (see app.utils.tokens.token_budget).
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Tuple of (text to send, token count)
+        """
+        tokens = estimate_tokens(text, self.EMBEDDING_MODEL)
+        limit = token_budget(self.MAX_TEXT_TOKENS, self.EMBEDDING_MODEL)
+        if tokens > limit:
+            logger.warning(
+                f"Truncating text from {tokens} to {limit} tokens: {text[:50]}..."
+            )
+            text = truncate_to_tokens(text, self.MAX_TEXT_TOKENS, self.EMBEDDING_MODEL)
+            tokens = estimate_tokens(text, self.EMBEDDING_MODEL)
+        return text, tokens
+    
+    async def _call_embeddings_api_packed(self, texts: List[str]) -> List[Embedding]:
+        """
+        Embed texts in as few token-bounded requests as possible.
+        
+        Used for single-text and micro-batched calls, which don't go
+        through the concurrent batch path.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in input order
+        """
+        prepared = [self._prepare_input(text) for text in texts]
+        batches = pack_batches(
+            prepared,
+            [tokens for _, tokens in prepared],
+            max_tokens=self.MAX_BATCH_TOKENS,
+            max_items=self.MAX_BATCH_SIZE,
+            model=self.EMBEDDING_MODEL
+        )
+        
+        embeddings: List[Embedding] = []
+        for batch in batches:
+            embeddings.extend(await self._call_embeddings_api_with_backoff(
+                [text for text, _ in batch],
+                sum(tokens for _, tokens in batch)
+            ))
+        return embeddings
+    
+    async def generate_embedding(
+        self,
+        text: str,
+        use_cache: bool = True,
+        caller: str = "default"
+    ) -> Embedding:
         """
         Generate embedding for a single text.
         
+        Lookup order: in-memory cache -> Redis -> OpenAI API.
+        Concurrent callers for the same uncached text share one lookup
+        (single-flight), so a burst of identical queries makes one API call.
+        
         Args:
             text: Input text to embed
             use_cache: Whether to use cache (default: True)
+            caller: Label for per-caller metrics (e.g. "search", "sync")
             
         Returns:
-            Embedding vector (1536 dimensions for text-embedding-3-small)
+            float32 embedding vector (EMBEDDING_DIMENSION dimensions)
             
         Raises:
             ValueError: If text is empty
@@ -113,59 +425,106 @@ class EmbeddingService:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
         
-        # Check cache first
+        if not use_cache:
+            return await self._fetch_embedding(text, caller, use_cache=False)
+        
+        # Check in-memory cache first
+        cached = self._get_from_cache(text)
+        if cached is not None:
+            logger.debug(f"Cache hit for text: {text[:50]}...")
+            self.metrics.record_lookup(caller, "memory_hit")
+            return cached
+        
+        # Join an in-flight lookup for the same text, or start one
+        cache_key = self._get_cache_key(text)
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_embedding(text, caller))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._on_inflight_done(cache_key, done))
+        else:
+            logger.debug(f"Joining in-flight request for text: {text[:50]}...")
+            self.metrics.record_lookup(caller, "coalesced")
+        
+        # Shield so one cancelled caller doesn't cancel the shared lookup
+        return await asyncio.shield(task)
+    
+    def _on_inflight_done(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a finished in-flight lookup."""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    async def _fetch_embedding(self, text: str, caller: str, use_cache: bool = True) -> Embedding:
+        """
+        Resolve an embedding that missed the in-memory cache.
+        
+        Args:
+            text: Input text to embed
+            caller: Label for per-caller metrics
+            use_cache: Whether to read/write the cache tiers
+            
+        Returns:
+            Embedding vector
+        """
+        cache_key = self._get_cache_key(text)
+        
         if use_cache:
-            cached = self._get_from_cache(text)
-            if cached is not None:
-                logger.debug(f"Cache hit for text: {text[:50]}...")
-                return cached
+            shared = await self._get_from_shared_cache([cache_key])
+            if cache_key in shared:
+                logger.debug(f"Redis cache hit for text: {text[:50]}...")
+                self.metrics.record_lookup(caller, "redis_hit")
+                self._save_to_cache(text, shared[cache_key])
+                return shared[cache_key]
         
         logger.debug(f"Generating embedding for text: {text[:50]}...")
+        self.metrics.record_lookup(caller, "miss")
         
         try:
-            # Call OpenAI API
-            response = await self.client.embeddings.create(
-                model=self.EMBEDDING_MODEL,
-                input=text
-            )
-            
-            embedding = response.data[0].embedding
-            
-            # Validate embedding dimension
-            if len(embedding) != self.EMBEDDING_DIMENSION:
-                raise ValueError(
-                    f"Unexpected embedding dimension: {len(embedding)} "
-                    f"(expected {self.EMBEDDING_DIMENSION})"
-                )
-            
-            # Save to cache
-            if use_cache:
-                self._save_to_cache(text, embedding)
-            
-            logger.debug(f"Successfully generated embedding (dim: {len(embedding)})")
-            return embedding
-            
+            if self._batcher is not None:
+                embedding = await self._batcher.submit(text)
+            else:
+                embedding = (await self._call_embeddings_api_packed([text]))[0]
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
+        
+        # Save to cache tiers
+        if use_cache:
+            self._save_to_cache(text, embedding)
+            await self._save_to_shared_cache({cache_key: embedding})
+        
+        logger.debug(f"Successfully generated embedding (dim: {len(embedding)})")
+        return embedding
     
     async def generate_embeddings_batch(
         self,
         texts: List[str],
-        use_cache: bool = True
-    ) -> List[List[float]]:
+        use_cache: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        caller: str = "default"
+    ) -> List[Embedding]:
         """
         Generate embeddings for multiple texts with batching.
         
-        This method automatically splits large lists into batches
-        of MAX_BATCH_SIZE to comply with API limits.
+        Cached texts are resolved from memory, then from Redis with a
+        single MGET, then from the disk store if enabled. Remaining unique
+        texts are packed into requests of at most MAX_BATCH_TOKENS tokens
+        and MAX_BATCH_SIZE texts (texts over MAX_TEXT_TOKENS are truncated),
+        and the requests are sent concurrently. Results are returned in
+        input order.
         
         Args:
             texts: List of texts to embed
             use_cache: Whether to use cache (default: True)
+            progress_callback: Optional callable(done, total) invoked after
+                each batch completes, counting texts that needed an API call
+            caller: Label for per-caller metrics (e.g. "search", "sync")
             
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors
             
         Raises:
             ValueError: If texts list is empty
@@ -175,62 +534,124 @@ class EmbeddingService:
         
         logger.info(f"Generating embeddings for {len(texts)} texts")
         
-        embeddings: List[List[float]] = []
+        cache_keys = [self._get_cache_key(text) for text in texts]
+        resolved: Dict[str, Embedding] = {}
+        # Which tier served each unique key (for metrics)
+        sources: Dict[str, str] = {}
         
-        # Process in batches
-        for i in range(0, len(texts), self.MAX_BATCH_SIZE):
-            batch = texts[i:i + self.MAX_BATCH_SIZE]
-            batch_num = i // self.MAX_BATCH_SIZE + 1
-            total_batches = (len(texts) + self.MAX_BATCH_SIZE - 1) // self.MAX_BATCH_SIZE
+        # Check cache tiers: memory first, then one MGET for the rest
+        if use_cache:
+            for cache_key in cache_keys:
+                if cache_key not in resolved:
+                    cached = self._cache.get(cache_key)
+                    if cached is not None:
+                        resolved[cache_key] = cached
+                        sources[cache_key] = "memory_hit"
             
-            logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} texts)")
+            missing = list(dict.fromkeys(key for key in cache_keys if key not in resolved))
+            shared = await self._get_from_shared_cache(missing)
+            for cache_key, embedding in shared.items():
+                self._cache.set(cache_key, embedding)
+                sources[cache_key] = "redis_hit"
+            resolved.update(shared)
             
-            # Check cache and separate cached/uncached
-            cached_embeddings: Dict[int, List[float]] = {}
-            uncached_texts: List[tuple[int, str]] = []
+            # Persistent disk tier (sync reruns), promoted to the faster tiers
+            if self._disk_store is not None:
+                missing = [key for key in missing if key not in resolved]
+                stored = await self._get_from_disk_store(missing)
+                for cache_key, embedding in stored.items():
+                    self._cache.set(cache_key, embedding)
+                    sources[cache_key] = "disk_hit"
+                await self._save_to_shared_cache(stored)
+                resolved.update(stored)
+        
+        # Unique texts that still need an API call
+        uncached: Dict[str, str] = {}
+        for cache_key, text in zip(cache_keys, texts):
+            if cache_key not in resolved:
+                uncached.setdefault(cache_key, text)
+                sources.setdefault(cache_key, "miss")
+        
+        # Repeated texts in the same call are served by the first occurrence
+        seen = set()
+        for cache_key in cache_keys:
+            self.metrics.record_lookup(caller, "coalesced" if cache_key in seen else sources[cache_key])
+            seen.add(cache_key)
+        
+        logger.info(
+            f"{len(texts) - sum(key in uncached for key in cache_keys)} cached, "
+            f"{len(uncached)} need API call"
+        )
+        
+        # Pack requests by token budget and item cap, truncating oversize texts
+        uncached_items: List[tuple[str, str, int]] = []
+        token_counts: List[int] = []
+        for cache_key, text in uncached.items():
+            text, tokens = self._prepare_input(text)
+            uncached_items.append((cache_key, text, tokens))
+            token_counts.append(tokens)
+        
+        batches = pack_batches(
+            uncached_items,
+            token_counts,
+            max_tokens=self.MAX_BATCH_TOKENS,
+            max_items=self.MAX_BATCH_SIZE,
+            model=self.EMBEDDING_MODEL
+        )
+        
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_BATCH_CONCURRENCY)
+        done_count = 0
+        
+        async def process_batch(batch_num: int, batch: List[tuple[str, str, int]]) -> None:
+            nonlocal done_count
             
-            for idx, text in enumerate(batch):
-                if use_cache:
-                    cached = self._get_from_cache(text)
-                    if cached is not None:
-                        cached_embeddings[idx] = cached
-                        continue
+            async with semaphore:
+                logger.debug(f"Processing batch {batch_num}/{len(batches)} ({len(batch)} texts)")
                 
-                uncached_texts.append((idx, text))
-            
-            logger.info(
-                f"Batch {batch_num}: {len(cached_embeddings)} cached, "
-                f"{len(uncached_texts)} need API call"
-            )
-            
-            # Generate embeddings for uncached texts
-            if uncached_texts:
                 try:
-                    # Extract just the texts for API call
-                    texts_to_embed = [text for _, text in uncached_texts]
-                    
-                    # Call OpenAI API for batch
-                    response = await self.client.embeddings.create(
-                        model=self.EMBEDDING_MODEL,
-                        input=texts_to_embed
+                    batch_embeddings = await self._call_embeddings_api_with_backoff(
+                        [text for _, text, _ in batch],
+                        sum(tokens for _, _, tokens in batch)
                     )
-                    
-                    # Store results with original indices
-                    for (idx, text), embedding_data in zip(uncached_texts, response.data):
-                        embedding = embedding_data.embedding
-                        cached_embeddings[idx] = embedding
-                        
-                        # Save to cache
-                        if use_cache:
-                            self._save_to_cache(text, embedding)
-                
                 except Exception as e:
                     logger.error(f"Batch {batch_num} failed: {e}")
                     raise
             
-            # Reconstruct embeddings in original order
-            batch_embeddings = [cached_embeddings[idx] for idx in range(len(batch))]
-            embeddings.extend(batch_embeddings)
+            generated = {
+                cache_key: embedding
+                for (cache_key, _, _), embedding in zip(batch, batch_embeddings)
+            }
+            resolved.update(generated)
+            
+            # Save to cache tiers as each batch lands, so a failed run keeps its progress
+            if use_cache:
+                for cache_key, embedding in generated.items():
+                    self._cache.set(cache_key, embedding)
+                await self._save_to_shared_cache(generated)
+                if self._disk_store is not None:
+                    await self._disk_store.put_many({
+                        self._get_shared_key(key): embedding
+                        for key, embedding in generated.items()
+                    })
+            
+            done_count += len(batch)
+            if progress_callback is not None:
+                progress_callback(done_count, len(uncached_items))
+        
+        # Send batches concurrently (bounded by EMBEDDING_BATCH_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(process_batch(batch_num, batch))
+            for batch_num, batch in enumerate(batches, start=1)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        # Reconstruct embeddings in original order
+        embeddings = [resolved[cache_key] for cache_key in cache_keys]
         
         logger.info(f"Successfully generated {len(embeddings)} embeddings")
         return embeddings
@@ -347,8 +768,7 @@ class EmbeddingService:
         Returns:
             Number of entries cleared
         """
-        count = len(self._cache)
-        self._cache.clear()
+        count = self._cache.clear()
         logger.info(f"Cleared {count} entries from embedding cache")
         return count
     
@@ -360,6 +780,31 @@ class EmbeddingService:
             Number of cached embeddings
         """
         return len(self._cache)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with hits, misses, evictions, expirations, entries, bytes and hit_rate
+        """
+        return self._cache.stats().to_dict()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get cache and API metrics.
+        
+        Returns:
+            Dict with in-memory cache stats, per-caller lookup counters and
+            API call/latency/batch-size/token statistics
+        """
+        return {
+            "model": self.EMBEDDING_MODEL,
+            "dimension": self.EMBEDDING_DIMENSION,
+            "cache": self.get_cache_stats(),
+            "inflight": len(self._inflight),
+            **self.metrics.snapshot(),
+        }
 
 
 # Singleton instance factory
@@ -374,7 +819,7 @@ def get_embedding_service() -> EmbeddingService:
         EmbeddingService instance
         
     Raises:
-        ValueError: If OPENAI_API_KEY is not configured
+        ValueError: If the backend is misconfigured (e.g. OPENAI_API_KEY not set)
     """
     global _embedding_service
     
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from app.utils.vectors import Embedding, from_bytes, to_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDiskStore:
+    """
+    Persistent content-addressed embedding store (SQLite sidecar file).
+
+    Keys already encode model, dimension and text hash, so a store file can
+    be shared by runs with different embedding settings. Vectors are stored
+    as float32 blobs. Used by sync_data.py so reruns and crash restarts
+    skip texts that were already embedded.
+    """
+
+    # SQLite's default limit on bound parameters is 999 on older builds
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+        logger.info(f"Embedding disk store opened: {path}")
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Embedding]:
+        found: Dict[str, Embedding] = {}
+        with self._lock:
+            for i in range(0, len(keys), self._LOOKUP_CHUNK):
+                chunk = keys[i:i + self._LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                )
+                for key, blob in rows:
+                    found[key] = from_bytes(blob)
+        return found
+
+    def _put_many(self, embeddings: Dict[str, Embedding]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, to_bytes(vector), now) for key, vector in embeddings.items()]
+            )
+            self._conn.commit()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Embedding]:
+        """
+        Look up stored embeddings.
+
+        Args:
+            keys: Store keys
+
+        Returns:
+            Dict of key -> embedding for keys found
+        """
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def put_many(self, embeddings: Dict[str, Embedding]) -> None:
+        """
+        Persist embeddings (committed immediately).
+
+        Args:
+            embeddings: Dict of key -> embedding
+        """
+        if embeddings:
+            await asyncio.to_thread(self._put_many, embeddings)
+
+    def count(self) -> int:
+        """Number of stored embeddings."""
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.database import AsyncSessionLocal
+from app.db.models import ExerciseEmbedding
+from app.services.data_version import get_data_version
+from app.utils.vectors import Embedding, np
+
+logger = logging.getLogger(__name__)
+
+
+class ExerciseIndex:
+    """
+    In-process exact cosine index of exercise_embeddings.
+
+    The exercise catalog is small (hundreds to low thousands of rows), so a
+    dense float32 matrix of L2-normalized vectors fits comfortably in each
+    worker (~6 KB per exercise at 1536 dims) and a full matrix-vector
+    product is faster than a pgvector round trip. Results are exact, unlike
+    an ivfflat scan that only probes some lists.
+
+    Freshness: sync_data.py bumps the "exercise_embeddings" data version in
+    Redis after writing rows. The index checks the version at most every
+    EXERCISE_INDEX_REFRESH_SECONDS and, when it changed, loads only rows
+    with updated_at at or after the newest row it already has, and drops
+    exercises whose rows were deleted (diff of the table's exercise ids).
+    Anything that deletes rows must bump the data version too.
+    """
+
+    VERSION_SCOPE = "exercise_embeddings"
+
+    def __init__(self, refresh_interval: Optional[float] = None, redis: Optional[Redis] = None):
+        """
+        Create an empty index (loaded lazily on first search).
+
+        Args:
+            refresh_interval: Seconds between version checks
+                (default: EXERCISE_INDEX_REFRESH_SECONDS)
+            redis: Redis client for the data version (default: shared pool)
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("ExerciseIndex requires numpy")
+
+        self.refresh_interval = (
+            settings.EXERCISE_INDEX_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self.redis = redis or get_redis()
+        self.dimension = settings.EMBEDDING_DIMENSION
+
+        # Row i of the matrix describes _rows[i]; exercise_id -> row position
+        self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        self._rows: List[Dict[str, Any]] = []
+        self._positions: Dict[int, int] = {}
+        # muscle_group -> boolean row mask
+        self._group_masks: Dict[str, Any] = {}
+
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._version: Optional[int] = None
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _is_fresh(self) -> bool:
+        return self._loaded and time.monotonic() - self._checked_at < self.refresh_interval
+
+    async def ensure_fresh(self) -> None:
+        """
+        Load the index, or apply new rows if the data version changed.
+
+        If Redis is unavailable the incremental load runs on every check
+        interval instead (cheap on a small table).
+        """
+        if self._is_fresh():
+            return
+
+        async with self._lock:
+            if self._is_fresh():
+                return
+
+            try:
+                version = await get_data_version(self.VERSION_SCOPE, self.redis)
+            except Exception as e:
+                logger.warning(f"Could not read exercise data version: {e}")
+                version = None
+
+            if not self._loaded or version is None or version != self._version:
+                await self._load_changes()
+                self._version = version
+
+            self._checked_at = time.monotonic()
+
+    async def _load_changes(self) -> None:
+        """Upsert rows changed since the watermark and drop deleted rows, into a new matrix."""
+        stmt = select(
+            ExerciseEmbedding.id,
+            ExerciseEmbedding.exercise_id,
+            ExerciseEmbedding.embedding_text,
+            ExerciseEmbedding.muscle_group,
+            ExerciseEmbedding.embedding,
+            ExerciseEmbedding.updated_at,
+        )
+        if self._watermark is not None:
+            # >= so rows written in the same instant as the watermark are not missed
+            stmt = stmt.where(ExerciseEmbedding.updated_at >= self._watermark)
+
+        async with AsyncSessionLocal() as session:
+            changed = (await session.execute(stmt)).all()
+            # Deleted rows never show up as changed; diff the (small) id set
+            live_ids = set((await session.execute(select(ExerciseEmbedding.exercise_id))).scalars())
+
+        kept = [position for position, row in enumerate(self._rows) if row['exercise_id'] in live_ids]
+        removed = len(self._rows) - len(kept)
+
+        if not changed and not removed and self._loaded:
+            return
+
+        rows = [self._rows[position] for position in kept]
+        positions = {row['exercise_id']: position for position, row in enumerate(rows)}
+        new_count = sum(1 for row in changed if row.exercise_id not in positions)
+
+        matrix = np.empty((len(rows) + new_count, self.dimension), dtype=np.float32)
+        matrix[:len(rows)] = self._matrix[kept]
+
+        watermark = self._watermark
+        for row in changed:
+            position = positions.get(row.exercise_id)
+            if position is None:
+                position = len(rows)
+                positions[row.exercise_id] = position
+                rows.append({})
+
+            rows[position] = {
+                'id': row.id,
+                'exercise_id': row.exercise_id,
+                'embedding_text': row.embedding_text,
+                'muscle_group': row.muscle_group,
+            }
+            vector = np.asarray(row.embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            matrix[position] = vector / norm if norm > 0 else vector
+
+            if watermark is None or row.updated_at > watermark:
+                watermark = row.updated_at
+
+        groups = np.array([row['muscle_group'] for row in rows], dtype=object)
+        group_masks = {
+            group: groups == group
+            for group in {row['muscle_group'] for row in rows}
+            if group is not None
+        }
+
+        # Swap in one step; searches in flight keep using the old arrays
+        self._matrix = matrix
+        self._rows = rows
+        self._positions = positions
+        self._group_masks = group_masks
+        self._watermark = watermark
+        self._loaded = True
+
+        logger.info(
+            f"Exercise index refreshed: {len(changed)} rows changed, {removed} removed, {len(rows)} total"
+        )
+
+    async def search(
+        self,
+        query_embedding: Embedding,
+        limit: int = 5,
+        muscle_group: Optional[str] = None,
+        min_similarity: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Exact cosine top-k over the exercise catalog.
+
+        Args:
+            query_embedding: Query vector
+            limit: Maximum results
+            muscle_group: Only return exercises of this muscle group
+            min_similarity: Minimum cosine similarity
+
+        Returns:
+            Exercise dicts (id, exercise_id, embedding_text, muscle_group,
+            similarity), most similar first
+        """
+        await self.ensure_fresh()
+
+        matrix, rows, group_masks = self._matrix, self._rows, self._group_masks
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or limit <= 0 or not rows:
+            return []
+        query = query / norm
+
+        # Same truthiness as the pgvector path: "" means no filter
+        if muscle_group:
+            mask = group_masks.get(muscle_group)
+            if mask is None:
+                return []
+            candidates = np.flatnonzero(mask)
+            scores = matrix[candidates] @ query
+        else:
+            candidates = np.arange(len(rows))
+            scores = matrix @ query
+
+        keep = np.flatnonzero(scores >= min_similarity)
+        if keep.size > limit:
+            keep = keep[np.argpartition(-scores[keep], limit - 1)[:limit]]
+        keep = keep[np.argsort(-scores[keep], kind='stable')]
+
+        return [
+            {**rows[candidates[i]], 'similarity': float(scores[i])}
+            for i in keep
+        ]
+
+
+# Singleton
+_exercise_index: Optional[ExerciseIndex] = None
+
+
+def get_exercise_index() -> ExerciseIndex:
+    """Get or create singleton instance."""
+    global _exercise_index
+    if _exercise_index is None:
+        _exercise_index = ExerciseIndex()
+    return _exercise_index
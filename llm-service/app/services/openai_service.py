@@ -1,5 +1,6 @@
 import json
 import logging
+from datetime import date
 from typing import Optional, List, Any, Dict
 from functools import lru_cache
 from fastapi import HTTPException
@@ -231,6 +232,8 @@ class OpenAIService:
             HTTPException: If API call fails after retries
         """
         messages = self._build_messages(request, memory_messages)
+        # Lets the model turn relative dates ("last week") into tool date filters
+        messages.insert(1, {"role": "system", "content": f"Today's date: {date.today().isoformat()}"})
         openai_tools = self._convert_tools_to_openai_format(tools)
         
         try:
@@ -341,6 +344,13 @@ class OpenAIService:
                     parts.append(f"• {w['summary_text'][:MAX_TEXT_LENGTH]}")
                     parts.append(f"  Date: {w['workout_date']}, Similarity: {w['similarity']:.2f}")
             
+            elif tool_name == 'search_knowledge':
+                parts.append("\n=== Gym Knowledge Base (RAG) ===")
+                results = result.get('results', [])[:MAX_RESULTS_PER_TOOL]
+                for chunk in results:
+                    parts.append(f"• {chunk['title']}: {chunk['content'][:MAX_TEXT_LENGTH]}")
+                    parts.append(f"  Category: {chunk['category']}, Similarity: {chunk['similarity']:.2f}")
+            
             elif tool_name == 'get_user_stats':
                 stats = result.get('stats', {})
                 parts.append(f"\n=== User Statistics (last {stats.get('days', 30)} days) ===")
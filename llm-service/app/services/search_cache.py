@@ -0,0 +1,207 @@
+import hashlib
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.models import ExerciseEmbedding, KnowledgeBase, WorkoutLogEmbedding
+from app.services.data_version import get_data_versions, user_scope
+
+logger = logging.getLogger(__name__)
+
+
+def _params_hash(*params: Any) -> str:
+    return hashlib.md5(json.dumps(params).encode('utf-8')).hexdigest()
+
+
+async def _versions(scopes: List[str], redis: Optional[Redis]) -> Optional[str]:
+    try:
+        versions = await get_data_versions(scopes, redis)
+    except Exception as e:
+        logger.debug(f"Failed to read data versions {scopes}: {e}")
+        return None
+    return "v" + ".".join(str(version) for version in versions)
+
+
+async def exercise_cache_scope(
+    limit: int,
+    muscle_group: Optional[str] = None,
+    redis: Optional[Redis] = None
+) -> Optional[str]:
+    """
+    Cache scope of search_exercises calls: filters, the embedding column and
+    the current exercise_embeddings data version, e.g. "exercises:v3:{hash}".
+
+    Results may only be reused within one scope, so bumping the data
+    version invalidates every cache keyed by it.
+
+    Returns:
+        Scope, or None if versions could not be read (skip caching)
+    """
+    versions = await _versions([ExerciseEmbedding.__tablename__], redis)
+    if versions is None:
+        return None
+    return f"exercises:{versions}:{_params_hash(settings.EMBEDDING_COLUMN, muscle_group, limit)}"
+
+
+async def workout_cache_scope(
+    user_id: int,
+    limit: int,
+    redis: Optional[Redis] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    recency_weight: Optional[float] = None
+) -> Optional[str]:
+    """
+    Cache scope of search_user_workouts calls: user, limit, date window,
+    recency weight, the embedding column and the current table and per-user
+    workout data versions.
+
+    Returns:
+        Scope, or None if versions could not be read (skip caching)
+    """
+    table = WorkoutLogEmbedding.__tablename__
+    versions = await _versions([table, user_scope(table, user_id)], redis)
+    if versions is None:
+        return None
+    params = _params_hash(
+        settings.EMBEDDING_COLUMN,
+        limit,
+        since.isoformat() if since else None,
+        until.isoformat() if until else None,
+        settings.WORKOUT_RECENCY_WEIGHT if recency_weight is None else recency_weight
+    )
+    return f"workouts:{user_id}:{versions}:{params}"
+
+
+async def knowledge_cache_scope(
+    limit: int,
+    category: Optional[str] = None,
+    redis: Optional[Redis] = None
+) -> Optional[str]:
+    """
+    Cache scope of search_knowledge calls: category, limit, the embedding
+    column and the current knowledge_base data version (bumped by
+    ingest_knowledge.py).
+
+    Returns:
+        Scope, or None if versions could not be read (skip caching)
+    """
+    versions = await _versions([KnowledgeBase.__tablename__], redis)
+    if versions is None:
+        return None
+    return f"knowledge:{versions}:{_params_hash(settings.EMBEDDING_COLUMN, category, limit)}"
+
+
+class SearchResultCache:
+    """
+    Redis cache of vector search results.
+
+    Keys combine a cache scope (filters and data versions, see
+    exercise_cache_scope / workout_cache_scope / knowledge_cache_scope) with the normalized query:
+
+        rag:search:{scope}:{hash(query)}
+
+    Writers invalidate entries just by bumping data versions: sync_data.py
+    and ingest_knowledge.py after they write, migrate_embedding_dimension.py
+    after drop-old, and the Alembic revisions that rewrite RAG tables (005,
+    008). Entries of old versions are never read again and expire after
+    SEARCH_RESULT_CACHE_TTL_SECONDS. Scopes also include EMBEDDING_COLUMN,
+    so switching embedding columns starts from an empty cache.
+
+    The TTL is the staleness bound for every other write: rows changed
+    without a version bump (manual SQL, a bump that failed because Redis
+    was down) can be served from the cache for up to
+    SEARCH_RESULT_CACHE_TTL_SECONDS. Queries are normalized (case and
+    whitespace) before hashing. Search tuning is not part of the key.
+
+    All failures are logged and treated as misses; search never depends
+    on Redis.
+    """
+
+    KEY_PREFIX = "rag:search"
+
+    def __init__(self, redis: Optional[Redis] = None, ttl: Optional[int] = None):
+        """
+        Args:
+            redis: Redis client (default: shared pool)
+            ttl: Entry lifetime in seconds (default: SEARCH_RESULT_CACHE_TTL_SECONDS)
+        """
+        self.redis = redis or get_redis()
+        self.ttl = ttl or settings.SEARCH_RESULT_CACHE_TTL_SECONDS
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase and collapse whitespace so trivially different queries share entries."""
+        return " ".join(query.lower().split())
+
+    def _key(self, scope: str, query: str) -> str:
+        return f"{self.KEY_PREFIX}:{scope}:{_params_hash(self.normalize_query(query))}"
+
+    async def get(self, scope: Optional[str], query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached results of a query.
+
+        Args:
+            scope: Cache scope (None: skip caching)
+            query: Search query
+
+        Returns:
+            Results, or None on a miss
+        """
+        if scope is None:
+            return None
+
+        try:
+            value = await self.redis.get(self._key(scope, query))
+        except Exception as e:
+            logger.debug(f"Failed to read search result cache: {e}")
+            return None
+
+        if value is None:
+            return None
+
+        try:
+            results = json.loads(value)
+            for result in results:
+                if result.get('workout_date'):
+                    result['workout_date'] = date.fromisoformat(result['workout_date'])
+        except (ValueError, TypeError, AttributeError) as e:
+            # Corrupt or foreign entry: drop it so the next search rewrites it
+            logger.warning(f"Discarding unreadable search result cache entry: {e}")
+            try:
+                await self.redis.delete(self._key(scope, query))
+            except Exception as delete_error:
+                logger.debug(f"Failed to delete search result cache entry: {delete_error}")
+            return None
+        return results
+
+    async def set(self, scope: Optional[str], query: str, results: List[Dict[str, Any]]) -> None:
+        """Store results of a query (no-op if scope is None)."""
+        if scope is None:
+            return
+
+        try:
+            value = json.dumps(
+                results,
+                default=lambda v: v.isoformat() if isinstance(v, date) else str(v)
+            )
+            await self.redis.set(self._key(scope, query), value, ex=self.ttl)
+        except Exception as e:
+            logger.debug(f"Failed to write search result cache: {e}")
+
+
+# Singleton
+_search_result_cache: Optional[SearchResultCache] = None
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """Get or create singleton instance."""
+    global _search_result_cache
+    if _search_result_cache is None:
+        _search_result_cache = SearchResultCache()
+    return _search_result_cache
@@ -0,0 +1,126 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.vectors import Embedding, np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    In-process cache of search results for near-duplicate queries.
+
+    Paraphrases ("best chest exercises", "top chest moves") miss the exact
+    result cache but have almost identical embeddings. This cache keeps the
+    embeddings of recent queries as rows of a small float32 matrix
+    (L2-normalized) and returns the results of the most similar cached
+    query when its cosine similarity reaches the threshold.
+
+    Entries are partitioned by cache scope (filters plus data versions, see
+    app.services.search_cache), so a sync invalidates them like the Redis
+    result cache. The matrix is a ring buffer: when full, the oldest entry
+    is overwritten. Per worker, nothing is shared between processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            max_entries: Cached queries (default: SEMANTIC_CACHE_MAX_ENTRIES)
+            threshold: Minimum cosine similarity for a hit
+                (default: SEMANTIC_CACHE_THRESHOLD)
+            ttl: Entry lifetime in seconds (default: SEMANTIC_CACHE_TTL_SECONDS)
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("SemanticCache requires numpy")
+
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.ttl = settings.SEMANTIC_CACHE_TTL_SECONDS if ttl is None else ttl
+
+        # Row i holds the query embedding of entry i (zero rows are empty)
+        self._matrix = np.zeros((self.max_entries, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        self._scopes = np.full(self.max_entries, None, dtype=object)
+        self._expires_at = np.zeros(self.max_entries, dtype=np.float64)
+        self._results: List[Optional[List[Dict[str, Any]]]] = [None] * self.max_entries
+        self._next = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at > time.monotonic()))
+
+    @staticmethod
+    def _normalize(embedding: Embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(self, scope: Optional[str], query_embedding: Embedding) -> Optional[List[Dict[str, Any]]]:
+        """
+        Results of the most similar cached query in the same scope.
+
+        Args:
+            scope: Cache scope (None: skip caching)
+            query_embedding: Embedding of the new query
+
+        Returns:
+            Copy of the cached results, or None if no cached query reaches
+            the threshold
+        """
+        if scope is None:
+            return None
+
+        query = self._normalize(query_embedding)
+        candidates = np.flatnonzero(
+            (self._scopes == scope) & (self._expires_at > time.monotonic())
+        )
+        if query is None or candidates.size == 0:
+            self.misses += 1
+            return None
+
+        scores = self._matrix[candidates] @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+        return [dict(result) for result in self._results[candidates[best]]]
+
+    def set(self, scope: Optional[str], query_embedding: Embedding, results: List[Dict[str, Any]]) -> None:
+        """Cache results of a query (no-op if scope is None)."""
+        query = self._normalize(query_embedding)
+        if scope is None or query is None:
+            return
+
+        position = self._next
+        self._next = (self._next + 1) % self.max_entries
+
+        self._matrix[position] = query
+        self._scopes[position] = scope
+        self._expires_at[position] = time.monotonic() + self.ttl if self.ttl else np.inf
+        self._results[position] = [dict(result) for result in results]
+
+
+# Singleton
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get or create singleton instance."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
@@ -1,7 +1,9 @@
 import logging
-from typing import Dict, Any, List
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Any, List, Optional
 
-from app.services.vector_search_service import get_vector_search_service
+from app.services.vector_search_service import get_vector_search_service, SearchQuery, SearchTuning
 from app.clients.backend_client import BackendAPIClient
 
 logger = logging.getLogger(__name__)
@@ -10,6 +12,17 @@ logger = logging.getLogger(__name__)
 class ToolExecutor:
     """Execute tools requested by OpenAI Function Calling"""
     
+    # Per-tool pgvector recall/latency trade-off. Filters run after the
+    # index scan (see VectorSearchService._apply_tuning): the wider the
+    # candidate list, the more likely `limit` rows survive a selective
+    # filter such as the user of a workout search. Workout search only
+    # uses the index with WORKOUT_SEARCH_EXACT off.
+    SEARCH_TUNING = {
+        "search_exercises": SearchTuning(),
+        "search_user_workouts": SearchTuning(ef_search=100, probes=20),
+        "search_knowledge": SearchTuning(),
+    }
+    
     def __init__(self):
         self.search_service = get_vector_search_service()
     
@@ -39,6 +52,9 @@ class ToolExecutor:
             elif tool_name == "search_user_workouts":
                 return await self._search_user_workouts(tool_args, user_id)
             
+            elif tool_name == "search_knowledge":
+                return await self._search_knowledge(tool_args)
+            
             elif tool_name == "get_user_stats":
                 return await self._get_user_stats(tool_args, user_id)
             
@@ -57,7 +73,8 @@ class ToolExecutor:
         results = await self.search_service.search_exercises(
             query=args['query'],
             limit=args.get('limit', 5),
-            muscle_group=args.get('muscle_group')
+            muscle_group=args.get('muscle_group'),
+            tuning=self.SEARCH_TUNING["search_exercises"]
         )
         
         return {
@@ -66,12 +83,21 @@ class ToolExecutor:
             "count": len(results)
         }
     
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[date]:
+        """Parse an optional YYYY-MM-DD tool argument"""
+        return date.fromisoformat(value) if value else None
+    
     async def _search_user_workouts(self, args: Dict, user_id: int) -> Dict:
         """Execute search_user_workouts tool"""
         results = await self.search_service.search_user_workouts(
             user_id=user_id,
             query=args['query'],
-            limit=args.get('limit', 5)
+            limit=args.get('limit', 5),
+            tuning=self.SEARCH_TUNING["search_user_workouts"],
+            since=self._parse_date(args.get('since')),
+            until=self._parse_date(args.get('until')),
+            recency_weight=args.get('recency_weight')
         )
         
         return {
@@ -80,6 +106,21 @@ class ToolExecutor:
             "count": len(results)
         }
     
+    async def _search_knowledge(self, args: Dict) -> Dict:
+        """Execute search_knowledge tool"""
+        results = await self.search_service.search_knowledge(
+            query=args['query'],
+            limit=args.get('limit', 5),
+            category=args.get('category'),
+            tuning=self.SEARCH_TUNING["search_knowledge"]
+        )
+        
+        return {
+            "tool": "search_knowledge",
+            "results": results,
+            "count": len(results)
+        }
+    
     async def _get_user_stats(self, args: Dict, user_id: int) -> Dict:
         """Execute get_user_stats tool"""
         async with BackendAPIClient() as client:
@@ -115,21 +156,94 @@ class ToolExecutor:
             "count": len(workouts)
         }
     
+    # Tools whose calls are batched into one *_many search per turn
+    BATCHED_SEARCHES = ("search_exercises", "search_user_workouts")
+    
+    async def _search_many(
+        self,
+        tool_name: str,
+        args_list: List[Dict],
+        user_id: int
+    ) -> List[Dict]:
+        """
+        Execute several calls of one search tool with a single batched search.
+        
+        Every argument of a call is carried by its SearchQuery, so each
+        call gets the results it would get on its own.
+        """
+        queries = [
+            SearchQuery(
+                query=args['query'],
+                limit=args.get('limit', 5),
+                muscle_group=args.get('muscle_group'),
+                since=self._parse_date(args.get('since')),
+                until=self._parse_date(args.get('until')),
+                recency_weight=args.get('recency_weight')
+            )
+            for args in args_list
+        ]
+        tuning = self.SEARCH_TUNING[tool_name]
+        
+        if tool_name == "search_exercises":
+            results = await self.search_service.search_exercises_many(queries, tuning=tuning)
+        else:
+            results = await self.search_service.search_user_workouts_many(user_id, queries, tuning=tuning)
+        
+        return [
+            {
+                "tool": tool_name,
+                "results": result,
+                "count": len(result)
+            }
+            for result in results
+        ]
+    
     async def execute_multiple(
         self,
         tool_calls: List[Dict[str, Any]],
         user_id: int
     ) -> List[Dict[str, Any]]:
-        """Execute multiple tools in parallel (if needed)"""
-        results = []
-        
-        for tool_call in tool_calls:
-            result = await self.execute(
-                tool_name=tool_call['name'],
-                tool_args=tool_call['args'],
-                user_id=user_id
-            )
-            results.append(result)
+        """
+        Execute multiple tools, batching repeated searches.
+        
+        When a turn requests the same search tool several times, all its
+        queries are embedded in one API call and searched in one database
+        round trip. If the batch fails (e.g. one call has a malformed date),
+        its calls run one by one, so only the bad call reports an error.
+        Other tools run one by one. Results keep the order of tool_calls.
+        """
+        results: List[Dict[str, Any]] = [None] * len(tool_calls)
+        
+        batches: Dict[str, List[int]] = defaultdict(list)
+        for i, tool_call in enumerate(tool_calls):
+            if tool_call['name'] in self.BATCHED_SEARCHES and 'query' in tool_call['args']:
+                batches[tool_call['name']].append(i)
+        
+        for tool_name, indexes in batches.items():
+            if len(indexes) < 2:
+                continue
+            
+            logger.info(f"Executing {len(indexes)} {tool_name} calls as one batch")
+            try:
+                batch_results = await self._search_many(
+                    tool_name,
+                    [tool_calls[i]['args'] for i in indexes],
+                    user_id
+                )
+            except Exception as e:
+                logger.warning(f"Batched {tool_name} failed, running calls one by one: {e}")
+                continue
+            
+            for i, result in zip(indexes, batch_results):
+                results[i] = result
+        
+        for i, tool_call in enumerate(tool_calls):
+            if results[i] is None:
+                results[i] = await self.execute(
+                    tool_name=tool_call['name'],
+                    tool_args=tool_call['args'],
+                    user_id=user_id
+                )
         
         return results
 
@@ -1,11 +1,29 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Dict, Any, Optional
 from dataclasses import dataclass
-from sqlalchemy import select
+from sqlalchemy import Date, Integer, Select, Text, and_, bindparam, cast, func, literal_column, or_, select, text, true
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.redis_client import get_redis
 from app.services.embedding_service import get_embedding_service
+from app.services.exercise_index import get_exercise_index
+from app.services.search_cache import (
+    exercise_cache_scope,
+    get_search_result_cache,
+    knowledge_cache_scope,
+    workout_cache_scope,
+)
+from app.services.semantic_cache import get_semantic_cache
+from app.utils.vectors import Embedding, np
 from app.db.database import AsyncSessionLocal
-from app.db.models import ExerciseEmbedding, WorkoutLogEmbedding
+from app.db.models import FTS_CONFIG, ExerciseEmbedding, KnowledgeBase, WorkoutLogEmbedding, index_distance
+from pgvector.sqlalchemy import Vector
+from pgvector.utils import to_db
 
 logger = logging.getLogger(__name__)
 
@@ -19,120 +37,1333 @@ class SearchResult:
     total_results: int
 
 
+@dataclass(frozen=True)
+class SearchTuning:
+    """
+    Per-query pgvector recall/latency trade-off (None = settings default).
+    
+    Only the knob for the configured VECTOR_INDEX_KIND is applied. The
+    knobs bound how many candidates the index scan yields before WHERE
+    filters run, so filtered searches need higher values (see _apply_tuning).
+    """
+    ef_search: Optional[int] = None  # HNSW candidate list size
+    probes: Optional[int] = None  # ivfflat lists scanned
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """One query of a batched search (search_exercises_many / search_user_workouts_many)."""
+    query: str
+    limit: int = 5
+    muscle_group: Optional[str] = None  # Exercises only
+    since: Optional[date] = None  # Workouts only
+    until: Optional[date] = None  # Workouts only
+    recency_weight: Optional[float] = None  # Workouts only (default: WORKOUT_RECENCY_WEIGHT)
+
+
 class VectorSearchService:
     """Semantic search service for RAG."""
     
     MIN_SIMILARITY = 0.7  # Filter out irrelevant results
     
-    def __init__(self):
+    # Daily sorted sets of query -> count, used for startup warm-up
+    HOT_QUERY_KEY_PREFIX = "rag:hot_queries"
+    HOT_QUERY_MAX_LENGTH = 512  # Longer queries are unlikely to repeat
+    HOT_QUERY_MAX_PER_DAY = 10_000  # Keep only the top entries per day
+    
+    def __init__(self, record_queries: bool = True, cache_results: bool = True):
+        """
+        Args:
+            record_queries: Count queries in Redis for startup warm-up
+                (disabled by benchmarks so synthetic traffic is not recorded)
+            cache_results: Serve repeated searches from the Redis result
+                cache (SEARCH_RESULT_CACHE_ENABLED) and near-duplicate ones
+                from the semantic cache (SEMANTIC_CACHE_ENABLED); disabled
+                by benchmarks
+        """
         self.embedding_service = get_embedding_service()
+        self.redis = get_redis()
+        self.record_queries = record_queries
+        self.result_cache = (
+            get_search_result_cache() if cache_results and settings.SEARCH_RESULT_CACHE_ENABLED else None
+        )
+        self.semantic_cache = (
+            get_semantic_cache()
+            if cache_results and settings.SEMANTIC_CACHE_ENABLED and np is not None
+            else None
+        )
+        # Exact in-memory index for the (small) exercise catalog
+        self.exercise_index = (
+            get_exercise_index() if settings.EXERCISE_INDEX_ENABLED and np is not None else None
+        )
+    
+    def _hot_query_key(self, day: datetime) -> str:
+        return f"{self.HOT_QUERY_KEY_PREFIX}:{day.strftime('%Y%m%d')}"
+    
+    async def _record_query(self, query: str) -> None:
+        """
+        Count a search query in today's hot query set.
+        
+        Failures are logged and ignored; search never depends on Redis.
+        """
+        if not self.record_queries or not query or len(query) > self.HOT_QUERY_MAX_LENGTH:
+            return
+        
+        key = self._hot_query_key(datetime.now(timezone.utc))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zincrby(key, 1, query)
+                pipe.zremrangebyrank(key, 0, -(self.HOT_QUERY_MAX_PER_DAY + 1))
+                pipe.expire(key, timedelta(days=settings.HOT_QUERY_WINDOW_DAYS + 1))
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Failed to record search query: {e}")
+    
+    async def _embed_query(self, query: str) -> Embedding:
+        """Embed a search query and record it for warm-up (concurrently)."""
+        query_embedding, _ = await asyncio.gather(
+            self.embedding_service.generate_embedding(query, caller="search"),
+            self._record_query(query)
+        )
+        return query_embedding
+    
+    async def get_hot_queries(self, limit: int) -> List[str]:
+        """
+        Most frequent search queries over the last HOT_QUERY_WINDOW_DAYS.
+        
+        Args:
+            limit: Maximum number of queries
+            
+        Returns:
+            Queries ordered by count (descending)
+        """
+        today = datetime.now(timezone.utc)
+        counts: Counter = Counter()
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for days_ago in range(settings.HOT_QUERY_WINDOW_DAYS):
+                pipe.zrevrange(
+                    self._hot_query_key(today - timedelta(days=days_ago)),
+                    0, limit - 1,
+                    withscores=True
+                )
+            for day_entries in await pipe.execute():
+                for query, count in day_entries:
+                    counts[query] += count
+        
+        return [query for query, _ in counts.most_common(limit)]
+    
+    async def warm_up(self, limit: int) -> int:
+        """
+        Preload embeddings for the hottest recent queries.
+        
+        Embeds them with one batch call so the first searches after a deploy
+        hit the in-memory cache (and the Redis tier) instead of the API.
+        
+        Args:
+            limit: Number of hot queries to preload
+            
+        Returns:
+            Number of queries warmed
+        """
+        queries = await self.get_hot_queries(limit)
+        if not queries:
+            logger.info("No recorded search queries to warm up")
+            return 0
+        
+        await self.embedding_service.generate_embeddings_batch(queries, caller="warmup")
+        logger.info(f"Warmed embedding cache with {len(queries)} hot queries")
+        return len(queries)
+    
+    async def _apply_tuning(self, session: AsyncSession, tuning: Optional[SearchTuning]) -> None:
+        """
+        Set the index search knobs for the current transaction (SET LOCAL).
+        
+        Filtered searches trade recall for speed: an index scan yields about
+        ef_search (HNSW) or probes lists' worth (ivfflat) of the nearest
+        rows over the whole index, and WHERE filters (muscle_group,
+        category, user_id) are applied to those candidates afterwards. With
+        a selective filter few or none of them match, so a search can return
+        fewer than limit rows although matching rows exist. Higher knob
+        values (ToolExecutor.SEARCH_TUNING) shrink that gap at the cost of
+        latency; VECTOR_ITERATIVE_SCAN (pgvector >= 0.8) closes it by
+        scanning on until enough rows pass the filters.
+        
+        SET does not take bind parameters, so values are validated as ints.
+        """
+        tuning = tuning or SearchTuning()
+        if settings.VECTOR_INDEX_KIND == 'hnsw':
+            ef_search = int(tuning.ef_search or settings.VECTOR_SEARCH_EF_SEARCH)
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+            if settings.VECTOR_ITERATIVE_SCAN:
+                await session.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+        else:
+            probes = int(tuning.probes or settings.VECTOR_SEARCH_PROBES)
+            await session.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
+            if settings.VECTOR_ITERATIVE_SCAN:
+                # ivfflat only supports relaxed order; results are re-sorted by distance
+                await session.execute(text("SET LOCAL ivfflat.iterative_scan = relaxed_order"))
     
     async def search_exercises(
         self,
         query: str,
         limit: int = 5,
-        muscle_group: Optional[str] = None
+        muscle_group: Optional[str] = None,
+        tuning: Optional[SearchTuning] = None
     ) -> List[Dict[str, Any]]:
         """
         Semantic search for exercises.
         
-        Returns exercises with similarity >= MIN_SIMILARITY, ordered by relevance.
+        Returns exercises with similarity >= MIN_SIMILARITY, plus full-text
+        matches (LEXICAL_SEARCH_ENABLED), ordered by relevance.
+        Served from the in-process exercise index when enabled (falls back
+        to pgvector if it cannot be loaded). Repeated and near-duplicate
+        searches are served from the result caches until exercises are
+        synced again.
         """
         logger.info(f"Searching exercises: '{query}' (limit: {limit})")
         
-        query_embedding = await self.embedding_service.generate_embedding(query)
-        logger.debug(
-            "Query embedding generated for exercises: len=%d type=%s sample=%s",
-            len(query_embedding) if hasattr(query_embedding, '__len__') else -1,
-            type(query_embedding),
-            (query_embedding[:5] if hasattr(query_embedding, '__getitem__') else query_embedding)
+        scope = None
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scope = await exercise_cache_scope(limit, muscle_group, self.redis)
+        
+        return await self._search_cached(
+            scope,
+            query,
+            lambda query_embedding: self._search_exercises_by_vector(
+                query_embedding, limit, muscle_group, tuning, query_text=query
+            )
         )
+    
+    async def _search_cached(
+        self,
+        scope: Optional[str],
+        query: str,
+        search: Callable[[Embedding], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a search through the result caches.
+        
+        1. Redis result cache (same normalized query): skips embedding and
+           the database
+        2. Semantic cache (near-duplicate query embedding): skips the
+           database
+        3. search(query_embedding); results are stored in both caches
+        
+        Args:
+            scope: Cache scope (filters and data versions; None = no caching)
+            query: Search query
+            search: Runs the search for the query embedding
+        """
+        if self.result_cache is not None:
+            cached = await self.result_cache.get(scope, query)
+            if cached is not None:
+                logger.info(f"Search result cache hit ({len(cached)} results)")
+                await self._record_query(query)
+                return cached
+        
+        query_embedding = await self._embed_query(query)
+        
+        results = None
+        if self.semantic_cache is not None:
+            results = self.semantic_cache.get(scope, query_embedding)
+            if results is not None:
+                logger.info(f"Semantic cache hit ({len(results)} results)")
+        
+        if results is None:
+            results = await search(query_embedding)
+            if self.semantic_cache is not None:
+                self.semantic_cache.set(scope, query_embedding, results)
+        
+        if self.result_cache is not None:
+            await self.result_cache.set(scope, query, results)
+        return results
+    
+    async def _search_many_cached(
+        self,
+        scopes: List[Optional[str]],
+        queries: List[str],
+        search: Callable[[List[int], List[Embedding]], Awaitable[List[List[Dict[str, Any]]]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches through the result caches (batched _search_cached).
+        
+        1. Redis result cache hits skip embedding and the database
+        2. The other queries are embedded with one batch call (each
+           distinct text once); semantic cache hits skip the database
+        3. search(...) runs the remaining searches together; results are
+           stored in both caches
+        
+        Args:
+            scopes: Cache scope of each search (None = no caching)
+            queries: Query of each search (same order)
+            search: Runs the searches at the given indexes for their query
+                embeddings (same order), one result list each
+            
+        Returns:
+            One result list per search, in input order
+        """
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        if self.result_cache is not None:
+            results = list(await asyncio.gather(*(
+                self.result_cache.get(scope, query) for scope, query in zip(scopes, queries)
+            )))
+        
+        misses = [i for i, result in enumerate(results) if result is None]
+        missed_queries = list(dict.fromkeys(queries[i] for i in misses))
+        hit_queries = {queries[i] for i, result in enumerate(results) if result is not None}
+        if hit_queries:
+            logger.info(f"Search result cache hits: {len(queries) - len(misses)}/{len(queries)}")
+            await asyncio.gather(*(
+                self._record_query(query) for query in hit_queries.difference(missed_queries)
+            ))
+        if not misses:
+            return results
+        
+        embeddings = dict(zip(missed_queries, await self._embed_queries(missed_queries)))
+        
+        pending = []
+        for i in misses:
+            if self.semantic_cache is not None:
+                results[i] = self.semantic_cache.get(scopes[i], embeddings[queries[i]])
+            if results[i] is None:
+                pending.append(i)
+        if len(pending) < len(misses):
+            logger.info(f"Semantic cache hits: {len(misses) - len(pending)}/{len(queries)}")
+        
+        if pending:
+            found = await search(pending, [embeddings[queries[i]] for i in pending])
+            for i, result in zip(pending, found):
+                results[i] = result
+                if self.semantic_cache is not None:
+                    self.semantic_cache.set(scopes[i], embeddings[queries[i]], result)
+        
+        if self.result_cache is not None:
+            await asyncio.gather(*(
+                self.result_cache.set(scopes[i], queries[i], results[i]) for i in misses
+            ))
+        return results
+    
+    async def _search_exercises_by_vector(
+        self,
+        query_embedding: Embedding,
+        limit: int = 5,
+        muscle_group: Optional[str] = None,
+        tuning: Optional[SearchTuning] = None,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Exercise search for an already embedded query.
+        
+        With query_text (and LEXICAL_SEARCH_ENABLED), full-text matches are
+        fused with the vector results by reciprocal rank fusion.
+        """
+        lexical = query_text is not None and settings.LEXICAL_SEARCH_ENABLED
+        
+        if self.exercise_index is not None:
+            try:
+                if lexical:
+                    # In-memory vector leg and SQL lexical leg run concurrently
+                    candidates = max(limit, settings.RRF_CANDIDATES)
+                    vector_results, lexical_results = await asyncio.gather(
+                        self.exercise_index.search(
+                            query_embedding,
+                            limit=candidates,
+                            muscle_group=muscle_group,
+                            min_similarity=self.MIN_SIMILARITY
+                        ),
+                        self._search_exercises_lexical(
+                            query_text, query_embedding, candidates, muscle_group
+                        )
+                    )
+                    results = self._fuse_ranked(
+                        [vector_results, lexical_results], 'exercise_id', limit
+                    )
+                else:
+                    results = await self.exercise_index.search(
+                        query_embedding,
+                        limit=limit,
+                        muscle_group=muscle_group,
+                        min_similarity=self.MIN_SIMILARITY
+                    )
+                logger.info(
+                    f"Found {len(results)} exercises (similarity >= {self.MIN_SIMILARITY}, in-memory index"
+                    f"{' + lexical' if lexical else ''})"
+                )
+                return results
+            except Exception as e:
+                logger.warning(f"Exercise index unavailable, falling back to pgvector: {e}")
+        
+        # Project only the returned fields; never fetch stored embeddings
+        columns = [
+            ExerciseEmbedding.id,
+            ExerciseEmbedding.exercise_id,
+            ExerciseEmbedding.embedding_text,
+            ExerciseEmbedding.muscle_group,
+        ]
+        filters = [ExerciseEmbedding.muscle_group == muscle_group] if muscle_group else []
         
         async with AsyncSessionLocal() as session:
-            similarity_expr = 1 - ExerciseEmbedding.embedding.cosine_distance(query_embedding)
+            await self._apply_tuning(session, tuning)
             
-            query_stmt = select(
-                ExerciseEmbedding,
-                similarity_expr.label('similarity')
-            ).where(
-                similarity_expr >= self.MIN_SIMILARITY  # Filter threshold
-            )
+            if lexical:
+                query_stmt = self._fused_statement(
+                    ExerciseEmbedding,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    self._ts_query(query_text),
+                    limit
+                )
+            else:
+                query_stmt = self._vector_statement(
+                    ExerciseEmbedding,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    limit
+                )
             
-            if muscle_group:
-                query_stmt = query_stmt.where(ExerciseEmbedding.muscle_group == muscle_group)
+            result = await session.execute(query_stmt)
             
-            # Order by computed similarity (descending): most similar first
-            query_stmt = query_stmt.order_by(similarity_expr.desc()).limit(limit)
+            results = [
+                {**row, 'similarity': float(row['similarity'])}
+                for row in result.mappings()
+            ]
+        logger.debug("Exercise similarities: %s", [r['similarity'] for r in results])
+        
+        logger.info(
+            f"Found {len(results)} exercises (similarity >= {self.MIN_SIMILARITY}"
+            f"{' + lexical' if lexical else ''})"
+        )
+        return results
+    
+    @staticmethod
+    def _exercise_lexical_statement(
+        filters: List[Any],
+        query_vector: Any,
+        ts_query: Any,
+        limit: Any
+    ) -> Select:
+        """
+        Full-text exercise matches ranked by ts_rank_cd (the lexical leg fused
+        with the in-memory vector results).
+        
+        Args:
+            filters: WHERE clauses
+            query_vector: Query vector (value or SQL expression)
+            ts_query: SQL expression of the tsquery
+            limit: Maximum results (int or SQL expression)
             
+        Returns:
+            SELECT of the exercise columns, similarity and rank_score
+        """
+        lexical_rank = func.ts_rank_cd(ExerciseEmbedding.search_vector, ts_query)
+        similarity_expr = 1 - ExerciseEmbedding.embedding.cosine_distance(query_vector)
+        
+        return select(
+            ExerciseEmbedding.id,
+            ExerciseEmbedding.exercise_id,
+            ExerciseEmbedding.embedding_text,
+            ExerciseEmbedding.muscle_group,
+            similarity_expr.label('similarity'),
+            lexical_rank.label('rank_score')
+        ).where(
+            *filters,
+            ExerciseEmbedding.search_vector.op('@@')(ts_query)
+        ).order_by(lexical_rank.desc()).limit(limit).correlate_except(ExerciseEmbedding)
+    
+    async def _search_exercises_lexical(
+        self,
+        query_text: str,
+        query_embedding: Embedding,
+        limit: int,
+        muscle_group: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text exercise matches ranked by ts_rank_cd (for fusion)."""
+        filters = [ExerciseEmbedding.muscle_group == muscle_group] if muscle_group else []
+        query_stmt = self._exercise_lexical_statement(
+            filters, query_embedding, self._ts_query(query_text), limit
+        )
+        
+        async with AsyncSessionLocal() as session:
             result = await session.execute(query_stmt)
-            
             results = []
-            for row in result:
-                exercise, similarity = row[0], row[1]
-                results.append({
-                    'id': exercise.id,
-                    'exercise_id': exercise.exercise_id,
-                    'embedding_text': exercise.embedding_text,
-                    'muscle_group': exercise.muscle_group,
-                    'similarity': float(similarity)
-                })
-        logger.debug("Exercise similarities: %s", [r['similarity'] for r in results])
+            for row in result.mappings():
+                item = dict(row)
+                item.pop('rank_score')
+                item['similarity'] = float(item['similarity'])
+                results.append(item)
+            return results
+    
+    async def _search_exercises_lexical_many(
+        self,
+        queries: List[SearchQuery],
+        embeddings: List[Embedding],
+        limit: int
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Lexical legs of several exercise queries in one SQL statement
+        (unnest ... WITH ORDINALITY and a LATERAL full-text top-k per query).
+        
+        Returns:
+            One result list per query, in input order
+        """
+        query_table = self._query_table(queries, embeddings)
+        hits = self._exercise_lexical_statement(
+            [or_(
+                query_table.c.muscle_group.is_(None),
+                ExerciseEmbedding.muscle_group == query_table.c.muscle_group
+            )],
+            cast(query_table.c.query_vector, Vector(settings.EMBEDDING_DIMENSION)),
+            self._ts_query(query_table.c.query_text),
+            limit
+        ).lateral('hits')
+        
+        query_stmt = select(
+            query_table.c.ordinal, hits
+        ).select_from(
+            query_table
+        ).join(
+            hits, true()
+        ).order_by(query_table.c.ordinal, hits.c.rank_score.desc())
+        
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(query_stmt)
+            
+            results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+            for row in result.mappings():
+                item = dict(row)
+                ordinal = item.pop('ordinal')
+                item.pop('rank_score')
+                item['similarity'] = float(item['similarity'])
+                results[ordinal - 1].append(item)
         
-        logger.info(f"Found {len(results)} exercises (similarity >= {self.MIN_SIMILARITY})")
         return results
     
+    async def _search_exercises_index_many(
+        self,
+        queries: List[SearchQuery],
+        embeddings: List[Embedding]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        search_exercises_many on the in-process exercise index.
+        
+        Vector top-k runs in memory per query; with LEXICAL_SEARCH_ENABLED
+        all lexical legs run concurrently in one SQL statement and are fused
+        per query by reciprocal rank fusion.
+        """
+        lexical = settings.LEXICAL_SEARCH_ENABLED
+        candidates = max(settings.RRF_CANDIDATES, max(q.limit for q in queries))
+        
+        vector_searches = asyncio.gather(*(
+            self.exercise_index.search(
+                embedding,
+                limit=candidates if lexical else q.limit,
+                muscle_group=q.muscle_group,
+                min_similarity=self.MIN_SIMILARITY
+            )
+            for q, embedding in zip(queries, embeddings)
+        ))
+        if not lexical:
+            return list(await vector_searches)
+        
+        vector_results, lexical_results = await asyncio.gather(
+            vector_searches,
+            self._search_exercises_lexical_many(queries, embeddings, candidates)
+        )
+        return [
+            self._fuse_ranked([vector_leg, lexical_leg], 'exercise_id', q.limit)
+            for q, vector_leg, lexical_leg in zip(queries, vector_results, lexical_results)
+        ]
+    
     async def search_user_workouts(
         self,
         user_id: int,
         query: str,
-        limit: int = 5
+        limit: int = 5,
+        tuning: Optional[SearchTuning] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        recency_weight: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Semantic search for user's workout history.
         
-        Returns workouts with similarity >= MIN_SIMILARITY, ordered by relevance.
+        Returns workouts with similarity >= MIN_SIMILARITY, plus full-text
+        matches (LEXICAL_SEARCH_ENABLED), ordered by relevance blended with
+        recency (see _recency_factor).
+        Repeated and near-duplicate searches are served from the result
+        caches until the user's workouts are synced again.
+        
+        Args:
+            user_id: User whose workouts are searched
+            query: Search query
+            limit: Maximum results
+            tuning: Index search knobs
+            since: Only workouts on or after this date
+            until: Only workouts on or before this date
+            recency_weight: Share of the score that decays with workout age
+                (default: WORKOUT_RECENCY_WEIGHT, 0 = relevance only, the
+                baseline ordering)
         """
-        logger.info(f"Searching workouts: user={user_id}, query='{query}' (limit: {limit})")
+        logger.info(
+            f"Searching workouts: user={user_id}, query='{query}' (limit: {limit}, "
+            f"since: {since}, until: {until})"
+        )
+        
+        scope = None
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scope = await workout_cache_scope(
+                user_id, limit, self.redis, since=since, until=until, recency_weight=recency_weight
+            )
         
-        query_embedding = await self.embedding_service.generate_embedding(query)
-        logger.debug(
-            "Query embedding generated for workouts: len=%d type=%s sample=%s",
-            len(query_embedding) if hasattr(query_embedding, '__len__') else -1,
-            type(query_embedding),
-            (query_embedding[:5] if hasattr(query_embedding, '__getitem__') else query_embedding)
+        return await self._search_cached(
+            scope,
+            query,
+            lambda query_embedding: self._search_workouts_by_vector(
+                user_id, query_embedding, limit, tuning, query_text=query,
+                since=since, until=until, recency_weight=recency_weight
+            )
         )
+    
+    @staticmethod
+    def _workout_filters(user_id: int, since: Any = None, until: Any = None) -> List[Any]:
+        """
+        WHERE clauses of a workout search. since/until are dates or SQL
+        expressions (NULL meaning no bound); they let the planner narrow
+        candidates with the (user_id, workout_date) index.
+        """
+        filters = [WorkoutLogEmbedding.user_id == user_id]
+        for bound, clause in (
+            (since, lambda value: WorkoutLogEmbedding.workout_date >= value),
+            (until, lambda value: WorkoutLogEmbedding.workout_date <= value),
+        ):
+            if bound is None:
+                continue
+            if isinstance(bound, date):
+                filters.append(clause(bound))
+            else:
+                filters.append(or_(bound.is_(None), clause(bound)))
+        return filters
+    
+    @staticmethod
+    def _recency_factor(recency_weight: Optional[float] = None) -> Optional[Callable[[Any], Any]]:
+        """
+        Ranking multiplier favouring recent workouts, computed in SQL:
+        
+            (1 - weight) + weight * 0.5 ^ (age_days / WORKOUT_RECENCY_HALF_LIFE_DAYS)
+        
+        It only re-orders the vector / full-text candidates, so scans stay
+        bounded by the candidate count however long the history is.
+        
+        Args:
+            recency_weight: Decaying share of the score (default:
+                WORKOUT_RECENCY_WEIGHT)
+            
+        Returns:
+            Builder of the multiplier from result columns (anything with a
+            workout_date attribute), or None when the weight is 0
+        """
+        weight = settings.WORKOUT_RECENCY_WEIGHT if recency_weight is None else recency_weight
+        if weight <= 0:
+            return None
+        half_life_days = float(settings.WORKOUT_RECENCY_HALF_LIFE_DAYS)
+        
+        def factor(columns: Any) -> Any:
+            age_days = func.greatest(func.current_date() - columns.workout_date, 0)
+            return (1 - weight) + weight * func.power(0.5, age_days / half_life_days)
+        
+        return factor
+    
+    async def _search_workouts_by_vector(
+        self,
+        user_id: int,
+        query_embedding: Embedding,
+        limit: int = 5,
+        tuning: Optional[SearchTuning] = None,
+        query_text: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        recency_weight: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Workout search for an already embedded query.
+        
+        With query_text (and LEXICAL_SEARCH_ENABLED), full-text matches are
+        fused with the vector results by reciprocal rank fusion in the same
+        SQL statement.
+        """
+        lexical = query_text is not None and settings.LEXICAL_SEARCH_ENABLED
+        
+        # Project only the returned fields; never fetch stored embeddings
+        columns = [
+            WorkoutLogEmbedding.id,
+            WorkoutLogEmbedding.user_id,
+            WorkoutLogEmbedding.workout_log_id,
+            WorkoutLogEmbedding.summary_text,
+            WorkoutLogEmbedding.workout_date,
+            WorkoutLogEmbedding.total_volume,
+            WorkoutLogEmbedding.exercise_count,
+        ]
+        filters = self._workout_filters(user_id, since, until)
+        rank_factor = self._recency_factor(recency_weight)
         
         async with AsyncSessionLocal() as session:
-            similarity_expr = 1 - WorkoutLogEmbedding.embedding.cosine_distance(query_embedding)
+            await self._apply_tuning(session, tuning)
             
-            query_stmt = select(
-                WorkoutLogEmbedding,
-                similarity_expr.label('similarity')
-            ).where(
-                WorkoutLogEmbedding.user_id == user_id,
-                similarity_expr >= self.MIN_SIMILARITY  # Filter threshold
-            ).order_by(
-                similarity_expr.desc()  # Order by similarity (desc)
-            ).limit(limit)
+            if lexical:
+                query_stmt = self._fused_statement(
+                    WorkoutLogEmbedding,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    self._ts_query(query_text),
+                    limit,
+                    rank_factor=rank_factor,
+                    exact=settings.WORKOUT_SEARCH_EXACT
+                )
+            else:
+                query_stmt = self._vector_statement(
+                    WorkoutLogEmbedding,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    limit,
+                    rank_factor=rank_factor,
+                    exact=settings.WORKOUT_SEARCH_EXACT
+                )
             
             result = await session.execute(query_stmt)
             
-            results = []
-            for row in result:
-                workout, similarity = row[0], row[1]
-                results.append({
-                    'id': workout.id,
-                    'user_id': workout.user_id,
-                    'workout_log_id': workout.workout_log_id,
-                    'summary_text': workout.summary_text,
-                    'workout_date': workout.workout_date,
-                    'total_volume': workout.total_volume,
-                    'exercise_count': workout.exercise_count,
-                    'similarity': float(similarity)
-                })
+            results = [
+                {**row, 'similarity': float(row['similarity'])}
+                for row in result.mappings()
+            ]
         logger.debug("Workout similarities: %s", [r['similarity'] for r in results])
         
-        logger.info(f"Found {len(results)} workouts (similarity >= {self.MIN_SIMILARITY})")
+        logger.info(
+            f"Found {len(results)} workouts (similarity >= {self.MIN_SIMILARITY}"
+            f"{' + lexical' if lexical else ''}{' + recency' if rank_factor else ''})"
+        )
+        return results
+    
+    async def search_knowledge(
+        self,
+        query: str,
+        limit: int = 5,
+        category: Optional[str] = None,
+        tuning: Optional[SearchTuning] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Semantic search over knowledge base chunks (see ingest_knowledge.py).
+        
+        Returns chunks with similarity >= MIN_SIMILARITY, plus full-text
+        matches (LEXICAL_SEARCH_ENABLED), ordered by relevance. Repeated and
+        near-duplicate searches are served from the result caches until
+        documents are ingested again.
+        
+        Args:
+            query: Search query
+            limit: Maximum results
+            category: Only chunks of this category (KNOWLEDGE_CATEGORIES)
+            tuning: Index search knobs
+        """
+        logger.info(f"Searching knowledge base: '{query}' (limit: {limit}, category: {category})")
+        
+        scope = None
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scope = await knowledge_cache_scope(limit, category, self.redis)
+        
+        return await self._search_cached(
+            scope,
+            query,
+            lambda query_embedding: self._search_knowledge_by_vector(
+                query_embedding, limit, category, tuning, query_text=query
+            )
+        )
+    
+    async def _search_knowledge_by_vector(
+        self,
+        query_embedding: Embedding,
+        limit: int = 5,
+        category: Optional[str] = None,
+        tuning: Optional[SearchTuning] = None,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Knowledge base search for an already embedded query (see _search_workouts_by_vector)."""
+        lexical = query_text is not None and settings.LEXICAL_SEARCH_ENABLED
+        
+        columns = [
+            KnowledgeBase.id,
+            KnowledgeBase.title,
+            KnowledgeBase.content,
+            KnowledgeBase.category,
+            KnowledgeBase.source,
+            KnowledgeBase.chunk_index,
+        ]
+        filters = [KnowledgeBase.category == category] if category else []
+        
+        async with AsyncSessionLocal() as session:
+            await self._apply_tuning(session, tuning)
+            
+            if lexical:
+                query_stmt = self._fused_statement(
+                    KnowledgeBase,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    self._ts_query(query_text),
+                    limit
+                )
+            else:
+                query_stmt = self._vector_statement(
+                    KnowledgeBase,
+                    columns,
+                    filters,
+                    self._query_vector_param(query_embedding),
+                    limit
+                )
+            
+            result = await session.execute(query_stmt)
+            
+            results = [
+                {**row, 'similarity': float(row['similarity'])}
+                for row in result.mappings()
+            ]
+        
+        logger.info(
+            f"Found {len(results)} knowledge chunks (similarity >= {self.MIN_SIMILARITY}"
+            f"{' + lexical' if lexical else ''})"
+        )
+        return results
+    
+    @staticmethod
+    def _query_vector_param(query_embedding: Embedding):
+        """Query vector bound once as :query_embedding (reusable across subqueries)."""
+        return bindparam(
+            'query_embedding', query_embedding, type_=Vector(settings.EMBEDDING_DIMENSION)
+        )
+    
+    @staticmethod
+    def _ts_query(query_text: Any):
+        """
+        websearch_to_tsquery in the generated columns' text search config.
+        
+        Args:
+            query_text: Query string (bound once as :query_text) or SQL expression
+        """
+        if isinstance(query_text, str):
+            query_text = bindparam('query_text', query_text)
+        return func.websearch_to_tsquery(
+            literal_column(f"'{FTS_CONFIG}'::regconfig"),
+            query_text
+        )
+    
+    def _nearest(
+        self,
+        model,
+        columns: List[Any],
+        filters: List[Any],
+        query_vector: Any,
+        limit: Any,
+        exact: bool = False
+    ) -> Select:
+        """
+        Nearest rows with similarity >= MIN_SIMILARITY, selecting columns
+        plus the exact cosine distance (as distance), closest first.
+        
+        ORDER BY distance lets PostgreSQL read candidates from the vector
+        index, with filters applied afterwards (see _apply_tuning). With
+        exact, rows are ordered by similarity DESC instead, which no vector
+        index can serve: the planner scans the rows the filters select
+        (e.g. one user's workouts via the user_id index) and returns the
+        true top rows, however selective the filters are.
+        
+        With VECTOR_QUANTIZATION, limit * VECTOR_RERANK_OVERSAMPLE
+        candidates are read in the order of the compact index (halfvec or
+        binary codes) and re-ranked by exact distance on the full vectors.
+        
+        Args:
+            model: ExerciseEmbedding, WorkoutLogEmbedding or KnowledgeBase
+            columns: Result columns
+            filters: WHERE clauses
+            query_vector: SQL expression of the query vector
+            limit: Maximum rows (int or SQL expression)
+            exact: Scan the filtered rows instead of the vector index
+            
+        Returns:
+            SELECT (correlated to everything but model, so it can run
+            inside a LATERAL)
+        """
+        distance = model.embedding.cosine_distance(query_vector)
+        
+        if exact:
+            return select(
+                *columns, distance.label('distance')
+            ).where(
+                *filters,
+                distance <= 1 - self.MIN_SIMILARITY
+            ).order_by((1 - distance).desc()).limit(limit).correlate_except(model)
+        
+        if settings.VECTOR_QUANTIZATION == 'none':
+            return select(
+                *columns, distance.label('distance')
+            ).where(
+                *filters,
+                distance <= 1 - self.MIN_SIMILARITY
+            ).order_by(distance).limit(limit).correlate_except(model)
+        
+        quantized_hits = select(
+            *columns, distance.label('distance')
+        ).where(
+            *filters
+        ).order_by(
+            index_distance(model.embedding, query_vector)
+        ).limit(limit * settings.VECTOR_RERANK_OVERSAMPLE).correlate_except(model).subquery('quantized_hits')
+        
+        return select(
+            *quantized_hits.c
+        ).where(
+            quantized_hits.c.distance <= 1 - self.MIN_SIMILARITY
+        ).order_by(quantized_hits.c.distance).limit(limit)
+    
+    def _vector_statement(
+        self,
+        model,
+        columns: List[Any],
+        filters: List[Any],
+        query_vector: Any,
+        limit: Any,
+        candidates: Optional[int] = None,
+        rank_factor: Optional[Callable[[Any], Any]] = None,
+        with_score: bool = False,
+        exact: bool = False
+    ) -> Select:
+        """
+        Vector-only search as one statement (counterpart of _fused_statement).
+        
+        Top results by cosine distance with similarity >= MIN_SIMILARITY
+        (see _nearest). With rank_factor, the top candidates by distance are
+        re-ranked by similarity * rank_factor.
+        
+        Args:
+            model: ExerciseEmbedding, WorkoutLogEmbedding or KnowledgeBase
+            columns: Result columns (similarity is added)
+            filters: WHERE clauses
+            query_vector: SQL expression of the query vector
+            limit: Maximum results (int or SQL expression)
+            candidates: Rows re-ranked with rank_factor
+                (default: max(limit, RRF_CANDIDATES))
+            rank_factor: Builds a score multiplier from result columns
+            with_score: Also select the ranking score as rank_score
+            exact: Exact scan of the filtered rows (see _nearest)
+            
+        Returns:
+            SELECT ordered by score
+        """
+        if rank_factor is not None:
+            candidates = candidates or max(limit, settings.RRF_CANDIDATES)
+        
+        vector_hits = self._nearest(
+            model, columns, filters, query_vector, limit if rank_factor is None else candidates, exact=exact
+        ).subquery('vector_hits')
+        
+        similarity = 1 - vector_hits.c.distance
+        rank_score = similarity if rank_factor is None else similarity * rank_factor(vector_hits.c)
+        score_columns = [rank_score.label('rank_score')] if with_score else []
+        return select(
+            *[column for column in vector_hits.c if column.key != 'distance'],
+            similarity.label('similarity'),
+            *score_columns
+        ).order_by(rank_score.desc()).limit(limit)
+    
+    def _fused_statement(
+        self,
+        model,
+        columns: List[Any],
+        filters: List[Any],
+        query_vector: Any,
+        ts_query: Any,
+        limit: Any,
+        candidates: Optional[int] = None,
+        rank_factor: Optional[Callable[[Any], Any]] = None,
+        with_score: bool = False,
+        exact: bool = False
+    ) -> Select:
+        """
+        Vector + full-text search fused by reciprocal rank fusion, as one statement.
+        
+        Subqueries:
+            vector_leg:  top RRF_CANDIDATES by cosine distance with
+                         similarity >= MIN_SIMILARITY (uses the vector
+                         index unless exact, see _nearest)
+            lexical_leg: top RRF_CANDIDATES full-text matches by ts_rank_cd
+                         (uses the GIN index)
+            fused:       FULL JOIN of both, score = sum(1 / (RRF_K + rank))
+        
+        Args:
+            model: ExerciseEmbedding, WorkoutLogEmbedding or KnowledgeBase
+            columns: Result columns (similarity is added)
+            filters: WHERE clauses applied to both legs
+            query_vector: SQL expression of the query vector (bound once and
+                shared by both legs, or a LATERAL outer column)
+            ts_query: SQL expression of the tsquery
+            limit: Maximum results (int or SQL expression)
+            candidates: Rows per leg (default: max(limit, RRF_CANDIDATES))
+            rank_factor: Builds a fused score multiplier from model columns
+            with_score: Also select the (multiplied) fused score as rank_score
+            exact: Exact scan of the filtered rows in the vector leg
+            
+        Returns:
+            SELECT ordered by fused score
+        """
+        candidates = candidates or max(limit, settings.RRF_CANDIDATES)
+        distance = model.embedding.cosine_distance(query_vector)
+        
+        # Full primary key: (id, user_id) on the partitioned workout table,
+        # so the rejoin below can prune to the user's partition
+        key_columns = list(model.__table__.primary_key.columns)
+        key_names = [column.key for column in key_columns]
+        
+        vector_hits = self._nearest(
+            model, key_columns, filters, query_vector, candidates, exact=exact
+        ).subquery('vector_hits')
+        vector_leg = select(
+            *[vector_hits.c[name] for name in key_names],
+            func.row_number().over(order_by=vector_hits.c.distance).label('rank')
+        ).subquery('vector_leg')
+        
+        lexical_score = func.ts_rank_cd(model.search_vector, ts_query)
+        lexical_hits = select(
+            *key_columns, lexical_score.label('score')
+        ).where(
+            *filters,
+            model.search_vector.op('@@')(ts_query)
+        ).order_by(lexical_score.desc()).limit(candidates).correlate_except(model).subquery('lexical_hits')
+        lexical_leg = select(
+            *[lexical_hits.c[name] for name in key_names],
+            func.row_number().over(order_by=lexical_hits.c.score.desc()).label('rank')
+        ).subquery('lexical_leg')
+        
+        rrf_score = (
+            func.coalesce(1.0 / (settings.RRF_K + vector_leg.c.rank), 0.0)
+            + func.coalesce(1.0 / (settings.RRF_K + lexical_leg.c.rank), 0.0)
+        )
+        fused = select(
+            *[func.coalesce(vector_leg.c[name], lexical_leg.c[name]).label(name) for name in key_names],
+            rrf_score.label('rrf_score')
+        ).select_from(
+            vector_leg.join(
+                lexical_leg,
+                and_(*[vector_leg.c[name] == lexical_leg.c[name] for name in key_names]),
+                full=True
+            )
+        ).subquery('fused')
+        
+        rank_score = fused.c.rrf_score
+        if rank_factor is not None:
+            rank_score = rank_score * rank_factor(model)
+        score_columns = [rank_score.label('rank_score')] if with_score else []
+        return select(
+            *columns,
+            (1 - distance).label('similarity'),
+            *score_columns
+        ).join_from(
+            fused, model, and_(*[column == fused.c[column.key] for column in key_columns])
+        ).where(
+            # Already true for every fused row; repeated for partition pruning
+            *filters
+        ).order_by(
+            rank_score.desc(),
+            distance
+        ).limit(limit)
+    
+    @staticmethod
+    def _fuse_ranked(legs: List[List[Dict[str, Any]]], key: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion of ranked result lists.
+        
+        Args:
+            legs: Result lists, each ordered best first
+            key: Field identifying the same item across lists
+            limit: Maximum results
+            
+        Returns:
+            Items ordered by sum(1 / (RRF_K + rank)), ties in leg order
+        """
+        scores: Dict[Any, float] = {}
+        rows: Dict[Any, Dict[str, Any]] = {}
+        for leg in legs:
+            for rank, row in enumerate(leg, start=1):
+                scores[row[key]] = scores.get(row[key], 0.0) + 1.0 / (settings.RRF_K + rank)
+                rows.setdefault(row[key], row)
+        
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [rows[item] for item in ranked[:limit]]
+    
+    async def _embed_queries(self, queries: List[str]) -> List[Embedding]:
+        """Embed several search queries with one batch call and record them."""
+        embeddings, *_ = await asyncio.gather(
+            self.embedding_service.generate_embeddings_batch(queries, caller="search"),
+            *(self._record_query(query) for query in queries)
+        )
+        return embeddings
+    
+    def _query_table(self, queries: List[SearchQuery], embeddings: List[Embedding]):
+        """
+        Queries as a table: unnest(...) WITH ORDINALITY AS q(query_vector,
+        query_text, max_results, muscle_group, since, until, ordinal).
+        
+        Vectors are bound as a text[] of pgvector literals and cast per row.
+        """
+        return func.unnest(
+            bindparam('query_vectors', [to_db(embedding) for embedding in embeddings], type_=ARRAY(Text)),
+            bindparam('query_texts', [q.query for q in queries], type_=ARRAY(Text)),
+            bindparam('query_limits', [q.limit for q in queries], type_=ARRAY(Integer)),
+            bindparam('query_muscle_groups', [q.muscle_group or None for q in queries], type_=ARRAY(Text)),
+            bindparam('query_since', [q.since for q in queries], type_=ARRAY(Date)),
+            bindparam('query_until', [q.until for q in queries], type_=ARRAY(Date)),
+        ).table_valued(
+            'query_vector', 'query_text', 'max_results', 'muscle_group', 'since', 'until',
+            with_ordinality='ordinal'
+        ).render_derived('q')
+    
+    async def _search_many(
+        self,
+        model,
+        columns: List[Any],
+        filters: Callable[[Any], List[Any]],
+        queries: List[SearchQuery],
+        embeddings: List[Embedding],
+        tuning: Optional[SearchTuning] = None,
+        rank_factor: Optional[Callable[[Any], Any]] = None,
+        exact: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k for every query in one SQL statement (LATERAL per query).
+        
+        Args:
+            model: ExerciseEmbedding or WorkoutLogEmbedding
+            columns: Result columns (similarity is added)
+            filters: Builds WHERE clauses from the query table
+            queries: Query specs
+            embeddings: Query vectors (same order)
+            tuning: Index search knobs
+            rank_factor: Builds a score multiplier from result columns
+            exact: Exact scan of the filtered rows (see _nearest)
+            
+        Returns:
+            One result list per query, in input order
+        """
+        query_table = self._query_table(queries, embeddings)
+        query_vector = cast(query_table.c.query_vector, Vector(settings.EMBEDDING_DIMENSION))
+        
+        candidates = max(settings.RRF_CANDIDATES, max(q.limit for q in queries))
+        
+        if settings.LEXICAL_SEARCH_ENABLED:
+            hits = self._fused_statement(
+                model,
+                columns,
+                filters(query_table),
+                query_vector,
+                self._ts_query(query_table.c.query_text),
+                query_table.c.max_results,
+                candidates=candidates,
+                rank_factor=rank_factor,
+                with_score=True,
+                exact=exact
+            ).lateral('hits')
+        else:
+            hits = self._vector_statement(
+                model,
+                columns,
+                filters(query_table),
+                query_vector,
+                query_table.c.max_results,
+                candidates=candidates,
+                rank_factor=rank_factor,
+                with_score=True,
+                exact=exact
+            ).lateral('hits')
+        
+        query_stmt = select(
+            query_table.c.ordinal, hits
+        ).select_from(
+            query_table
+        ).join(
+            hits, true()
+        ).order_by(query_table.c.ordinal, hits.c.rank_score.desc())
+        
+        async with AsyncSessionLocal() as session:
+            await self._apply_tuning(session, tuning)
+            result = await session.execute(query_stmt)
+            
+            results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+            for row in result.mappings():
+                item = dict(row)
+                ordinal = item.pop('ordinal')
+                item.pop('rank_score')
+                item['similarity'] = float(item['similarity'])
+                results[ordinal - 1].append(item)
+        
+        return results
+    
+    async def search_exercises_many(
+        self,
+        queries: List[SearchQuery],
+        tuning: Optional[SearchTuning] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search for several exercise queries at once.
+        
+        Queries go through the result caches as in search_exercises; the
+        others are embedded with one batch call. With the in-process
+        exercise index each query's vector leg is searched in memory and the
+        lexical legs share one SQL statement; otherwise all searches run in
+        one SQL statement (unnest ... WITH ORDINALITY and a LATERAL top-k per
+        query).
+        
+        Returns:
+            One result list per query (as search_exercises), in input order
+        """
+        if not queries:
+            return []
+        
+        logger.info(f"Searching exercises for {len(queries)} queries")
+        
+        scopes: List[Optional[str]] = [None] * len(queries)
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scopes = await asyncio.gather(*(
+                exercise_cache_scope(q.limit, q.muscle_group, self.redis) for q in queries
+            ))
+        
+        return await self._search_many_cached(
+            scopes,
+            [q.query for q in queries],
+            lambda pending, embeddings: self._search_exercises_many_by_vector(
+                [queries[i] for i in pending], embeddings, tuning
+            )
+        )
+    
+    async def _search_exercises_many_by_vector(
+        self,
+        queries: List[SearchQuery],
+        embeddings: List[Embedding],
+        tuning: Optional[SearchTuning] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Exercise searches for already embedded queries (see search_exercises_many)."""
+        if self.exercise_index is not None:
+            try:
+                results = await self._search_exercises_index_many(queries, embeddings)
+                logger.info(f"Found {[len(r) for r in results]} exercises per query (in-memory index)")
+                return results
+            except Exception as e:
+                logger.warning(f"Exercise index unavailable, falling back to pgvector: {e}")
+        
+        results = await self._search_many(
+            ExerciseEmbedding,
+            [
+                ExerciseEmbedding.id,
+                ExerciseEmbedding.exercise_id,
+                ExerciseEmbedding.embedding_text,
+                ExerciseEmbedding.muscle_group,
+            ],
+            lambda q: [or_(
+                q.c.muscle_group.is_(None),
+                ExerciseEmbedding.muscle_group == q.c.muscle_group
+            )],
+            queries,
+            embeddings,
+            tuning
+        )
+        
+        logger.info(f"Found {[len(r) for r in results]} exercises per query")
+        return results
+    
+    async def search_user_workouts_many(
+        self,
+        user_id: int,
+        queries: List[SearchQuery],
+        tuning: Optional[SearchTuning] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search of a user's workout history for several queries at once.
+        
+        Queries go through the result caches as in search_user_workouts; the
+        others are embedded with one batch call and searched in one SQL
+        statement (unnest ... WITH ORDINALITY and a LATERAL top-k per query).
+        muscle_group of the queries is ignored.
+        
+        Returns:
+            One result list per query (as search_user_workouts), in input order
+        """
+        if not queries:
+            return []
+        
+        logger.info(f"Searching workouts: user={user_id}, {len(queries)} queries")
+        
+        scopes: List[Optional[str]] = [None] * len(queries)
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scopes = await asyncio.gather(*(
+                workout_cache_scope(
+                    user_id, q.limit, self.redis, since=q.since, until=q.until, recency_weight=q.recency_weight
+                )
+                for q in queries
+            ))
+        
+        return await self._search_many_cached(
+            scopes,
+            [q.query for q in queries],
+            lambda pending, embeddings: self._search_workouts_many_by_vector(
+                user_id, [queries[i] for i in pending], embeddings, tuning
+            )
+        )
+    
+    async def _search_workouts_many_by_vector(
+        self,
+        user_id: int,
+        queries: List[SearchQuery],
+        embeddings: List[Embedding],
+        tuning: Optional[SearchTuning] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Workout searches for already embedded queries (see
+        search_user_workouts_many).
+        
+        The recency weight is a constant of the ranking expression, so
+        queries are searched in one SQL statement per distinct weight
+        (usually one).
+        """
+        groups: Dict[float, List[int]] = {}
+        for i, q in enumerate(queries):
+            weight = settings.WORKOUT_RECENCY_WEIGHT if q.recency_weight is None else q.recency_weight
+            groups.setdefault(weight, []).append(i)
+        
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        for weight, indexes in groups.items():
+            group_results = await self._search_many(
+                WorkoutLogEmbedding,
+                [
+                    WorkoutLogEmbedding.id,
+                    WorkoutLogEmbedding.user_id,
+                    WorkoutLogEmbedding.workout_log_id,
+                    WorkoutLogEmbedding.summary_text,
+                    WorkoutLogEmbedding.workout_date,
+                    WorkoutLogEmbedding.total_volume,
+                    WorkoutLogEmbedding.exercise_count,
+                ],
+                lambda q: self._workout_filters(user_id, q.c.since, q.c.until),
+                [queries[i] for i in indexes],
+                [embeddings[i] for i in indexes],
+                tuning,
+                rank_factor=self._recency_factor(weight),
+                exact=settings.WORKOUT_SEARCH_EXACT
+            )
+            for i, result in zip(indexes, group_results):
+                results[i] = result
+        
+        logger.info(f"Found {[len(r) for r in results]} workouts per query")
         return results
     
     async def hybrid_search(
@@ -140,20 +1371,48 @@ class VectorSearchService:
         query: str,
         user_id: Optional[int] = None,
         exercise_limit: int = 3,
-        workout_limit: int = 3
+        workout_limit: int = 3,
+        tuning: Optional[SearchTuning] = None
     ) -> SearchResult:
         """
         Combined search: exercises + user workouts.
         
         Main RAG retrieval - returns general knowledge + personalized context.
+        Each leg goes through the result caches with the scope of
+        search_exercises / search_user_workouts, so they share entries.
+        The query is embedded at most once and the legs that missed run
+        concurrently, each on its own pooled connection, so latency is
+        ~max(leg) not sum(legs). tuning applies to both legs.
         """
         logger.info(f"Hybrid search: '{query}' (user_id: {user_id})")
         
-        exercises = await self.search_exercises(query, limit=exercise_limit)
-        
-        workouts = []
+        legs = [
+            lambda query_embedding: self._search_exercises_by_vector(
+                query_embedding, limit=exercise_limit, tuning=tuning, query_text=query
+            )
+        ]
         if user_id is not None:
-            workouts = await self.search_user_workouts(user_id, query, limit=workout_limit)
+            legs.append(
+                lambda query_embedding: self._search_workouts_by_vector(
+                    user_id, query_embedding, limit=workout_limit, tuning=tuning, query_text=query
+                )
+            )
+        
+        scopes: List[Optional[str]] = [None] * len(legs)
+        if self.result_cache is not None or self.semantic_cache is not None:
+            scope_lookups = [exercise_cache_scope(exercise_limit, redis=self.redis)]
+            if user_id is not None:
+                scope_lookups.append(workout_cache_scope(user_id, workout_limit, self.redis))
+            scopes = await asyncio.gather(*scope_lookups)
+        
+        exercises, *rest = await self._search_many_cached(
+            scopes,
+            [query] * len(legs),
+            lambda pending, embeddings: asyncio.gather(*(
+                legs[i](embedding) for i, embedding in zip(pending, embeddings)
+            ))
+        )
+        workouts = rest[0] if rest else []
         
         result = SearchResult(
             exercises=exercises,
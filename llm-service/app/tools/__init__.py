@@ -1,3 +1,5 @@
+from app.db.models import KNOWLEDGE_CATEGORIES
+
 EXERCISE_SEARCH_TOOL = {
     "name": "search_exercises",
     "description": "Search for exercise information, techniques, and recommendations. Use this when user asks about specific exercises, muscle groups, or workout techniques.",
@@ -32,6 +34,38 @@ USER_WORKOUT_SEARCH_TOOL = {
                 "type": "string",
                 "description": "Search query (e.g., 'my chest workouts', 'leg day last week')"
             },
+            "since": {
+                "type": "string",
+                "description": "Optional start date YYYY-MM-DD; only workouts on or after it (e.g., for 'last week')"
+            },
+            "until": {
+                "type": "string",
+                "description": "Optional end date YYYY-MM-DD; only workouts on or before it"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Number of results (default 5)"
+            }
+        },
+        "required": ["query"]
+    }
+}
+
+KNOWLEDGE_SEARCH_TOOL = {
+    "name": "search_knowledge",
+    "description": "Search the curated gym knowledge base (form cues, nutrition, recovery, programming). Use this when user asks general training questions that are not about a specific exercise or their own history.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Search query (e.g., 'how much protein per day', 'deload week')"
+            },
+            "category": {
+                "type": "string",
+                "description": "Optional category filter",
+                "enum": list(KNOWLEDGE_CATEGORIES)
+            },
             "limit": {
                 "type": "integer",
                 "description": "Number of results (default 5)"
@@ -79,6 +113,7 @@ GET_USER_WORKOUT_HISTORY_TOOL = {
 ALL_TOOLS = [
     EXERCISE_SEARCH_TOOL,
     USER_WORKOUT_SEARCH_TOOL,
+    KNOWLEDGE_SEARCH_TOOL,
     USER_STATS_TOOL,
     GET_USER_WORKOUT_HISTORY_TOOL
 ]
\ No newline at end of file
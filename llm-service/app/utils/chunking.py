@@ -0,0 +1,135 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from app.utils.tokens import estimate_tokens, truncate_to_tokens
+
+# ATX heading ("## Title"); "#hashtag", "#include" and "#!" do not match
+HEADING_PATTERN = re.compile(r"^#{1,6}\s")
+# Opening/closing line of a fenced code block
+FENCE_PATTERN = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """One chunk of a document, in document order."""
+    index: int
+    heading: Optional[str]  # Closest preceding Markdown heading
+    text: str
+
+
+def _split_long_line(line: str, max_tokens: int, model: str) -> Iterator[str]:
+    """Split a line longer than max_tokens into pieces that fit (max_tokens >= 1)."""
+    while line:
+        piece = truncate_to_tokens(line, max_tokens, model)
+        if not piece:
+            # A single character over budget (heuristic estimate); take it anyway
+            piece = line[:1]
+        # Prefer to break at a space so words stay whole
+        if len(piece) < len(line):
+            space = piece.rfind(" ")
+            if space > 0:
+                piece = piece[:space + 1]
+        yield piece
+        line = line[len(piece):]
+
+
+def chunk_lines(
+    lines: Iterable[str],
+    max_tokens: int,
+    overlap_tokens: int,
+    model: str
+) -> Iterator[TextChunk]:
+    """
+    Split a stream of text lines into overlapping chunks.
+
+    Lines are consumed lazily and only the current chunk is held in memory,
+    so arbitrarily large files can be chunked straight from an open file
+    handle. Chunks break at line boundaries (blank lines between paragraphs
+    are kept); lines over max_tokens are split at spaces. A Markdown heading
+    ("# ..." to "###### ...", outside fenced code blocks) always starts a
+    new chunk without overlap, and is reported as the heading of the chunks
+    that follow it. Every line costs one extra token for its newline, which
+    is counted against max_tokens.
+
+    Args:
+        lines: Text lines (trailing newlines optional)
+        max_tokens: Token budget per chunk
+        overlap_tokens: Tokens of trailing lines repeated at the start of
+            the next chunk within the same section (0 = no overlap)
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Iterator of non-empty chunks
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+    if max_tokens < 2:
+        raise ValueError("max_tokens must leave room for a newline token")
+
+    index = 0
+    heading: Optional[str] = None
+    current: List[str] = []
+    counts: List[int] = []
+    new_lines = 0  # Non-blank lines of current not carried over from the previous chunk
+    fence: Optional[str] = None  # Marker of the open fenced code block
+
+    def emit() -> Optional[TextChunk]:
+        nonlocal index
+        text = "\n".join(current).strip()
+        if not text or not new_lines:
+            return None
+        chunk = TextChunk(index=index, heading=heading, text=text)
+        index += 1
+        return chunk
+
+    def carry_overlap() -> None:
+        """Keep the trailing lines that fit in overlap_tokens."""
+        nonlocal current, counts, new_lines
+        kept, total = 0, 0
+        for count in reversed(counts):
+            if total + count > overlap_tokens:
+                break
+            total += count
+            kept += 1
+        current = current[len(current) - kept:] if kept else []
+        counts = counts[len(counts) - kept:] if kept else []
+        new_lines = 0
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None and HEADING_PATTERN.match(line):
+            chunk = emit()
+            if chunk is not None:
+                yield chunk
+            current, counts, new_lines = [], [], 0
+            heading = line.strip().strip("#").strip() or heading
+
+        # Pieces leave one token for the newline
+        for piece in _split_long_line(line, max_tokens - 1, model) if line else [""]:
+            tokens = estimate_tokens(piece, model) + 1  # + newline
+            if current and sum(counts) + tokens > max_tokens:
+                chunk = emit()
+                if chunk is not None:
+                    yield chunk
+                carry_overlap()
+                # Overlap must leave room for the new line
+                while current and sum(counts) + tokens > max_tokens:
+                    current.pop(0)
+                    counts.pop(0)
+            current.append(piece)
+            counts.append(tokens)
+            if piece.strip():
+                new_lines += 1
+
+    chunk = emit()
+    if chunk is not None:
+        yield chunk
@@ -0,0 +1,136 @@
+import logging
+import math
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, TypeVar
+
+try:
+    import tiktoken
+except ImportError:  # optional, falls back to a byte-length heuristic
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Heuristic used without tiktoken. English prose averages ~4 bytes per
+# token, but digits, code and non-English text tokenize much denser, so
+# estimate with 3 and only fill HEURISTIC_BUDGET_MARGIN of any token limit.
+BYTES_PER_TOKEN = 3
+HEURISTIC_BUDGET_MARGIN = 0.9
+
+
+@lru_cache
+def _get_encoding(model: str) -> Optional[Any]:
+    """Load the tiktoken encoding for a model, or None if unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        # Unknown model or encoding file can't be downloaded (offline)
+        logger.warning(f"tiktoken unavailable for {model}, using heuristic: {e}")
+        return None
+
+
+def estimate_tokens(text: str, model: str) -> int:
+    """
+    Count tokens with tiktoken when installed, otherwise estimate from UTF-8 length.
+
+    Args:
+        text: Input text
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Token count (exact or estimated)
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def token_budget(max_tokens: int, model: str) -> int:
+    """
+    Usable part of a token limit: all of it when tiktoken counts exactly,
+    HEURISTIC_BUDGET_MARGIN of it when counts are estimates.
+
+    Args:
+        max_tokens: Token limit
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Token budget to fill
+    """
+    if _get_encoding(model) is not None:
+        return max_tokens
+    return max(1, int(max_tokens * HEURISTIC_BUDGET_MARGIN))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """
+    Truncate text so it fits within max_tokens.
+
+    Args:
+        text: Input text
+        max_tokens: Token limit
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Original text if it fits, otherwise its longest prefix that fits
+        (within token_budget when tokens are estimated)
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    max_bytes = token_budget(max_tokens, model) * BYTES_PER_TOKEN
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore")
+
+
+def pack_batches(
+    items: Sequence[T],
+    token_counts: Sequence[int],
+    max_tokens: int,
+    max_items: int,
+    model: Optional[str] = None
+) -> List[List[T]]:
+    """
+    Greedily pack items into batches bounded by total tokens and item count.
+
+    Items keep their relative order. An item larger than max_tokens on its
+    own gets a batch to itself (callers truncate such items beforehand).
+
+    Args:
+        items: Items to pack
+        token_counts: Token count for each item
+        max_tokens: Token budget per batch
+        max_items: Item cap per batch
+        model: Model the counts were made for; when given, batches are
+            filled only up to token_budget(max_tokens, model)
+
+    Returns:
+        List of batches
+    """
+    if model is not None:
+        max_tokens = token_budget(max_tokens, model)
+
+    batches: List[List[T]] = []
+    current: List[T] = []
+    current_tokens = 0
+
+    for item, tokens in zip(items, token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
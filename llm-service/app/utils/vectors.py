@@ -0,0 +1,99 @@
+import base64
+import sys
+from array import array
+from typing import Any, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # fall back to stdlib array('f')
+    np = None
+
+# Embedding vector: NumPy float32 array, or array('f') when NumPy is absent.
+# Both support len(), indexing, slicing and the buffer protocol.
+Embedding = Any
+
+# Rough per-object header cost on top of the raw float32 buffer
+_OBJECT_OVERHEAD_BYTES = 112
+
+
+def to_float32(values: Iterable[float]) -> Embedding:
+    """
+    Convert a sequence of floats to a compact float32 vector.
+
+    Args:
+        values: Floats (list, array, ndarray)
+
+    Returns:
+        1-D float32 vector
+    """
+    if np is not None:
+        return np.asarray(values, dtype=np.float32)
+    if isinstance(values, array) and values.typecode == 'f':
+        return values
+    return array('f', values)
+
+
+def from_bytes(data: bytes) -> Embedding:
+    """
+    Wrap little-endian float32 bytes as a vector.
+
+    With NumPy this is zero-copy: the array is a read-only view over data.
+
+    Args:
+        data: Packed little-endian float32 values
+
+    Returns:
+        1-D float32 vector
+    """
+    if np is not None:
+        return np.frombuffer(data, dtype='<f4')
+    values = array('f')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def to_bytes(vector: Embedding) -> bytes:
+    """
+    Pack a vector as little-endian float32 bytes.
+
+    Args:
+        vector: Embedding vector
+
+    Returns:
+        Packed bytes (4 bytes per dimension)
+    """
+    if np is not None:
+        return np.asarray(vector, dtype='<f4').tobytes()
+    values = to_float32(vector)
+    if sys.byteorder == 'big':
+        values = array('f', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_base64(data: str) -> Embedding:
+    """
+    Decode a base64 embedding as returned by the OpenAI API (encoding_format="base64").
+
+    Args:
+        data: Base64 string of little-endian float32 values
+
+    Returns:
+        1-D float32 vector
+    """
+    return from_bytes(base64.b64decode(data))
+
+
+def vector_nbytes(vector: Embedding) -> int:
+    """
+    Estimate memory held by a vector in bytes.
+
+    Args:
+        vector: Embedding vector
+
+    Returns:
+        Raw buffer size plus object header overhead
+    """
+    return memoryview(vector).nbytes + _OBJECT_OVERHEAD_BYTES
@@ -0,0 +1,457 @@
+"""
+Recall/Latency Benchmark for VectorSearchService
+
+Loads a synthetic clustered corpus of exercise and workout embeddings into
+an isolated PostgreSQL schema (rag_benchmark), runs a query set through
+search_exercises, search_user_workouts and hybrid_search, and reports:
+    - recall@k against exact brute-force results (same MIN_SIMILARITY and filters)
+    - p50/p95/p99 latency and QPS at several concurrency levels
+
+Each scenario loads its own corpus:
+    few-users:  20 users x 200 workouts (each user ~5% of workout rows)
+    many-users: 5000 users x 20 workouts (each user 0.02% of workout rows)
+Filters on user_id are applied after an index scan, so only many-users
+shows how an approximate index loses recall on selective filters (see
+VectorSearchService._apply_tuning). many-users holds 100k workout vectors
+(~600 MB of float32 at 1536 dims while loading).
+
+Query vectors are put straight into the embedding service's in-memory
+cache, so no embedding API is called and only retrieval is measured.
+The real RAG tables are never touched; the schema is dropped afterwards.
+
+Usage:
+    python benchmark_vector_search.py                          # Both scenarios (hnsw from settings)
+    python benchmark_vector_search.py --scenarios many-users   # Selective user filter only
+    python benchmark_vector_search.py --users 1000 --workouts-per-user 50   # Custom scenario
+    python benchmark_vector_search.py --concurrency 1 8 32     # QPS at these levels
+    python benchmark_vector_search.py --ef-search 100          # Per-query HNSW recall knob
+    python benchmark_vector_search.py --probes 20              # Per-query ivfflat recall knob
+    python benchmark_vector_search.py --min-similarity 0.5     # Override MIN_SIMILARITY
+    python benchmark_vector_search.py --no-exercise-index      # Exercises via pgvector, not in-memory
+    VECTOR_INDEX_KIND=ivfflat python benchmark_vector_search.py
+    WORKOUT_SEARCH_EXACT=false python benchmark_vector_search.py   # Workouts via the vector index
+    VECTOR_QUANTIZATION=binary VECTOR_RERANK_OVERSAMPLE=10 python benchmark_vector_search.py
+
+Synthetic corpus:
+    Vectors are noisy copies of random cluster centers: item = center + noise * n
+    (center, n unit vectors). Queries are drawn the same way, so the cosine
+    similarity to same-cluster items is about 1 / (1 + noise^2)
+    (~0.74 for the default --noise 0.6, right around MIN_SIMILARITY).
+"""
+
+import asyncio
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import insert, text
+
+# Add app to path
+sys.path.insert(0, '.')
+
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal, Base, engine
+from app.db.models import ExerciseEmbedding, WorkoutLogEmbedding
+from app.services.embedding_service import get_embedding_service
+from app.services.exercise_index import ExerciseIndex
+from app.services.vector_search_service import VectorSearchService, SearchTuning
+
+settings = get_settings()
+
+BENCHMARK_SCHEMA = 'rag_benchmark'
+BENCHMARK_TABLES = [ExerciseEmbedding.__table__, WorkoutLogEmbedding.__table__]
+MUSCLE_GROUPS = ['CHEST', 'BACK', 'LEGS', 'SHOULDERS', 'ARMS', 'CORE']
+INSERT_CHUNK = 1000
+
+# Scenario -> (users, workouts per user)
+SCENARIOS = {
+    'few-users': (20, 200),
+    'many-users': (5000, 20),
+}
+
+
+@dataclass
+class Corpus:
+    """Synthetic vectors (rows L2-normalized) and their metadata."""
+    exercise_ids: np.ndarray
+    exercise_groups: np.ndarray
+    exercise_matrix: np.ndarray
+    workout_ids: np.ndarray
+    workout_users: np.ndarray
+    workout_matrix: np.ndarray
+
+
+@dataclass
+class BenchmarkQuery:
+    text: str
+    vector: np.ndarray
+    user_id: int
+    muscle_group: Optional[str]
+
+
+@dataclass
+class RunStats:
+    """Latency/throughput/recall of one workload at one concurrency level."""
+    latencies_ms: List[float]
+    wall_seconds: float
+    recall: float
+
+    @property
+    def qps(self) -> float:
+        return len(self.latencies_ms) / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.latencies_ms, q))
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (or a single vector)."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def noisy_copies(centers: np.ndarray, labels: np.ndarray, noise: float, rng) -> np.ndarray:
+    """Unit vectors center + noise * n for each label (n a random unit vector)."""
+    directions = normalize(rng.standard_normal((len(labels), centers.shape[1])))
+    return normalize(centers[labels] + noise * directions)
+
+
+def make_corpus(args, users: int, workouts_per_user: int, rng) -> Tuple[Corpus, np.ndarray]:
+    """Build the corpus and return it with the cluster centers."""
+    dimension = settings.EMBEDDING_DIMENSION
+    centers = normalize(rng.standard_normal((args.clusters, dimension)))
+
+    exercise_labels = rng.integers(0, args.clusters, args.exercises)
+    workout_count = users * workouts_per_user
+    workout_labels = rng.integers(0, args.clusters, workout_count)
+
+    corpus = Corpus(
+        exercise_ids=np.arange(1, args.exercises + 1),
+        exercise_groups=rng.choice(MUSCLE_GROUPS, args.exercises),
+        exercise_matrix=noisy_copies(centers, exercise_labels, args.noise, rng),
+        workout_ids=np.arange(1, workout_count + 1),
+        workout_users=np.repeat(np.arange(1, users + 1), workouts_per_user),
+        workout_matrix=noisy_copies(centers, workout_labels, args.noise, rng),
+    )
+    return corpus, centers
+
+
+def make_queries(args, scenario: str, users: int, centers: np.ndarray, rng) -> List[BenchmarkQuery]:
+    """Queries near random cluster centers, with random users/muscle groups."""
+    labels = rng.integers(0, len(centers), args.queries)
+    vectors = noisy_copies(centers, labels, args.noise, rng)
+
+    queries = []
+    for i, vector in enumerate(vectors):
+        with_group = rng.random() < args.muscle_group_fraction
+        queries.append(BenchmarkQuery(
+            text=f"benchmark {scenario} query {i}",  # Unique per scenario (embedding cache key)
+            vector=vector,
+            user_id=int(rng.integers(1, users + 1)),
+            muscle_group=str(rng.choice(MUSCLE_GROUPS)) if with_group else None,
+        ))
+    return queries
+
+
+def exact_top_k(
+    matrix: np.ndarray,
+    ids: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    min_similarity: float,
+    mask: Optional[np.ndarray] = None
+) -> Set[int]:
+    """Brute-force cosine top-k ids with the service's threshold and filters."""
+    scores = matrix @ query
+    candidates = np.flatnonzero(scores >= min_similarity)
+    if mask is not None:
+        candidates = candidates[mask[candidates]]
+    top = candidates[np.argsort(-scores[candidates], kind='stable')[:k]]
+    return set(ids[top].tolist())
+
+
+async def setup_schema() -> None:
+    """Create the benchmark schema and tables (translated from the models)."""
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {BENCHMARK_SCHEMA}"))
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=BENCHMARK_TABLES))
+
+
+async def load_corpus(corpus: Corpus) -> None:
+    """Bulk insert the corpus, then rebuild vector indexes on the loaded data."""
+    today = date.today()
+
+    exercise_rows = [
+        {
+            'exercise_id': int(exercise_id),
+            'exercise_name': f"Exercise {exercise_id}",
+            'embedding_text': f"Exercise {exercise_id} ({group})",
+            'embedding': vector,
+            'muscle_group': str(group),
+        }
+        for exercise_id, group, vector in zip(
+            corpus.exercise_ids, corpus.exercise_groups, corpus.exercise_matrix
+        )
+    ]
+    workout_rows = [
+        {
+            'user_id': int(user_id),
+            'workout_log_id': int(workout_id),
+            'summary_text': f"Workout {workout_id} of user {user_id}",
+            'embedding': vector,
+            'workout_date': today - timedelta(days=int(workout_id) % 180),
+            'total_volume': float(workout_id % 5000),
+            'exercise_count': int(workout_id % 8) + 1,
+        }
+        for workout_id, user_id, vector in zip(
+            corpus.workout_ids, corpus.workout_users, corpus.workout_matrix
+        )
+    ]
+
+    async with AsyncSessionLocal() as session:
+        for model, rows in ((ExerciseEmbedding, exercise_rows), (WorkoutLogEmbedding, workout_rows)):
+            for i in range(0, len(rows), INSERT_CHUNK):
+                await session.execute(insert(model), rows[i:i + INSERT_CHUNK])
+        await session.commit()
+
+    # ivfflat trains its lists at build time; build on the loaded rows
+    async with engine.begin() as conn:
+        for table in BENCHMARK_TABLES:
+            await conn.execute(text(f"REINDEX TABLE {BENCHMARK_SCHEMA}.{table.name}"))
+            await conn.execute(text(f"ANALYZE {BENCHMARK_SCHEMA}.{table.name}"))
+
+
+async def drop_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE"))
+
+
+async def run_workload(
+    queries: List[BenchmarkQuery],
+    search: Callable[[BenchmarkQuery], Awaitable[Tuple[Set[int], Set[int]]]],
+    truth: Callable[[BenchmarkQuery], Set[int]],
+    concurrency: int
+) -> RunStats:
+    """
+    Run all queries with at most `concurrency` in flight.
+
+    Recall is micro-averaged: matched ground-truth ids / all ground-truth ids.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    matched = 0
+    expected = 0
+
+    async def run_one(query: BenchmarkQuery) -> None:
+        nonlocal matched, expected
+        async with semaphore:
+            start = time.perf_counter()
+            found = await search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        relevant = truth(query)
+        matched += len(found & relevant)
+        expected += len(relevant)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(query) for query in queries))
+    wall = time.perf_counter() - start
+
+    return RunStats(latencies, wall, matched / expected if expected else 1.0)
+
+
+def build_workloads(
+    service: VectorSearchService,
+    corpus: Corpus,
+    k: int,
+    tuning: SearchTuning
+) -> Dict[str, Tuple[Callable, Callable]]:
+    """Workload name -> (search, ground truth) callables."""
+    min_similarity = service.MIN_SIMILARITY
+
+    def exercise_truth(query: BenchmarkQuery, use_group: bool = True) -> Set[int]:
+        mask = corpus.exercise_groups == query.muscle_group if use_group and query.muscle_group else None
+        return exact_top_k(corpus.exercise_matrix, corpus.exercise_ids, query.vector, k, min_similarity, mask)
+
+    def workout_truth(query: BenchmarkQuery) -> Set[int]:
+        mask = corpus.workout_users == query.user_id
+        return exact_top_k(corpus.workout_matrix, corpus.workout_ids, query.vector, k, min_similarity, mask)
+
+    async def search_exercises(query: BenchmarkQuery) -> Set[int]:
+        results = await service.search_exercises(
+            query.text, limit=k, muscle_group=query.muscle_group, tuning=tuning
+        )
+        return {r['exercise_id'] for r in results}
+
+    async def search_user_workouts(query: BenchmarkQuery) -> Set[int]:
+        results = await service.search_user_workouts(query.user_id, query.text, limit=k, tuning=tuning)
+        return {r['workout_log_id'] for r in results}
+
+    # Hybrid returns both kinds; offset workout ids so the sets don't collide
+    offset = int(corpus.exercise_ids.max()) + 1
+
+    async def hybrid_search(query: BenchmarkQuery) -> Set[int]:
+        result = await service.hybrid_search(
+            query.text, user_id=query.user_id, exercise_limit=k, workout_limit=k, tuning=tuning
+        )
+        return (
+            {r['exercise_id'] for r in result.exercises}
+            | {offset + r['workout_log_id'] for r in result.workouts}
+        )
+
+    def hybrid_truth(query: BenchmarkQuery) -> Set[int]:
+        return (
+            exercise_truth(query, use_group=False)
+            | {offset + workout_id for workout_id in workout_truth(query)}
+        )
+
+    return {
+        'search_exercises': (search_exercises, exercise_truth),
+        'search_user_workouts': (search_user_workouts, workout_truth),
+        'hybrid_search': (hybrid_search, hybrid_truth),
+    }
+
+
+def print_report(scenario: str, results: Dict[str, Dict[int, RunStats]], k: int) -> None:
+    print("\n" + "=" * 78)
+    print(f"📊 Results: {scenario}")
+    print("=" * 78)
+    print(f"{'workload':<22}{'conc':>5}{f'recall@{k}':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'QPS':>10}")
+    print("-" * 78)
+    for name, by_concurrency in results.items():
+        for concurrency, stats in by_concurrency.items():
+            print(
+                f"{name:<22}{concurrency:>5}{stats.recall:>11.3f}"
+                f"{stats.percentile(50):>9.2f}{stats.percentile(95):>9.2f}"
+                f"{stats.percentile(99):>9.2f}{stats.qps:>10.1f}"
+            )
+    print("=" * 78)
+
+
+async def main():
+    """Benchmark orchestrator"""
+    parser = argparse.ArgumentParser(
+        description='Recall/latency benchmark for VectorSearchService',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--exercises', type=int, default=2000, help='Exercises in corpus (default: 2000)')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Corpus scenarios to run (default: all)')
+    parser.add_argument('--users', type=int,
+                        help='Users with workouts (custom scenario, replaces --scenarios)')
+    parser.add_argument('--workouts-per-user', type=int,
+                        help='Workouts per user (custom scenario, replaces --scenarios)')
+    parser.add_argument('--clusters', type=int, default=50, help='Topic clusters (default: 50)')
+    parser.add_argument('--noise', type=float, default=0.6, help='Noise around cluster centers (default: 0.6)')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per workload (default: 200)')
+    parser.add_argument('--muscle-group-fraction', type=float, default=0.3,
+                        help='Fraction of exercise queries with a muscle_group filter (default: 0.3)')
+    parser.add_argument('-k', type=int, default=5, help='Results per query (default: 5)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrency levels (default: 1 8 32)')
+    parser.add_argument('--ef-search', type=int, help='hnsw.ef_search per query')
+    parser.add_argument('--probes', type=int, help='ivfflat.probes per query')
+    parser.add_argument('--min-similarity', type=float, help='Override VectorSearchService.MIN_SIMILARITY')
+    parser.add_argument('--no-exercise-index', action='store_true',
+                        help='Search exercises with pgvector instead of the in-memory index')
+    parser.add_argument('--workloads', nargs='+',
+                        choices=['search_exercises', 'search_user_workouts', 'hybrid_search'],
+                        help='Workloads to run (default: all)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--keep', action='store_true', help=f'Keep the {BENCHMARK_SCHEMA} schema afterwards')
+
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("⏱️  Vector Search Benchmark")
+    print("=" * 70)
+    print(f"Database: {settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB} "
+          f"(schema {BENCHMARK_SCHEMA})")
+    print(f"Index: {settings.VECTOR_INDEX_KIND}, dimension {settings.EMBEDDING_DIMENSION}, "
+          f"quantization {settings.VECTOR_QUANTIZATION} (oversample x{settings.VECTOR_RERANK_OVERSAMPLE})")
+    print(f"Workouts: {'exact scan per user' if settings.WORKOUT_SEARCH_EXACT else 'vector index'}, "
+          f"iterative scan {'on' if settings.VECTOR_ITERATIVE_SCAN else 'off'}")
+    if args.users or args.workouts_per_user:
+        scenarios = {'custom': (args.users or 20, args.workouts_per_user or 200)}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in args.scenarios}
+    print(f"Corpus: {args.exercises} exercises, {args.clusters} clusters, noise {args.noise}; "
+          + ", ".join(f"{name} {users}x{per_user} workouts" for name, (users, per_user) in scenarios.items()))
+
+    # Every ORM statement in this process targets the benchmark schema
+    engine.sync_engine.update_execution_options(schema_translate_map={None: BENCHMARK_SCHEMA})
+
+    rng = np.random.default_rng(args.seed)
+    tuning = SearchTuning(ef_search=args.ef_search, probes=args.probes)
+    reports: Dict[str, Dict[str, Dict[int, RunStats]]] = {}
+
+    try:
+        for scenario, (users, workouts_per_user) in scenarios.items():
+            print(f"\n🧪 Scenario {scenario}: {users} users x {workouts_per_user} workouts")
+            print("[1/3] Loading corpus...", end=" ", flush=True)
+            start = time.time()
+            corpus, centers = make_corpus(args, users, workouts_per_user, rng)
+            await setup_schema()
+            await load_corpus(corpus)
+            print(f"✓ ({time.time() - start:.2f}s)")
+
+            # Query vectors served from the in-memory embedding cache
+            queries = make_queries(args, scenario, users, centers, rng)
+            embedding_service = get_embedding_service()
+            embedding_service._redis = None
+            embedding_service._cache.max_entries = max(embedding_service._cache.max_entries, len(queries))
+            for query in queries:
+                embedding_service._save_to_cache(query.text, query.vector)
+
+            service = VectorSearchService(record_queries=False, cache_results=False)
+            if args.min_similarity is not None:
+                service.MIN_SIMILARITY = args.min_similarity
+            if args.no_exercise_index:
+                service.exercise_index = None
+            elif service.exercise_index is not None:
+                service.exercise_index = ExerciseIndex(refresh_interval=float('inf'))
+            print(f"      MIN_SIMILARITY={service.MIN_SIMILARITY}, exercises via "
+                  f"{'in-memory index' if service.exercise_index is not None else 'pgvector'}")
+
+            workloads = build_workloads(service, corpus, args.k, tuning)
+            selected = args.workloads or list(workloads)
+
+            print("[2/3] Warming up...", end=" ", flush=True)
+            for name in selected:
+                search, truth = workloads[name]
+                await run_workload(queries[:10], search, truth, concurrency=1)
+            print("✓")
+
+            print("[3/3] Running workloads...")
+            results: Dict[str, Dict[int, RunStats]] = {}
+            for name in selected:
+                search, truth = workloads[name]
+                results[name] = {}
+                for concurrency in args.concurrency:
+                    print(f"   {name} x{concurrency}...", end=" ", flush=True)
+                    stats = await run_workload(queries, search, truth, concurrency)
+                    results[name][concurrency] = stats
+                    print(f"✓ ({stats.qps:.1f} QPS)")
+            reports[scenario] = results
+
+        for scenario, results in reports.items():
+            print_report(scenario, results, args.k)
+
+    except Exception as e:
+        print(f"\n❌ Benchmark failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        if not args.keep:
+            await drop_schema()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
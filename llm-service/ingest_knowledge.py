@@ -0,0 +1,329 @@
+"""
+Knowledge Base Ingestion Script
+
+Splits Markdown / text documents into overlapping chunks, embeds them in
+batches and bulk-loads them into knowledge_base for search_knowledge.
+
+Usage:
+    python ingest_knowledge.py docs/nutrition --category nutrition
+    python ingest_knowledge.py docs/form/squat.md docs/form/bench.md --category form
+    python ingest_knowledge.py docs/programming --category programming --batch-size 128
+
+Files are streamed line by line and only one batch of chunks is held in
+memory at a time, so memory stays flat however large the corpus is. Each
+batch is upserted and committed on its own (keyed by source path and chunk
+index), so an interrupted run can simply be restarted; with the embedding
+cache, chunks embedded before the interruption are not paid for twice.
+Re-ingesting a document that shrank deletes its leftover chunks.
+
+Requirements:
+    - PostgreSQL must be running (alembic upgrade head, revision 008)
+    - .env file with OPENAI_API_KEY
+"""
+
+import asyncio
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+# Add app to path
+sys.path.insert(0, '.')
+
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import KNOWLEDGE_CATEGORIES, KnowledgeBase
+from app.services.data_version import bump_data_version
+from app.services.embedding_service import get_embedding_service
+from app.utils.chunking import TextChunk, chunk_lines
+
+settings = get_settings()
+
+DOCUMENT_SUFFIXES = ('.md', '.markdown', '.txt')
+SOURCE_MAX_LENGTH = KnowledgeBase.source.type.length
+TITLE_MAX_LENGTH = KnowledgeBase.title.type.length
+
+# asyncpg allows 32767 bind parameters per statement; save_batch binds one
+# per inserted column of each chunk
+PARAMS_PER_CHUNK = 7
+MAX_BATCH_SIZE = 32767 // PARAMS_PER_CHUNK
+
+
+class IngestStats:
+    """Track ingestion statistics"""
+    def __init__(self):
+        self.documents = 0
+        self.chunks = 0
+        self.stale_chunks_deleted = 0
+        self.errors = []
+
+
+def iter_documents(paths: Iterable[str]) -> Iterator[Path]:
+    """Files given directly, plus documents found under directories (sorted)."""
+    for raw_path in paths:
+        path = Path(raw_path)
+        if path.is_dir():
+            yield from sorted(
+                file for file in path.rglob('*')
+                if file.is_file() and file.suffix.lower() in DOCUMENT_SUFFIXES
+            )
+        else:
+            yield path
+
+
+def document_title(path: Path) -> str:
+    """First-line Markdown heading of a document, else its file name."""
+    with path.open(encoding='utf-8', errors='replace') as file:
+        for line in file:
+            if line.strip():
+                if line.startswith('# '):
+                    return line[2:].strip()
+                break
+    return path.stem.replace('_', ' ').replace('-', ' ')
+
+
+def chunk_title(title: str, chunk: TextChunk) -> str:
+    """Document title plus the chunk's section heading."""
+    if chunk.heading and chunk.heading != title:
+        title = f"{title} › {chunk.heading}"
+    return title[:TITLE_MAX_LENGTH]
+
+
+def batched(chunks: Iterator[TextChunk], size: int) -> Iterator[List[TextChunk]]:
+    """Consume chunks lazily in lists of at most size."""
+    while batch := list(islice(chunks, size)):
+        yield batch
+
+
+def upsert_statement(source: str, title: str, category: str, batch: List[TextChunk], embeddings) -> Insert:
+    """
+    INSERT ... ON CONFLICT statement upserting one batch of chunks
+    (at most MAX_BATCH_SIZE chunks).
+    """
+    created_at = datetime.utcnow()
+    stmt = insert(KnowledgeBase).values([
+        {  # PARAMS_PER_CHUNK columns
+            'title': chunk_title(title, chunk),
+            'content': chunk.text,
+            'category': category,
+            'embedding': embedding,
+            'source': source,
+            'chunk_index': chunk.index,
+            'created_at': created_at,
+        }
+        for chunk, embedding in zip(batch, embeddings)
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['source', 'chunk_index'],
+        set_={
+            'title': stmt.excluded.title,
+            'content': stmt.excluded.content,
+            'category': stmt.excluded.category,
+            # excluded is keyed by column name, which follows EMBEDDING_COLUMN
+            KnowledgeBase.embedding: stmt.excluded[settings.EMBEDDING_COLUMN],
+        }
+    )
+    return stmt
+
+
+async def save_batch(source: str, title: str, category: str, batch: List[TextChunk], embeddings) -> None:
+    """Upsert one batch of chunks in a single statement."""
+    stmt = upsert_statement(source, title, category, batch, embeddings)
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def ingest_document(path: Path, category: str, args, stats: IngestStats) -> None:
+    """
+    Chunk, embed and upsert one document, one batch at a time.
+
+    Steps:
+    1. Stream lines into overlapping chunks
+    2. Embed each batch of chunks
+    3. Upsert the batch, then delete chunks beyond the new chunk count
+    """
+    source = os.path.relpath(path).replace(os.sep, '/')
+    if len(source) > SOURCE_MAX_LENGTH:
+        raise ValueError(f"Source path longer than {SOURCE_MAX_LENGTH} characters: {source}")
+
+    title = document_title(path)
+    embedding_service = get_embedding_service()
+
+    print(f"\n📄 {source} ({category})")
+    start_time = time.time()
+    count = 0
+
+    with path.open(encoding='utf-8', errors='replace') as file:
+        chunks = chunk_lines(
+            file,
+            max_tokens=args.chunk_tokens,
+            overlap_tokens=args.overlap_tokens,
+            model=embedding_service.EMBEDDING_MODEL
+        )
+        for batch in batched(chunks, args.batch_size):
+            embeddings = await embedding_service.generate_embeddings_batch(
+                [chunk.text for chunk in batch],
+                caller="sync"
+            )
+            await save_batch(source, title, category, batch, embeddings)
+            count += len(batch)
+            print(f"   {count} chunks", end="\r", flush=True)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            delete(KnowledgeBase).where(
+                KnowledgeBase.source == source,
+                KnowledgeBase.chunk_index >= count
+            )
+        )
+        await session.commit()
+
+    stats.documents += 1
+    stats.chunks += count
+    stats.stale_chunks_deleted += result.rowcount
+
+    elapsed = time.time() - start_time
+    stale = f", {result.rowcount} stale deleted" if result.rowcount else ""
+    print(f"   ✓ {count} chunks in {elapsed:.2f}s{stale}")
+
+
+async def publish_data_version() -> None:
+    """
+    Bump the knowledge_base data version so workers stop serving cached
+    search_knowledge results (see sync_data.py publish_data_version).
+    """
+    scope = KnowledgeBase.__tablename__
+    try:
+        version = await bump_data_version(scope)
+        print(f"   Data version: {scope} -> {version}")
+    except Exception as e:
+        print(f"   ⚠️  Could not bump data version for {scope}: {e}")
+
+
+async def main():
+    """Main ingestion orchestrator"""
+    parser = argparse.ArgumentParser(
+        description='Chunk, embed and load documents into the knowledge base',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python ingest_knowledge.py docs/nutrition --category nutrition
+  python ingest_knowledge.py guide.md --category form --chunk-tokens 300
+        """
+    )
+
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        help=f"Documents, or directories searched for {', '.join(DOCUMENT_SUFFIXES)} files"
+    )
+
+    parser.add_argument(
+        '--category',
+        required=True,
+        choices=KNOWLEDGE_CATEGORIES,
+        help='Category stored with every chunk (search_knowledge filter)'
+    )
+
+    parser.add_argument(
+        '--chunk-tokens',
+        type=int,
+        default=settings.KNOWLEDGE_CHUNK_TOKENS,
+        help=f'Token budget per chunk (default: {settings.KNOWLEDGE_CHUNK_TOKENS})'
+    )
+
+    parser.add_argument(
+        '--overlap-tokens',
+        type=int,
+        default=settings.KNOWLEDGE_CHUNK_OVERLAP_TOKENS,
+        help=f'Tokens shared by consecutive chunks (default: {settings.KNOWLEDGE_CHUNK_OVERLAP_TOKENS})'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=256,
+        help=f'Chunks embedded and inserted per batch; bounds memory use (default: 256, max: {MAX_BATCH_SIZE})'
+    )
+
+    parser.add_argument(
+        '--embedding-cache',
+        default=settings.EMBEDDING_DISK_CACHE_PATH or '.embedding_cache.sqlite3',
+        help='Persistent embedding cache file, reused across runs (default: .embedding_cache.sqlite3)'
+    )
+
+    parser.add_argument(
+        '--no-embedding-cache',
+        action='store_true',
+        help='Disable the persistent embedding cache'
+    )
+
+    args = parser.parse_args()
+
+    if args.overlap_tokens >= args.chunk_tokens:
+        parser.error('--overlap-tokens must be smaller than --chunk-tokens')
+    if not 1 <= args.batch_size <= MAX_BATCH_SIZE:
+        parser.error(f'--batch-size must be between 1 and {MAX_BATCH_SIZE}')
+
+    # Print header
+    print("\n" + "=" * 70)
+    print("📚 Knowledge Base Ingestion")
+    print("=" * 70)
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Database: {settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
+    print(f"Chunks: {args.chunk_tokens} tokens, {args.overlap_tokens} overlap, {args.batch_size} per batch")
+
+    if not args.no_embedding_cache:
+        get_embedding_service().enable_disk_cache(args.embedding_cache)
+        print(f"Embedding cache: {args.embedding_cache}")
+
+    stats = IngestStats()
+    overall_start = time.time()
+
+    try:
+        for path in iter_documents(args.paths):
+            try:
+                await ingest_document(path, args.category, args, stats)
+            except Exception as e:
+                print(f"\n❌ Error ingesting {path}: {e}")
+                stats.errors.append(f"{path}: {e}")
+
+        if stats.documents:
+            await publish_data_version()
+
+        # Print summary
+        overall_elapsed = time.time() - overall_start
+
+        print("\n" + "=" * 70)
+        print("📊 Ingestion Summary")
+        print("=" * 70)
+        print(f"✓ Documents ingested: {stats.documents}")
+        print(f"✓ Chunks upserted:    {stats.chunks}")
+        print(f"✓ Stale chunks removed: {stats.stale_chunks_deleted}")
+        print(f"⏱️  Total duration:    {overall_elapsed:.2f}s")
+
+        if stats.errors:
+            print(f"\n⚠️  Errors encountered: {len(stats.errors)}")
+            for error in stats.errors:
+                print(f"   - {error}")
+        else:
+            print("\n✅ Ingestion completed successfully!")
+
+        print("=" * 70 + "\n")
+
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Ingestion interrupted by user (committed batches are kept)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
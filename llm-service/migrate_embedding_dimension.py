@@ -0,0 +1,427 @@
+"""
+Online Embedding Dimension Migration
+
+Moves RAG tables to a new embedding dimension (e.g. 1536 -> 512) without
+dropping data. New vectors are written to a shadow column next to the
+current one while the service keeps serving reads from the old column.
+
+Usage:
+    python migrate_embedding_dimension.py --dimension 512 add        # Add shadow columns
+    python migrate_embedding_dimension.py --dimension 512 backfill   # Re-embed into shadow columns
+    python migrate_embedding_dimension.py --dimension 512 index      # Build vector indexes (CONCURRENTLY)
+    python migrate_embedding_dimension.py --dimension 512 status     # Show backfill progress
+    python migrate_embedding_dimension.py --dimension 512 drop-old --old-column embedding
+
+Rollout:
+    1. add       - shadow column embedding_<dim>, old column becomes nullable,
+                   and a trigger that resets the shadow vector to NULL whenever
+                   a row's text changes without a new shadow vector being
+                   written (sync_data.py only writes the active column)
+    2. backfill  - safe to rerun; only fills rows where the shadow column is NULL
+                   (new rows, and rows whose text changed since they were embedded)
+    3. index     - vector index on the shadow column
+    4. switch    - set EMBEDDING_DIMENSION=<dim> and EMBEDDING_COLUMN=embedding_<dim>,
+                   then rolling-restart workers (the old column keeps serving
+                   workers that have not restarted yet).
+                   Run backfill until status shows no rows left to pick up rows
+                   synced or changed before the restart.
+    5. drop-old  - drop the previous column once no worker reads it; refused
+                   while any row of the active column still needs a backfill.
+                   The shadow column's vector indexes take over the index
+                   names of app/db/models.py, so later revisions (007)
+                   rebuild them instead of adding a second index.
+                   Bumps the data versions of all tables so no worker serves
+                   search results cached before the rollout. (Cached results
+                   are also keyed by EMBEDDING_COLUMN, so the switch itself
+                   never reads results ranked by the old column.)
+"""
+
+import asyncio
+import argparse
+import re
+import sys
+import time
+from typing import Dict, List
+
+from sqlalchemy import text, bindparam
+
+# Add app to path
+sys.path.insert(0, '.')
+
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal, engine
+from app.db.models import vector_index_ddl
+from app.services.data_version import bump_data_version
+from app.services.embedding_service import EmbeddingService
+from pgvector.sqlalchemy import Vector
+
+settings = get_settings()
+
+# table -> column holding the text that was embedded
+EMBEDDED_TABLES = {
+    'exercise_embeddings': 'embedding_text',
+    'workout_log_embeddings': 'summary_text',
+    'knowledge_base': 'content',
+}
+
+# table -> vector index name used by app/db/models.py and revisions 003/007
+VECTOR_INDEXES = {
+    'exercise_embeddings': 'idx_exercise_embeddings_vector',
+    'workout_log_embeddings': 'idx_workout_embeddings_vector',
+    'knowledge_base': 'idx_knowledge_embedding',
+}
+
+IDENTIFIER_PATTERN = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def shadow_column(dimension: int) -> str:
+    """Column name for vectors of the given dimension."""
+    return f"embedding_{dimension}"
+
+
+def shadow_index(table: str, column: str) -> str:
+    """Name of the vector index built on a shadow column (or a partition's)."""
+    return f"idx_{table}_{column}"
+
+
+def check_identifier(name: str) -> str:
+    """Reject anything that isn't a plain lowercase SQL identifier."""
+    if not IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid column name: {name}")
+    return name
+
+
+async def existing_tables() -> List[str]:
+    """RAG tables present in the database (knowledge_base may be missing)."""
+    async with engine.connect() as conn:
+        tables = []
+        for table in EMBEDDED_TABLES:
+            result = await conn.execute(text("SELECT to_regclass(:name)"), {'name': table})
+            if result.scalar() is not None:
+                tables.append(table)
+        return tables
+
+
+def invalidation_trigger(table: str, column: str) -> str:
+    """Name of the trigger (and its function) that resets stale vectors of a column."""
+    return f"{table}_invalidate_{column}"
+
+
+async def add_columns(dimension: int) -> None:
+    """
+    Add nullable shadow columns, relax NOT NULL on the current column and
+    install the shadow invalidation triggers.
+
+    Until the switch, sync_data.py only writes the active column. When it
+    changes a row's text, the trigger resets the row's shadow vector to
+    NULL so the next backfill re-embeds it; without it the shadow column
+    would keep a vector of the old text. Updates that also write the
+    shadow column (backfill, sync after the switch) are left alone.
+    """
+    column = shadow_column(dimension)
+    current = check_identifier(settings.EMBEDDING_COLUMN)
+
+    async with engine.begin() as conn:
+        for table in await existing_tables():
+            text_column = EMBEDDED_TABLES[table]
+            trigger = invalidation_trigger(table, column)
+            print(f"   {table}.{column} vector({dimension})...", end=" ", flush=True)
+            await conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} vector({dimension})"
+            ))
+            # New rows synced after the switch only fill the new column
+            await conn.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {current} DROP NOT NULL"
+            ))
+            await conn.execute(text(f"""
+                CREATE OR REPLACE FUNCTION {trigger}() RETURNS trigger AS $$
+                BEGIN
+                    IF NEW.{text_column} IS DISTINCT FROM OLD.{text_column}
+                       AND NEW.{column} IS NOT DISTINCT FROM OLD.{column} THEN
+                        NEW.{column} := NULL;
+                    END IF;
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+            """))
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger} ON {table}"))
+            await conn.execute(text(
+                f"CREATE TRIGGER {trigger} BEFORE UPDATE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {trigger}()"
+            ))
+            print("✓")
+
+
+async def backfill(dimension: int, batch_size: int) -> None:
+    """
+    Re-embed rows whose shadow column is NULL, in keyset-paginated batches.
+
+    Each page is committed on its own, so the backfill can be interrupted
+    and resumed. A vector is only written if the row's text is still the
+    text that was embedded; rows changed meanwhile stay NULL for the next run.
+    """
+    column = shadow_column(dimension)
+    embedding_service = EmbeddingService(dimension=dimension)
+
+    for table in await existing_tables():
+        text_column = EMBEDDED_TABLES[table]
+        print(f"\n📦 {table}")
+
+        select_stmt = text(
+            f"SELECT id, {text_column} FROM {table} "
+            f"WHERE {column} IS NULL AND id > :last_id ORDER BY id LIMIT :limit"
+        )
+        update_stmt = text(
+            f"UPDATE {table} SET {column} = :embedding "
+            f"WHERE id = :id AND {text_column} = :text"
+        ).bindparams(bindparam('embedding', type_=Vector(dimension)))
+
+        last_id = 0
+        total = 0
+        start_time = time.time()
+
+        while True:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(
+                    select_stmt, {'last_id': last_id, 'limit': batch_size}
+                )).all()
+                if not rows:
+                    break
+
+                embeddings = await embedding_service.generate_embeddings_batch(
+                    [row[1] for row in rows],
+                    caller="sync"
+                )
+                await session.execute(update_stmt, [
+                    {'id': row[0], 'text': row[1], 'embedding': embedding}
+                    for row, embedding in zip(rows, embeddings)
+                ])
+                await session.commit()
+
+            last_id = rows[-1][0]
+            total += len(rows)
+            print(f"   {total} rows...", end="\r", flush=True)
+
+        print(f"   ✓ {total} rows backfilled in {time.time() - start_time:.2f}s")
+
+    # Rows changed while the pass ran are NULL again (or were skipped)
+    remaining = sum((await count_missing(column)).values())
+    if remaining:
+        print(f"\n⚠️  {remaining} rows changed during the backfill; run it again")
+
+
+async def count_missing(column: str) -> Dict[str, int]:
+    """
+    Rows per table without a vector in column: never embedded, or reset by
+    the invalidation trigger because their text changed since.
+    """
+    async with engine.connect() as conn:
+        missing = {}
+        for table in await existing_tables():
+            result = await conn.execute(text(
+                f"SELECT count(*) FROM {table} WHERE {column} IS NULL"
+            ))
+            missing[table] = result.scalar()
+        return missing
+
+
+async def table_partitions(conn, table: str) -> List[str]:
+    """Partitions of a table (empty if it is not partitioned)."""
+    result = await conn.execute(
+        text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = to_regclass(:table) ORDER BY 1"
+        ),
+        {'table': table}
+    )
+    return [row[0] for row in result]
+
+
+async def build_indexes(dimension: int) -> None:
+    """
+    Create vector indexes (VECTOR_INDEX_KIND) on the shadow columns
+    without blocking writes.
+
+    Partitioned tables (workout_log_embeddings) do not support CONCURRENTLY:
+    the parent index is created ON ONLY the parent, then each partition's
+    index is built concurrently and attached.
+    """
+    column = shadow_column(dimension)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in await existing_tables():
+            index_name = shadow_index(table, column)
+            print(f"   {index_name}...", end=" ", flush=True)
+
+            partitions = await table_partitions(conn, table)
+            if not partitions:
+                await conn.execute(text(
+                    vector_index_ddl(index_name, table, column, concurrently=True, dimension=dimension)
+                ))
+                print("✓")
+                continue
+
+            await conn.execute(text(vector_index_ddl(index_name, table, column, only=True, dimension=dimension)))
+            for partition in partitions:
+                partition_index = shadow_index(partition, column)
+                await conn.execute(text(
+                    vector_index_ddl(partition_index, partition, column, concurrently=True, dimension=dimension)
+                ))
+                await conn.execute(text(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}"))
+            print(f"✓ ({len(partitions)} partitions)")
+
+
+async def show_status(dimension: int) -> None:
+    """Print how many rows have an up-to-date shadow vector."""
+    column = shadow_column(dimension)
+
+    async with engine.connect() as conn:
+        for table in await existing_tables():
+            result = await conn.execute(text(
+                f"SELECT count(*), count({column}) FROM {table}"
+            ))
+            total, filled = result.one()
+            marker = "✓" if total == filled else "…"
+            print(
+                f"   {marker} {table}: {filled}/{total} rows have {column} "
+                f"({total - filled} new or stale, need backfill)"
+            )
+
+
+async def rename_shadow_indexes(conn, table: str, column: str) -> None:
+    """
+    Give the vector indexes of the active (former shadow) column the names
+    of app/db/models.py; partition indexes get the _p<n> names of 005.
+
+    A model-named index still present after the old column is gone indexes
+    the active column too (e.g. 007 ran after the switch) and is dropped,
+    so exactly one vector index remains.
+    """
+    index_name = VECTOR_INDEXES[table]
+    await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    await conn.execute(text(
+        f"ALTER INDEX IF EXISTS {shadow_index(table, column)} RENAME TO {index_name}"
+    ))
+    for partition in await table_partitions(conn, table):
+        # workout_log_embeddings_p3 -> idx_workout_embeddings_vector_p3
+        await conn.execute(text(
+            f"ALTER INDEX IF EXISTS {shadow_index(partition, column)} "
+            f"RENAME TO {index_name}{partition[len(table):]}"
+        ))
+
+
+async def drop_old_column(old_column: str) -> None:
+    """
+    Drop the previous vector column (and with it its indexes) once reads
+    have switched, then rename the active column's indexes to the model's.
+    """
+    old_column = check_identifier(old_column)
+    if old_column == settings.EMBEDDING_COLUMN:
+        raise ValueError(
+            f"{old_column} is the active EMBEDDING_COLUMN; switch reads before dropping it"
+        )
+
+    active = check_identifier(settings.EMBEDDING_COLUMN)
+    missing = {table: count for table, count in (await count_missing(active)).items() if count}
+    if missing:
+        raise ValueError(
+            f"Rows without an up-to-date {active} vector: {missing}; "
+            f"run backfill until status shows none"
+        )
+
+    async with engine.begin() as conn:
+        for table in await existing_tables():
+            print(f"   {table}.{old_column}...", end=" ", flush=True)
+            await conn.execute(text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {old_column}"))
+            # The active column was the shadow; its invalidation trigger is done
+            trigger = invalidation_trigger(table, active)
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger} ON {table}"))
+            await conn.execute(text(f"DROP FUNCTION IF EXISTS {trigger}()"))
+            await rename_shadow_indexes(conn, table, active)
+            print("✓")
+
+    await publish_data_versions(await existing_tables())
+
+
+async def publish_data_versions(tables: List[str]) -> None:
+    """
+    Bump the Redis data versions of the migrated tables so workers stop
+    serving cached search results (see sync_data.py publish_data_version).
+    If Redis is unreachable, cached results expire by TTL.
+    """
+    for table in tables:
+        try:
+            version = await bump_data_version(table)
+            print(f"   Data version: {table} -> {version}")
+        except Exception as e:
+            print(f"   ⚠️  Could not bump data version for {table}: {e}")
+
+
+async def main():
+    """Migration orchestrator"""
+    parser = argparse.ArgumentParser(
+        description='Online migration of RAG embeddings to a new dimension',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        'phase',
+        choices=['add', 'backfill', 'index', 'status', 'drop-old'],
+        help='Migration phase to run'
+    )
+    parser.add_argument(
+        '--dimension',
+        type=int,
+        required=True,
+        help='Target embedding dimension (1-1536)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=500,
+        help='Rows per backfill page (default: 500)'
+    )
+    parser.add_argument(
+        '--old-column',
+        help='Column to drop in the drop-old phase'
+    )
+
+    args = parser.parse_args()
+
+    if not 1 <= args.dimension <= EmbeddingService.NATIVE_DIMENSION:
+        parser.error(f"--dimension must be between 1 and {EmbeddingService.NATIVE_DIMENSION}")
+    if args.phase == 'drop-old' and not args.old_column:
+        parser.error("drop-old requires --old-column")
+
+    print("\n" + "=" * 70)
+    print(f"🔁 Embedding Dimension Migration: {args.phase} (dim {args.dimension})")
+    print("=" * 70)
+    print(f"Database: {settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
+    print(f"Active column: {settings.EMBEDDING_COLUMN} ({settings.EMBEDDING_DIMENSION} dims)\n")
+
+    try:
+        if args.phase == 'add':
+            await add_columns(args.dimension)
+        elif args.phase == 'backfill':
+            await backfill(args.dimension, args.batch_size)
+        elif args.phase == 'index':
+            await build_indexes(args.dimension)
+        elif args.phase == 'status':
+            await show_status(args.dimension)
+        elif args.phase == 'drop-old':
+            await drop_old_column(args.old_column)
+
+        print(f"\n✅ Phase '{args.phase}' completed")
+    except Exception as e:
+        print(f"\n❌ Phase '{args.phase}' failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
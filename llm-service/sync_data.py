@@ -6,11 +6,17 @@ Usage:
     python sync_data.py --exercises-only   # Only sync exercises
     python sync_data.py --user 1           # Only sync workouts for user 1
     python sync_data.py --user 1 --days 90 # Sync last 90 days for user 1
+    python sync_data.py --no-embedding-cache  # Re-embed everything (ignore .embedding_cache.sqlite3)
 
 Requirements:
     - Backend must be running (http://localhost:8080)
     - PostgreSQL must be running
     - .env file with OPENAI_API_KEY and BACKEND_SERVICE_TOKEN
+
+Offline runs / benchmarks:
+    EMBEDDING_BACKEND=local python sync_data.py
+    (deterministic hashed n-gram vectors, no OpenAI calls; use a separate
+    database since these vectors are not comparable with OpenAI ones)
 """
 
 import asyncio
@@ -31,6 +37,7 @@ from app.db.database import AsyncSessionLocal, engine
 from app.db.models import ExerciseEmbedding, WorkoutLogEmbedding, SyncMetadata
 from app.clients.backend_client import BackendAPIClient
 from app.services.embedding_service import get_embedding_service
+from app.services.data_version import bump_data_version, user_scope
 
 settings = get_settings()
 
@@ -44,6 +51,26 @@ class SyncStats:
         self.errors = []
 
 
+def print_embedding_progress(done: int, total: int) -> None:
+    """Progress callback for generate_embeddings_batch"""
+    print(f"{done}/{total}", end=" ", flush=True)
+
+
+async def publish_data_version(scope: str) -> None:
+    """
+    Bump the Redis data version of a table (or user scope) so running
+    workers refresh in-process state (e.g. the exercise index) and stop
+    serving cached search results. Sync still succeeds if Redis is
+    unreachable; workers then fall back to periodic reloads and cached
+    results expire by TTL.
+    """
+    try:
+        version = await bump_data_version(scope)
+        print(f"   Data version: {scope} -> {version}")
+    except Exception as e:
+        print(f"   ⚠️  Could not bump data version for {scope}: {e}")
+
+
 async def sync_exercises(stats: SyncStats) -> None:
     """
     Sync all exercises from backend to vector DB.
@@ -81,7 +108,11 @@ async def sync_exercises(stats: SyncStats) -> None:
         ]
         
         # Generate embeddings in batch
-        embeddings = await embedding_service.generate_embeddings_batch(texts)
+        embeddings = await embedding_service.generate_embeddings_batch(
+            texts,
+            progress_callback=print_embedding_progress,
+            caller="sync"
+        )
         print(f"✓ ({len(embeddings)} vectors)")
         
         # Step 3: Save to database
@@ -105,7 +136,7 @@ async def sync_exercises(stats: SyncStats) -> None:
                     set_={
                         'exercise_name': exercise['name'],
                         'embedding_text': text,
-                        'embedding': embedding_vector,
+                        ExerciseEmbedding.embedding: embedding_vector,
                         'muscle_group': exercise.get('muscleGroup'),
                         'updated_at': datetime.utcnow()
                     }
@@ -116,6 +147,7 @@ async def sync_exercises(stats: SyncStats) -> None:
             await session.commit()
         
         print(f"✓")
+        await publish_data_version(ExerciseEmbedding.__tablename__)
         
         stats.exercises_synced = len(exercises)
         elapsed = time.time() - start_time
@@ -202,7 +234,11 @@ async def sync_all_workouts(days: int, stats: SyncStats) -> None:
         ]
         
         # Generate embeddings in batch
-        embeddings = await embedding_service.generate_embeddings_batch(texts)
+        embeddings = await embedding_service.generate_embeddings_batch(
+            texts,
+            progress_callback=print_embedding_progress,
+            caller="sync"
+        )
         print(f"✓ ({len(embeddings)} vectors)")
         
         # Step 3: Save to database
@@ -237,12 +273,12 @@ async def sync_all_workouts(days: int, stats: SyncStats) -> None:
                     created_at=datetime.utcnow()
                 )
                 
-                # Update if workout_log_id already exists
+                # Update if workout_log_id already exists (unique per user partition)
                 stmt = stmt.on_conflict_do_update(
-                    index_elements=['workout_log_id'],
+                    index_elements=['user_id', 'workout_log_id'],
                     set_={
                         'summary_text': text,
-                        'embedding': embedding_vector,
+                        WorkoutLogEmbedding.embedding: embedding_vector,
                         'workout_date': datetime.fromisoformat(workout['logDate']).date(),
                         'total_volume': total_volume,
                         'exercise_count': exercise_count
@@ -255,6 +291,8 @@ async def sync_all_workouts(days: int, stats: SyncStats) -> None:
             await session.commit()
         
         print(f"✓ ({saved_count} saved)")
+        for user_id in successful_users:
+            await publish_data_version(user_scope(WorkoutLogEmbedding.__tablename__, user_id))
         
         stats.workouts_synced = saved_count
         elapsed = time.time() - start_time
@@ -320,7 +358,11 @@ async def sync_user_workouts(user_id: int, days: int, stats: SyncStats) -> None:
         ]
         
         # Generate embeddings in batch
-        embeddings = await embedding_service.generate_embeddings_batch(texts)
+        embeddings = await embedding_service.generate_embeddings_batch(
+            texts,
+            progress_callback=print_embedding_progress,
+            caller="sync"
+        )
         print(f"✓ ({len(embeddings)} vectors)")
         
         # Step 3: Save to database
@@ -349,12 +391,12 @@ async def sync_user_workouts(user_id: int, days: int, stats: SyncStats) -> None:
                     created_at=datetime.utcnow()
                 )
                 
-                # Update if workout_log_id already exists
+                # Update if workout_log_id already exists (unique per user partition)
                 stmt = stmt.on_conflict_do_update(
-                    index_elements=['workout_log_id'],
+                    index_elements=['user_id', 'workout_log_id'],
                     set_={
                         'summary_text': text,
-                        'embedding': embedding_vector,
+                        WorkoutLogEmbedding.embedding: embedding_vector,
                         'workout_date': datetime.fromisoformat(workout['logDate']).date(),
                         'total_volume': total_volume,
                         'exercise_count': exercise_count
@@ -366,6 +408,7 @@ async def sync_user_workouts(user_id: int, days: int, stats: SyncStats) -> None:
             await session.commit()
         
         print(f"✓")
+        await publish_data_version(user_scope(WorkoutLogEmbedding.__tablename__, user_id))
         
         stats.workouts_synced = len(workouts)
         elapsed = time.time() - start_time
@@ -456,6 +499,18 @@ Examples:
         help='Skip pre-flight checks'
     )
     
+    parser.add_argument(
+        '--embedding-cache',
+        default=settings.EMBEDDING_DISK_CACHE_PATH or '.embedding_cache.sqlite3',
+        help='Persistent embedding cache file, reused across runs (default: .embedding_cache.sqlite3)'
+    )
+    
+    parser.add_argument(
+        '--no-embedding-cache',
+        action='store_true',
+        help='Disable the persistent embedding cache'
+    )
+    
     args = parser.parse_args()
     
     # Print header
@@ -466,6 +521,11 @@ Examples:
     print(f"Backend: {settings.BACKEND_BASE_URL}")
     print(f"Database: {settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
     
+    # Reruns and crash restarts skip texts already embedded
+    if not args.no_embedding_cache:
+        get_embedding_service().enable_disk_cache(args.embedding_cache)
+        print(f"Embedding cache: {args.embedding_cache}")
+    
     # Pre-flight checks
     if not args.skip_verify:
         print("\n🔍 Running pre-flight checks...")
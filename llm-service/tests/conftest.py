@@ -0,0 +1,54 @@
+import os
+
+# Settings are read on first import of app.core.config; tests need no real
+# keys (CI secrets are empty on pull requests from forks)
+os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "test-key"
+os.environ["BACKEND_SERVICE_TOKEN"] = os.environ.get("BACKEND_SERVICE_TOKEN") or "test-token"
+
+import pytest
+
+from app.utils import tokens
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls used by the caches."""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def heuristic_tokens(monkeypatch):
+    """Count tokens with the byte heuristic whether or not tiktoken is installed."""
+    monkeypatch.setattr(tokens, "_get_encoding", lambda model: None)
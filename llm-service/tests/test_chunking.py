@@ -0,0 +1,80 @@
+import pytest
+
+from app.utils.chunking import chunk_lines
+from app.utils.tokens import estimate_tokens
+
+MODEL = "text-embedding-3-small"
+
+pytestmark = pytest.mark.usefixtures("heuristic_tokens")
+
+
+def chunk(text, max_tokens=50, overlap_tokens=0):
+    return list(chunk_lines(text.splitlines(), max_tokens, overlap_tokens, MODEL))
+
+
+def chunk_tokens(text):
+    return sum(estimate_tokens(line, MODEL) + 1 for line in text.split("\n"))
+
+
+def test_chunks_are_indexed_in_order():
+    chunks = chunk("\n".join(f"line number {i}" for i in range(40)), max_tokens=20)
+
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert len(chunks) > 1
+
+
+def test_chunks_fit_the_budget():
+    lines = [f"sentence {i} " * 5 for i in range(30)] + ["word " * 300]
+
+    for c in chunk("\n".join(lines), max_tokens=30, overlap_tokens=5):
+        assert chunk_tokens(c.text) <= 30
+
+
+def test_overlap_repeats_trailing_lines():
+    lines = [f"line {i:02d}" for i in range(20)]
+
+    chunks = chunk("\n".join(lines), max_tokens=20, overlap_tokens=6)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.text.split("\n")[0] in previous.text.split("\n")
+
+
+def test_no_overlap():
+    lines = [f"line {i:02d}" for i in range(20)]
+
+    chunks = chunk("\n".join(lines), max_tokens=20)
+
+    assert sum(len(c.text.split("\n")) for c in chunks) == len(lines)
+
+
+def test_headings_start_chunks_without_overlap():
+    text = "# Guide\nintro\n## Squat\nsquat body\n## Bench\nbench body"
+
+    chunks = chunk(text, overlap_tokens=10)
+
+    assert [(c.heading, c.text) for c in chunks] == [
+        ("Guide", "# Guide\nintro"),
+        ("Squat", "## Squat\nsquat body"),
+        ("Bench", "## Bench\nbench body"),
+    ]
+
+
+def test_hashtags_and_directives_are_not_headings():
+    chunks = chunk("# Notes\n#legday tips\n#include <stdio.h>\n####### seven")
+
+    assert len(chunks) == 1
+    assert chunks[0].heading == "Notes"
+
+
+def test_comments_in_fenced_code_are_not_headings():
+    text = "# Setup\n```bash\n# install\npip install x\n```\n~~~\n# more\n~~~\nafter"
+
+    chunks = chunk(text, max_tokens=200)
+
+    assert len(chunks) == 1
+    assert chunks[0].text.endswith("after")
+
+
+def test_overlap_must_be_smaller_than_budget():
+    with pytest.raises(ValueError):
+        chunk("text", max_tokens=10, overlap_tokens=10)
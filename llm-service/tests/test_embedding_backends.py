@@ -0,0 +1,42 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.embedding_backends import HashingEmbeddingBackend, get_embedding_backend
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+def test_hashing_backend_is_deterministic_and_normalized():
+    backend = HashingEmbeddingBackend()
+
+    first, second = asyncio.run(backend.embed(["Barbell back squat", "Barbell back squat"], 64))
+
+    assert len(first) == 64
+    assert np.array_equal(first, second)
+    assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_hashing_backend_rewards_shared_words():
+    backend = HashingEmbeddingBackend()
+
+    squat, front_squat, curl = asyncio.run(
+        backend.embed(["barbell back squat", "barbell front squat", "dumbbell bicep curl"], 512)
+    )
+
+    assert cosine(squat, front_squat) > cosine(squat, curl)
+
+
+def test_hashing_backend_text_without_words_is_zero():
+    vector = HashingEmbeddingBackend().embed_text("!!! ???", 32)
+
+    assert not np.any(vector)
+
+
+def test_get_embedding_backend():
+    assert isinstance(get_embedding_backend("local"), HashingEmbeddingBackend)
+    with pytest.raises(ValueError):
+        get_embedding_backend("unknown")
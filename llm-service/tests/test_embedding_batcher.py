@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEmbedBatch:
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return [text.upper() for text in texts]
+
+
+def test_flushes_when_batch_is_full():
+    async def scenario():
+        embed_batch = FakeEmbedBatch()
+        # A window this long would time the test out if size did not flush
+        batcher = EmbeddingBatcher(embed_batch, max_batch_size=3, max_wait_ms=60_000)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(text) for text in ("a", "b", "c"))), timeout=1
+        )
+        return embed_batch, batcher, results
+
+    embed_batch, batcher, results = asyncio.run(scenario())
+
+    assert results == ["A", "B", "C"]
+    assert embed_batch.batches == [["a", "b", "c"]]
+    assert batcher._timer is None
+
+
+def test_flushes_when_window_closes():
+    async def scenario():
+        embed_batch = FakeEmbedBatch()
+        batcher = EmbeddingBatcher(embed_batch, max_batch_size=100, max_wait_ms=20)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        return embed_batch, results, loop.time() - start
+
+    embed_batch, results, elapsed = asyncio.run(scenario())
+
+    assert results == ["A", "B"]
+    assert embed_batch.batches == [["a", "b"]]
+    assert elapsed >= 0.02
+
+
+def test_overflow_starts_a_new_batch():
+    async def scenario():
+        embed_batch = FakeEmbedBatch()
+        batcher = EmbeddingBatcher(embed_batch, max_batch_size=2, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(text) for text in ("a", "b", "c")))
+        return embed_batch, results
+
+    embed_batch, results = asyncio.run(scenario())
+
+    assert results == ["A", "B", "C"]
+    assert embed_batch.batches == [["a", "b"], ["c"]]
+
+
+def test_error_reaches_every_caller():
+    async def scenario():
+        batcher = EmbeddingBatcher(FakeEmbedBatch(ValueError("boom")), max_batch_size=10, max_wait_ms=5)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [str(result) for result in results] == ["boom", "boom"]
+
+
+def test_short_result_list_does_not_hang_callers():
+    async def embed_batch(texts):
+        return []
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch, max_batch_size=10, max_wait_ms=5)
+        return await asyncio.wait_for(batcher.submit("a"), timeout=1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app.services import embedding_cache
+from app.services.embedding_cache import EmbeddingCache, estimate_embedding_size
+
+
+def vector(value: float = 0.0, dimension: int = 8):
+    return np.full(dimension, value, dtype=np.float32)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_and_miss():
+    cache = EmbeddingCache()
+    cache.set("a", vector(1))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_entry_limit_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.set("a", vector(1))
+    cache.set("b", vector(2))
+    cache.get("a")  # b is now the least recently used
+    cache.set("c", vector(3))
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats().evictions == 1
+
+
+def test_byte_limit_evicts_until_under_limit():
+    size = estimate_embedding_size(vector())
+    cache = EmbeddingCache(max_bytes=2 * size)
+    for key in "abc":
+        cache.set(key, vector())
+
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.stats().bytes == 2 * size
+
+
+def test_entry_larger_than_byte_limit_is_not_stored():
+    cache = EmbeddingCache(max_bytes=10)
+    cache.set("a", vector())
+
+    assert len(cache) == 0
+
+
+def test_replacing_a_key_keeps_byte_count():
+    cache = EmbeddingCache()
+    cache.set("a", vector(1))
+    cache.set("a", vector(2))
+
+    assert len(cache) == 1
+    assert cache.stats().bytes == estimate_embedding_size(vector())
+    assert cache.get("a")[0] == 2
+
+
+def test_ttl_expires_on_lookup(clock):
+    cache = EmbeddingCache(ttl_seconds=60)
+    cache.set("a", vector())
+
+    clock[0] += 59
+    assert cache.get("a") is not None
+
+    clock[0] += 2
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats.expirations, stats.entries, stats.bytes) == (1, 0, 0)
+
+
+def test_clear():
+    cache = EmbeddingCache()
+    cache.set("a", vector())
+    cache.set("b", vector())
+
+    assert cache.clear() == 2
+    assert len(cache) == 0
+    assert cache.stats().bytes == 0
+
+
+def test_list_embeddings_cost_more_than_float32():
+    assert estimate_embedding_size([0.5] * 8) > estimate_embedding_size(vector(0.5))
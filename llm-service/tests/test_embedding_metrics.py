@@ -0,0 +1,37 @@
+from app.services.embedding_metrics import EmbeddingMetrics, RollingHistogram
+
+
+def test_histogram_summary():
+    histogram = RollingHistogram(max_samples=4)
+    for value in (1.0, 2.0, 3.0, 4.0, 10.0):
+        histogram.observe(value)
+
+    summary = histogram.summary()
+
+    # Percentiles cover the last 4 samples, count and mean the lifetime
+    assert summary["count"] == 5
+    assert summary["mean"] == 4.0
+    assert (summary["p50"], summary["max"]) == (3.0, 10.0)
+
+
+def test_empty_histogram_summary():
+    assert RollingHistogram().summary()["p99"] == 0.0
+
+
+def test_snapshot_hit_rate_per_caller():
+    metrics = EmbeddingMetrics()
+    metrics.record_lookup("search", "memory_hit", 3)
+    metrics.record_lookup("search", "miss")
+    metrics.record_lookup("sync", "coalesced", 0)  # Zero counts are not recorded
+    metrics.record_api_call(texts=2, tokens=10, latency_ms=5.0)
+    metrics.record_api_call(texts=2, tokens=10, latency_ms=7.0, error=True)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["callers"] == {
+        "search": {"memory_hit": 3, "miss": 1, "lookups": 4, "hit_rate": 0.75}
+    }
+    assert snapshot["api"]["calls"] == 2
+    assert snapshot["api"]["errors"] == 1
+    assert (snapshot["api"]["texts"], snapshot["api"]["tokens"]) == (2, 10)
+    assert snapshot["api"]["texts_per_call"]["count"] == 1
@@ -0,0 +1,209 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.services.embedding_backends import EmbeddingBackend
+from app.services.embedding_service import EmbeddingService
+
+
+class FakeBackend(EmbeddingBackend):
+    """Counts calls; optionally holds them until released or fails first."""
+
+    model = "fake"
+    native_dimension = 1536
+
+    def __init__(self, rate_limits=0, retry_after=None):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.rate_limits = rate_limits
+        self.retry_after = retry_after
+
+    async def embed(self, texts, dimension):
+        self.calls.append(list(texts))
+        if self.rate_limits:
+            self.rate_limits -= 1
+            headers = {} if self.retry_after is None else {"retry-after": str(self.retry_after)}
+            response = httpx.Response(
+                429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+            )
+            raise RateLimitError("rate limited", response=response, body=None)
+        await self.release.wait()
+        return [np.full(dimension, len(text), dtype=np.float32) for text in texts]
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    def make(backend, batch_window_ms=0.0):
+        monkeypatch.setattr(settings, "EMBEDDING_BATCH_WINDOW_MS", batch_window_ms)
+        embedding_service = EmbeddingService(backend=backend)
+        embedding_service._redis = None  # Memory tier only
+        return embedding_service
+    return make
+
+
+def test_concurrent_identical_requests_make_one_call(make_service):
+    async def scenario():
+        backend = FakeBackend()
+        backend.release.clear()
+        embedding_service = make_service(backend)
+
+        requests = [
+            asyncio.create_task(embedding_service.generate_embedding("bench press")) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        assert len(embedding_service._inflight) == 1
+        backend.release.set()
+        return backend, embedding_service, await asyncio.gather(*requests)
+
+    backend, embedding_service, embeddings = asyncio.run(scenario())
+
+    assert backend.calls == [["bench press"]]
+    assert all(np.array_equal(embedding, embeddings[0]) for embedding in embeddings)
+    assert embedding_service._inflight == {}
+
+
+def test_cancelled_caller_does_not_cancel_shared_lookup(make_service):
+    async def scenario():
+        backend = FakeBackend()
+        backend.release.clear()
+        embedding_service = make_service(backend)
+
+        first = asyncio.create_task(embedding_service.generate_embedding("squat"))
+        second = asyncio.create_task(embedding_service.generate_embedding("squat"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        backend.release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return backend, await second
+
+    backend, embedding = asyncio.run(scenario())
+
+    assert backend.calls == [["squat"]]
+    assert len(embedding) == settings.EMBEDDING_DIMENSION
+
+
+def test_micro_batcher_joins_concurrent_texts(make_service):
+    async def scenario():
+        backend = FakeBackend()
+        embedding_service = make_service(backend, batch_window_ms=20.0)
+        await asyncio.gather(*(
+            embedding_service.generate_embedding(text) for text in ("a", "bb", "ccc")
+        ))
+        return backend
+
+    backend = asyncio.run(scenario())
+
+    assert backend.calls == [["a", "bb", "ccc"]]
+
+
+def test_rate_limit_waits_for_retry_after(monkeypatch, make_service):
+    monkeypatch.setattr(settings, "EMBEDDING_RATE_LIMIT_RETRIES", 2)
+
+    async def scenario():
+        backend = FakeBackend(rate_limits=1, retry_after=0.2)
+        embedding_service = make_service(backend)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await embedding_service._call_embeddings_api_with_backoff(["deadlift"])
+        return backend, embedding_service, loop.time() - start
+
+    backend, embedding_service, elapsed = asyncio.run(scenario())
+
+    assert len(backend.calls) == 2
+    assert elapsed >= 0.2
+    # The shared delay doubled from 0 to 1s and was halved by the success
+    assert embedding_service._backoff_delay == 0.5
+
+
+def test_rate_limit_backoff_is_shared_by_concurrent_batches(monkeypatch, make_service):
+    monkeypatch.setattr(settings, "EMBEDDING_RATE_LIMIT_RETRIES", 2)
+
+    async def scenario():
+        backend = FakeBackend(rate_limits=1, retry_after=0.2)
+        embedding_service = make_service(backend)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        first = asyncio.create_task(embedding_service._call_embeddings_api_with_backoff(["row"]))
+        await asyncio.sleep(0.05)  # First batch is now backing off
+        await embedding_service._call_embeddings_api_with_backoff(["other row"])
+        await first
+        return loop.time() - start
+
+    # The second batch waited for the first one's backoff window
+    assert asyncio.run(scenario()) >= 0.2
+
+
+def test_rate_limit_raises_after_retries(monkeypatch, make_service):
+    monkeypatch.setattr(settings, "EMBEDDING_RATE_LIMIT_RETRIES", 1)
+    backend = FakeBackend(rate_limits=5, retry_after=0.01)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(make_service(backend)._call_embeddings_api_with_backoff(["row"]))
+    assert len(backend.calls) == 2
+
+
+def test_batch_keeps_input_order_and_embeds_duplicates_once(make_service, heuristic_tokens):
+    async def scenario():
+        backend = FakeBackend()
+        embedding_service = make_service(backend)
+        embedding_service.MAX_BATCH_SIZE = 2
+        progress = []
+        texts = ["a", "bb", "a", "ccc", "dddd", "eeeee"]
+        embeddings = await embedding_service.generate_embeddings_batch(
+            texts, progress_callback=lambda done, total: progress.append((done, total))
+        )
+        return backend, texts, embeddings, progress
+
+    backend, texts, embeddings, progress = asyncio.run(scenario())
+
+    # FakeBackend fills each vector with the text length
+    assert [float(embedding[0]) for embedding in embeddings] == [len(text) for text in texts]
+    assert sorted(len(call) for call in backend.calls) == [1, 2, 2]
+    assert sum(backend.calls, []).count("a") == 1
+    assert progress[-1] == (5, 5)
+
+
+def test_batch_reuses_disk_store_across_runs(make_service, heuristic_tokens, tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+
+    async def run_once():
+        backend = FakeBackend()
+        embedding_service = make_service(backend)
+        embedding_service.enable_disk_cache(path)
+        await embedding_service.generate_embeddings_batch(["row one", "row two"], caller="sync")
+        embedding_service._disk_store.close()
+        return backend
+
+    assert len(asyncio.run(run_once()).calls) == 1
+    assert asyncio.run(run_once()).calls == []
+
+
+def test_metrics_count_lookup_outcomes(make_service):
+    async def scenario():
+        backend = FakeBackend()
+        backend.release.clear()
+        embedding_service = make_service(backend)
+
+        first = asyncio.create_task(embedding_service.generate_embedding("row", caller="search"))
+        second = asyncio.create_task(embedding_service.generate_embedding("row", caller="search"))
+        await asyncio.sleep(0)
+        backend.release.set()
+        await asyncio.gather(first, second)
+        await embedding_service.generate_embedding("row", caller="search")
+        return embedding_service.get_metrics()
+
+    metrics = asyncio.run(scenario())
+
+    search = metrics["callers"]["search"]
+    assert (search["miss"], search["coalesced"], search["memory_hit"]) == (1, 1, 1)
+    assert metrics["api"]["calls"] == 1
+    assert metrics["inflight"] == 0
@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+
+from app.services.embedding_store import EmbeddingDiskStore
+
+
+def vector(value: float, dimension: int = 8):
+    return np.full(dimension, value, dtype=np.float32)
+
+
+def test_round_trip_and_persistence(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    store = EmbeddingDiskStore(path)
+    asyncio.run(store.put_many({"a": vector(1.0), "b": vector(2.0)}))
+    store.close()
+
+    reopened = EmbeddingDiskStore(path)
+    found = asyncio.run(reopened.get_many(["a", "b", "missing"]))
+
+    assert set(found) == {"a", "b"}
+    assert np.array_equal(found["b"], vector(2.0))
+    assert reopened.count() == 2
+    reopened.close()
+
+
+def test_put_replaces_existing_vectors(tmp_path):
+    store = EmbeddingDiskStore(str(tmp_path / "embeddings.sqlite"))
+    asyncio.run(store.put_many({"a": vector(1.0)}))
+    asyncio.run(store.put_many({"a": vector(3.0)}))
+
+    assert np.array_equal(asyncio.run(store.get_many(["a"]))["a"], vector(3.0))
+    assert store.count() == 1
+    store.close()
+
+
+def test_lookup_larger_than_one_chunk(tmp_path):
+    store = EmbeddingDiskStore(str(tmp_path / "embeddings.sqlite"))
+    keys = [f"key-{i}" for i in range(EmbeddingDiskStore._LOOKUP_CHUNK * 2 + 1)]
+    asyncio.run(store.put_many({key: vector(float(i)) for i, key in enumerate(keys)}))
+
+    found = asyncio.run(store.get_many(keys))
+
+    assert len(found) == len(keys)
+    assert found[keys[-1]][0] == len(keys) - 1
+    store.close()
+
+
+def test_empty_calls_skip_the_database(tmp_path):
+    store = EmbeddingDiskStore(str(tmp_path / "embeddings.sqlite"))
+
+    assert asyncio.run(store.get_many([])) == {}
+    asyncio.run(store.put_many({}))
+    assert store.count() == 0
+    store.close()
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import exercise_index
+from app.services.data_version import bump_data_version
+from app.services.exercise_index import ExerciseIndex
+
+START = datetime(2025, 1, 1)
+
+
+def unit(axis):
+    vector = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+    vector[axis] = 1.0
+    return vector
+
+
+class FakeTable:
+    """exercise_embeddings rows, served as the two queries of _load_changes."""
+
+    def __init__(self):
+        self.rows = {}
+        self.clock = START
+
+    def upsert(self, exercise_id, axis, muscle_group="CHEST"):
+        self.clock += timedelta(seconds=1)
+        self.rows[exercise_id] = SimpleNamespace(
+            id=exercise_id,
+            exercise_id=exercise_id,
+            embedding_text=f"exercise {exercise_id}",
+            muscle_group=muscle_group,
+            embedding=unit(axis),
+            updated_at=self.clock,
+        )
+
+    def session_factory(self, index):
+        table = self
+
+        class FakeSession:
+            def __init__(self):
+                self.calls = 0
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def execute(self, stmt):
+                self.calls += 1
+                if self.calls == 1:
+                    watermark = index._watermark
+                    changed = [
+                        row for row in table.rows.values()
+                        if watermark is None or row.updated_at >= watermark
+                    ]
+                    return SimpleNamespace(all=lambda: changed)
+                return SimpleNamespace(scalars=lambda: list(table.rows))
+
+        return FakeSession
+
+
+@pytest.fixture
+def table():
+    return FakeTable()
+
+
+@pytest.fixture
+def index(table, redis, monkeypatch):
+    index = ExerciseIndex(refresh_interval=0, redis=redis)
+    monkeypatch.setattr(exercise_index, "AsyncSessionLocal", table.session_factory(index))
+    return index
+
+
+def search(index, axis, **kwargs):
+    return [row['exercise_id'] for row in asyncio.run(index.search(unit(axis), **kwargs))]
+
+
+def test_loads_and_ranks_by_similarity(table, index):
+    table.upsert(1, axis=0)
+    table.upsert(2, axis=1)
+
+    assert search(index, 0, limit=1) == [1]
+    assert search(index, 1, limit=2, min_similarity=0.5) == [2]
+    assert len(index) == 2
+
+
+def test_applies_added_updated_and_deleted_rows(table, index, redis):
+    table.upsert(1, axis=0)
+    table.upsert(2, axis=1)
+    assert search(index, 2, limit=5, min_similarity=0.5) == []
+
+    table.upsert(3, axis=2)  # Added
+    table.upsert(1, axis=3)  # Updated: now points along axis 3
+    del table.rows[2]  # Deleted
+    asyncio.run(bump_data_version(ExerciseIndex.VERSION_SCOPE, redis))
+
+    assert search(index, 2, limit=5, min_similarity=0.5) == [3]
+    assert search(index, 3, limit=5, min_similarity=0.5) == [1]
+    assert search(index, 1, limit=5, min_similarity=0.5) == []
+    assert sorted(row['exercise_id'] for row in index._rows) == [1, 3]
+
+
+def test_skips_reload_until_version_changes(table, index, redis):
+    table.upsert(1, axis=0)
+    search(index, 0)
+
+    table.upsert(2, axis=1)
+    assert search(index, 1, min_similarity=0.5) == []
+
+    asyncio.run(bump_data_version(ExerciseIndex.VERSION_SCOPE, redis))
+    assert search(index, 1, min_similarity=0.5) == [2]
+
+
+def test_muscle_group_filter(table, index):
+    table.upsert(1, axis=0, muscle_group="CHEST")
+    table.upsert(2, axis=0, muscle_group="BACK")
+
+    assert search(index, 0, muscle_group="BACK") == [2]
+    assert search(index, 0, muscle_group="LEGS") == []
+    # An empty filter means no filter, as in the pgvector path
+    assert sorted(search(index, 0, muscle_group="")) == [1, 2]
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy.dialects import postgresql
+
+import ingest_knowledge
+from app.utils.chunking import TextChunk
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+CHUNKS = [TextChunk(index=0, heading=None, text="a"), TextChunk(index=1, heading="H", text="b")]
+
+# Model columns are bound at import, so a renamed column needs a fresh interpreter
+COMPILE_RENAMED = """
+from sqlalchemy.dialects import postgresql
+from ingest_knowledge import upsert_statement
+from app.utils.chunking import TextChunk
+stmt = upsert_statement('doc.md', 'Doc', 'form', [TextChunk(0, None, 'a')], [[0.0] * 4])
+print(stmt.compile(dialect=postgresql.dialect()))
+"""
+
+
+def test_upsert_statement_binds_every_chunk():
+    stmt = ingest_knowledge.upsert_statement(
+        "doc.md", "Doc", "form", CHUNKS, [[0.0] * 4, [1.0] * 4]
+    )
+
+    compiled = stmt.compile(dialect=postgresql.dialect())
+
+    assert len(compiled.params) == ingest_knowledge.PARAMS_PER_CHUNK * len(CHUNKS)
+    assert "ON CONFLICT (source, chunk_index) DO UPDATE" in str(compiled)
+
+
+def test_upsert_statement_follows_renamed_embedding_column():
+    env = {
+        **os.environ,
+        "EMBEDDING_COLUMN": "embedding_512",
+        "EMBEDDING_DIMENSION": "512",
+    }
+
+    result = subprocess.run(
+        [sys.executable, "-c", COMPILE_RENAMED],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "embedding_512 = excluded.embedding_512" in result.stdout
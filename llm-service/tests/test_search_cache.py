@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import date
+
+from app.core.config import settings
+from app.db.models import ExerciseEmbedding, WorkoutLogEmbedding
+from app.services.data_version import bump_data_version, user_scope
+from app.services.search_cache import (
+    SearchResultCache,
+    exercise_cache_scope,
+    knowledge_cache_scope,
+    workout_cache_scope,
+)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_exercise_scope_changes_with_version(redis):
+    before = run(exercise_cache_scope(5, redis=redis))
+    run(bump_data_version(ExerciseEmbedding.__tablename__, redis))
+    after = run(exercise_cache_scope(5, redis=redis))
+
+    assert before.startswith("exercises:v0:")
+    assert after.startswith("exercises:v1:")
+    assert before != after
+
+
+def test_scope_depends_on_filters(redis):
+    assert run(exercise_cache_scope(5, redis=redis)) != run(exercise_cache_scope(10, redis=redis))
+    assert run(exercise_cache_scope(5, "CHEST", redis)) != run(exercise_cache_scope(5, "BACK", redis))
+    assert run(knowledge_cache_scope(5, "form", redis)) != run(knowledge_cache_scope(5, "nutrition", redis))
+
+
+def test_scope_depends_on_embedding_column(redis, monkeypatch):
+    before = run(knowledge_cache_scope(5, redis=redis))
+    monkeypatch.setattr(settings, "EMBEDDING_COLUMN", "embedding_512")
+
+    assert run(knowledge_cache_scope(5, redis=redis)) != before
+
+
+def test_workout_scope_tracks_table_and_user_versions(redis):
+    table = WorkoutLogEmbedding.__tablename__
+    first = run(workout_cache_scope(1, 5, redis))
+    other_user = run(workout_cache_scope(2, 5, redis))
+
+    run(bump_data_version(user_scope(table, 1), redis))
+    assert run(workout_cache_scope(1, 5, redis)) != first
+    assert run(workout_cache_scope(2, 5, redis)) == other_user
+
+    run(bump_data_version(table, redis))
+    assert run(workout_cache_scope(2, 5, redis)) != other_user
+
+
+def test_workout_scope_depends_on_window_and_recency(redis):
+    base = run(workout_cache_scope(1, 5, redis))
+
+    assert run(workout_cache_scope(1, 5, redis, since=date(2025, 1, 1))) != base
+    assert run(workout_cache_scope(1, 5, redis, recency_weight=0.5)) != base
+    # An explicit weight equal to the setting shares entries with the default
+    assert run(workout_cache_scope(1, 5, redis, recency_weight=settings.WORKOUT_RECENCY_WEIGHT)) == base
+
+
+def test_scope_is_none_when_redis_fails(redis):
+    redis.fail = True
+
+    assert run(exercise_cache_scope(5, redis=redis)) is None
+    assert run(workout_cache_scope(1, 5, redis)) is None
+
+
+def test_result_cache_round_trip(redis):
+    cache = SearchResultCache(redis, ttl=60)
+    results = [{"id": 1, "workout_date": date(2025, 3, 1), "similarity": 0.8}]
+
+    run(cache.set("workouts:1:v0.0:x", "Leg  Day", results))
+
+    assert run(cache.get("workouts:1:v0.0:x", "leg day")) == results
+    assert run(cache.get("workouts:1:v0.1:x", "leg day")) is None
+
+
+def test_result_cache_keys_include_scope(redis):
+    cache = SearchResultCache(redis, ttl=60)
+    run(cache.set("scope", "query", []))
+
+    (key,) = redis.data
+    assert key.startswith(f"{SearchResultCache.KEY_PREFIX}:scope:")
+    assert json.loads(redis.data[key]) == []
+
+
+def test_result_cache_skips_none_scope_and_errors(redis):
+    cache = SearchResultCache(redis, ttl=60)
+    run(cache.set(None, "query", [{"id": 1}]))
+    assert redis.data == {}
+
+    redis.fail = True
+    run(cache.set("scope", "query", [{"id": 1}]))
+    assert run(cache.get("scope", "query")) is None
+
+
+def test_result_cache_discards_corrupt_entries(redis):
+    cache = SearchResultCache(redis, ttl=60)
+    run(cache.set("scope", "query", []))
+    (key,) = redis.data
+    redis.data[key] = "{not json"
+
+    assert run(cache.get("scope", "query")) is None
+    assert redis.data == {}
@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services import semantic_cache
+from app.services.semantic_cache import SemanticCache
+
+RESULTS = [{"exercise_id": 1, "similarity": 0.9}]
+
+
+def embedding(*values):
+    vector = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector
+
+
+def test_hit_on_similar_query():
+    cache = SemanticCache(max_entries=4, threshold=0.95, ttl=0)
+    cache.set("scope", embedding(1.0, 0.0), RESULTS)
+
+    assert cache.get("scope", embedding(1.0, 0.05)) == RESULTS
+    assert cache.hits == 1
+
+
+def test_miss_below_threshold():
+    cache = SemanticCache(max_entries=4, threshold=0.95, ttl=0)
+    cache.set("scope", embedding(1.0, 0.0), RESULTS)
+
+    assert cache.get("scope", embedding(0.0, 1.0)) is None
+    assert cache.misses == 1
+
+
+def test_scopes_are_separate():
+    cache = SemanticCache(max_entries=4, threshold=0.95, ttl=0)
+    cache.set("v1", embedding(1.0), RESULTS)
+
+    assert cache.get("v2", embedding(1.0)) is None
+    assert cache.get(None, embedding(1.0)) is None
+
+
+def test_returns_copies():
+    cache = SemanticCache(max_entries=4, threshold=0.95, ttl=0)
+    cache.set("scope", embedding(1.0), RESULTS)
+
+    cache.get("scope", embedding(1.0))[0]["similarity"] = 0.0
+
+    assert cache.get("scope", embedding(1.0)) == RESULTS
+
+
+def test_ring_buffer_overwrites_oldest():
+    cache = SemanticCache(max_entries=2, threshold=0.99, ttl=0)
+    cache.set("scope", embedding(1.0, 0.0, 0.0), [{"id": 1}])
+    cache.set("scope", embedding(0.0, 1.0, 0.0), [{"id": 2}])
+    cache.set("scope", embedding(0.0, 0.0, 1.0), [{"id": 3}])
+
+    assert cache.get("scope", embedding(1.0, 0.0, 0.0)) is None
+    assert cache.get("scope", embedding(0.0, 0.0, 1.0)) == [{"id": 3}]
+    assert len(cache) == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticCache(max_entries=2, threshold=0.9, ttl=10)
+    cache.set("scope", embedding(1.0), RESULTS)
+
+    now[0] += 11
+
+    assert cache.get("scope", embedding(1.0)) is None
+    assert len(cache) == 0
+
+
+def test_zero_vector_is_not_cached():
+    cache = SemanticCache(max_entries=2, threshold=0.9, ttl=0)
+    cache.set("scope", embedding(), RESULTS)
+
+    assert len(cache) == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from app.utils.tokens import (
+    BYTES_PER_TOKEN,
+    HEURISTIC_BUDGET_MARGIN,
+    estimate_tokens,
+    pack_batches,
+    token_budget,
+    truncate_to_tokens,
+)
+
+MODEL = "text-embedding-3-small"
+
+pytestmark = pytest.mark.usefixtures("heuristic_tokens")
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("", MODEL) == 0
+    assert estimate_tokens("a" * (BYTES_PER_TOKEN + 1), MODEL) == 2
+
+
+def test_token_budget_applies_margin():
+    assert token_budget(1000, MODEL) == int(1000 * HEURISTIC_BUDGET_MARGIN)
+    assert token_budget(1, MODEL) == 1
+
+
+def test_truncate_keeps_text_that_fits():
+    assert truncate_to_tokens("short text", 100, MODEL) == "short text"
+
+
+def test_truncate_stays_within_budget():
+    text = "1234567890" * 1000
+
+    truncated = truncate_to_tokens(text, 100, MODEL)
+
+    assert text.startswith(truncated)
+    assert estimate_tokens(truncated, MODEL) <= token_budget(100, MODEL)
+
+
+def test_truncate_never_splits_a_character():
+    truncated = truncate_to_tokens("é" * 1000, 10, MODEL)
+
+    assert set(truncated) == {"é"}
+
+
+def test_pack_batches_by_tokens():
+    batches = pack_batches(["a", "b", "c", "d"], [4, 4, 4, 4], max_tokens=8, max_items=10)
+
+    assert batches == [["a", "b"], ["c", "d"]]
+
+
+def test_pack_batches_by_items():
+    batches = pack_batches(list("abcde"), [1] * 5, max_tokens=100, max_items=2)
+
+    assert batches == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_pack_batches_oversized_item_gets_own_batch():
+    batches = pack_batches(["a", "big", "b"], [1, 50, 1], max_tokens=10, max_items=10)
+
+    assert batches == [["a"], ["big"], ["b"]]
+
+
+def test_pack_batches_applies_budget_for_model():
+    items = list(range(10))
+    counts = [10] * 10
+
+    assert len(pack_batches(items, counts, max_tokens=100, max_items=100)) == 1
+    assert len(pack_batches(items, counts, max_tokens=100, max_items=100, model=MODEL)) == 2
+
+
+def test_pack_batches_empty():
+    assert pack_batches([], [], max_tokens=10, max_items=10) == []
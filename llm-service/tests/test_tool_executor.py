@@ -0,0 +1,54 @@
+import asyncio
+from datetime import date
+
+from app.services.tool_executor import ToolExecutor
+
+
+class FakeSearchService:
+    def __init__(self):
+        self.batches = []
+        self.single = []
+
+    async def search_user_workouts_many(self, user_id, queries, tuning=None):
+        self.batches.append(queries)
+        return [[{"query": q.query}] for q in queries]
+
+    async def search_user_workouts(self, user_id, query, limit=5, tuning=None, since=None, until=None,
+                                   recency_weight=None):
+        self.single.append(query)
+        return [{"query": query}]
+
+
+def executor():
+    tool_executor = ToolExecutor.__new__(ToolExecutor)
+    tool_executor.search_service = FakeSearchService()
+    return tool_executor
+
+
+def call(query, **args):
+    return {"name": "search_user_workouts", "args": {"query": query, **args}}
+
+
+def test_batch_keeps_per_call_arguments():
+    tool_executor = executor()
+
+    results = asyncio.run(tool_executor.execute_multiple(
+        [call("legs", since="2025-01-01"), call("chest", recency_weight=0.5)], user_id=1
+    ))
+
+    (queries,) = tool_executor.search_service.batches
+    assert queries[0].since == date(2025, 1, 1) and queries[0].recency_weight is None
+    assert queries[1].since is None and queries[1].recency_weight == 0.5
+    assert [r["results"] for r in results] == [[{"query": "legs"}], [{"query": "chest"}]]
+
+
+def test_failed_batch_falls_back_to_single_calls():
+    tool_executor = executor()
+
+    results = asyncio.run(tool_executor.execute_multiple(
+        [call("legs"), call("chest", since="not a date")], user_id=1
+    ))
+
+    assert results[0]["results"] == [{"query": "legs"}]
+    assert "error" in results[1]
+    assert tool_executor.search_service.single == ["legs"]
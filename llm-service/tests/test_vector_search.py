@@ -0,0 +1,175 @@
+import asyncio
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.search_cache import SearchResultCache
+from app.services.semantic_cache import SemanticCache
+from app.services.vector_search_service import VectorSearchService
+
+
+def rows(*ids):
+    return [{"exercise_id": item, "leg": "first"} for item in ids]
+
+
+def test_fuse_ranked_rewards_items_in_both_lists():
+    vector_leg = rows(1, 2, 3)
+    lexical_leg = rows(3, 4)
+
+    fused = VectorSearchService._fuse_ranked([vector_leg, lexical_leg], "exercise_id", 10)
+
+    # 2 and 4 are both second in their list: tied, vector leg first
+    assert [row["exercise_id"] for row in fused] == [3, 1, 2, 4]
+
+
+def test_fuse_ranked_two_lower_ranks_beat_one_top_rank():
+    # 1 / (k + 1) < 2 / (k + 2) for any k > 0
+    fused = VectorSearchService._fuse_ranked([rows(1, 2), rows(3, 2)], "exercise_id", 10)
+
+    assert fused[0]["exercise_id"] == 2
+
+
+def test_fuse_ranked_ties_keep_leg_order():
+    fused = VectorSearchService._fuse_ranked([rows(1), rows(2)], "exercise_id", 10)
+
+    assert [row["exercise_id"] for row in fused] == [1, 2]
+
+
+def test_fuse_ranked_keeps_first_row_and_limit():
+    lexical_leg = [{"exercise_id": 1, "leg": "second"}]
+
+    fused = VectorSearchService._fuse_ranked([rows(1, 2, 3), lexical_leg], "exercise_id", 2)
+
+    assert len(fused) == 2
+    assert fused[0] == {"exercise_id": 1, "leg": "first"}
+
+
+def test_fuse_ranked_empty():
+    assert VectorSearchService._fuse_ranked([[], []], "exercise_id", 5) == []
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_embeddings_batch(self, texts, caller=None):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            vector = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+            vector[hash(text) % settings.EMBEDDING_DIMENSION] = 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def cached_service(redis):
+    service = VectorSearchService.__new__(VectorSearchService)
+    service.embedding_service = FakeEmbeddingService()
+    service.redis = redis
+    service.record_queries = False
+    service.result_cache = SearchResultCache(redis, ttl=60)
+    service.semantic_cache = SemanticCache(max_entries=8, threshold=0.99, ttl=0)
+    service.exercise_index = None
+    return service
+
+
+def test_search_many_cached_runs_only_misses(redis):
+    service = cached_service(redis)
+    searched = []
+
+    async def search(pending, embeddings):
+        searched.append(pending)
+        return [[{"id": i}] for i in pending]
+
+    scopes = ["a", "b", "a"]
+    queries = ["squat", "squat", "bench"]
+
+    first = asyncio.run(service._search_many_cached(scopes, queries, search))
+    second = asyncio.run(service._search_many_cached(scopes, queries, search))
+
+    assert first == second == [[{"id": 0}], [{"id": 1}], [{"id": 2}]]
+    # Each distinct text embedded once; the second round is served from Redis
+    assert service.embedding_service.calls == [["squat", "bench"]]
+    assert searched == [[0, 1, 2]]
+
+
+def test_search_many_cached_uses_semantic_cache(redis):
+    service = cached_service(redis)
+
+    async def search(pending, embeddings):
+        return [[{"id": "db"}] for _ in pending]
+
+    asyncio.run(service._search_many_cached(["a"], ["squat"], search))
+    redis.data.clear()
+
+    async def fail(pending, embeddings):
+        raise AssertionError("semantic cache hit expected")
+
+    assert asyncio.run(service._search_many_cached(["a"], ["squat"], fail)) == [[{"id": "db"}]]
+
+
+class FakePipeline:
+    """Queues the sorted set commands used by hot query recording and warm-up."""
+
+    def __init__(self, sets):
+        self.sets = sets
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def zincrby(self, key, amount, member):
+        def increment():
+            members = self.sets.setdefault(key, {})
+            members[member] = members.get(member, 0) + amount
+        self.commands.append(increment)
+
+    def zremrangebyrank(self, key, start, end):
+        self.commands.append(lambda: None)
+
+    def expire(self, key, ttl):
+        self.commands.append(lambda: None)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        def top():
+            ranked = sorted(self.sets.get(key, {}).items(), key=lambda item: -item[1])
+            return ranked[start:end + 1]
+        self.commands.append(top)
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeSortedSetRedis:
+    def __init__(self):
+        self.sets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.sets)
+
+
+def test_warm_up_embeds_hot_queries_in_one_batch():
+    service = VectorSearchService.__new__(VectorSearchService)
+    service.embedding_service = FakeEmbeddingService()
+    service.redis = FakeSortedSetRedis()
+    service.record_queries = True
+
+    async def scenario():
+        for query in ["squat", "bench", "squat", "deadlift", "squat", "bench"]:
+            await service._record_query(query)
+        return await service.warm_up(limit=2)
+
+    assert asyncio.run(scenario()) == 2
+    assert service.embedding_service.calls == [["squat", "bench"]]
+
+
+def test_warm_up_without_recorded_queries():
+    service = VectorSearchService.__new__(VectorSearchService)
+    service.embedding_service = FakeEmbeddingService()
+    service.redis = FakeSortedSetRedis()
+
+    assert asyncio.run(service.warm_up(limit=5)) == 0
+    assert service.embedding_service.calls == []
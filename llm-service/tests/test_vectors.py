@@ -0,0 +1,42 @@
+import base64
+
+import numpy as np
+import pytest
+
+from app.utils import vectors
+
+
+VALUES = [0.0, 1.5, -2.25, 3.1415927, 1e-8]
+
+
+def test_bytes_round_trip():
+    data = vectors.to_bytes(VALUES)
+
+    assert len(data) == 4 * len(VALUES)
+    assert vectors.from_bytes(data).tolist() == pytest.approx(VALUES)
+
+
+def test_bytes_are_little_endian_float32():
+    assert vectors.to_bytes([1.0]) == np.array([1.0], dtype="<f4").tobytes()
+
+
+def test_base64_round_trip():
+    encoded = base64.b64encode(vectors.to_bytes(VALUES)).decode()
+
+    decoded = vectors.from_base64(encoded)
+
+    assert decoded.dtype == np.float32
+    assert decoded.tolist() == pytest.approx(VALUES)
+
+
+def test_from_bytes_is_a_read_only_view():
+    vector = vectors.from_bytes(vectors.to_bytes(VALUES))
+
+    assert not vector.flags.writeable
+
+
+def test_to_float32():
+    vector = vectors.to_float32(VALUES)
+
+    assert vector.dtype == np.float32
+    assert vectors.vector_nbytes(vector) > 4 * len(VALUES)